@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: decoding /search/tracks pages and encoding stream events.
+Payloads are built in the shape of recorded api-v2 responses (200 tracks,
+~150 distinct artists per page). Checks every decoder returns the same
+users, then times each.
+
+    python benchmarks/bench_codec.py [pages]
+"""
+import sys
+import json
+import random
+import timeit
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from services import codec  # noqa: E402
+
+
+# ── Payloads ─────────────────────────────────────────────────────────
+
+def make_user(uid: int, rng: random.Random) -> dict:
+    return {
+        "avatar_url": f"https://i1.sndcdn.com/avatars-000{uid}-abcdef-large.jpg",
+        "city": rng.choice(["Berlin", "London", "Detroit", "", None]),
+        "comments_count": rng.randint(0, 50),
+        "country_code": rng.choice(["DE", "GB", "US", None]),
+        "created_at": "2015-03-02T11:20:33Z",
+        "creator_subscriptions": [{"product": {"id": "free"}}],
+        "creator_subscription": {"product": {"id": "free"}},
+        "description": "Producer / DJ. Bookings: \"mgmt\" — see links. " * rng.randint(0, 4),
+        "followers_count": rng.randint(0, 200_000),
+        "followings_count": rng.randint(0, 2000),
+        "first_name": "",
+        "full_name": f"Artist {uid}",
+        "groups_count": 0,
+        "id": uid,
+        "kind": "user",
+        "last_modified": "2024-05-01T10:00:00Z",
+        "last_name": "",
+        "likes_count": rng.randint(0, 900),
+        "playlist_likes_count": 0,
+        "permalink": f"artist-{uid}",
+        "permalink_url": f"https://soundcloud.com/artist-{uid}",
+        "playlist_count": rng.randint(0, 20),
+        "reposts_count": None,
+        "track_count": rng.randint(0, 300),
+        "uri": f"https://api.soundcloud.com/users/{uid}",
+        "urn": f"soundcloud:users:{uid}",
+        "username": f"artist-{uid}",
+        "verified": False,
+        "visuals": None,
+        "badges": {"pro": False, "creator_mid_tier": False, "pro_unlimited": False, "verified": False},
+        "station_urn": f"soundcloud:system-playlists:artist-stations:{uid}",
+        "station_permalink": f"artist-stations:{uid}",
+    }
+
+
+def make_track(tid: int, user: dict, rng: random.Random) -> dict:
+    return {
+        "artwork_url": f"https://i1.sndcdn.com/artworks-{tid}-large.jpg",
+        "caption": None,
+        "commentable": True,
+        "comment_count": rng.randint(0, 100),
+        "created_at": "2024-04-01T09:00:00Z",
+        "description": "Out now. Written and produced by the user. " * rng.randint(0, 8),
+        "downloadable": False,
+        "duration": rng.randint(120_000, 480_000),
+        "embeddable_by": "all",
+        "genre": rng.choice(["Techno", "House", "Drum & Bass"]),
+        "id": tid,
+        "kind": "track",
+        "last_modified": "2024-04-01T09:00:00Z",
+        "license": "all-rights-reserved",
+        "likes_count": rng.randint(0, 5000),
+        "permalink": f"track-{tid}",
+        "permalink_url": f"https://soundcloud.com/{user['permalink']}/track-{tid}",
+        "playback_count": rng.randint(0, 10**6),
+        "public": True,
+        "publisher_metadata": {"id": tid, "urn": f"soundcloud:tracks:{tid}", "contains_music": True},
+        "reposts_count": rng.randint(0, 200),
+        "sharing": "public",
+        "state": "finished",
+        "streamable": True,
+        "tag_list": 'techno "dark techno" berlin',
+        "title": f"Track {tid}",
+        "uri": f"https://api.soundcloud.com/tracks/{tid}",
+        "urn": f"soundcloud:tracks:{tid}",
+        "user_id": user["id"],
+        "waveform_url": f"https://wave.sndcdn.com/{tid}_m.json",
+        "media": {"transcodings": [
+            {
+                "url": f"https://api-v2.soundcloud.com/media/soundcloud:tracks:{tid}/{k}/stream/{proto}",
+                "preset": "mp3_1_0", "duration": 240_000, "snipped": False,
+                "format": {"protocol": proto, "mime_type": "audio/mpeg"}, "quality": "sq",
+            }
+            for k, proto in enumerate(["hls", "progressive", "hls"])
+        ]},
+        "track_authorization": "eyJ0eXAiOiJKV1Qi" * 12,
+        "monetization_model": "NOT_APPLICABLE",
+        "policy": "ALLOW",
+        "user": user,
+    }
+
+
+def make_page(page: int, rng: random.Random) -> bytes:
+    users = [make_user(page * 1000 + i, rng) for i in range(150)]
+    collection = [make_track(page * 10_000 + i, rng.choice(users), rng) for i in range(200)]
+    return json.dumps({
+        "collection": collection,
+        "total_results": 9000,
+        "next_href": f"https://api-v2.soundcloud.com/search/tracks?q=techno&offset={(page + 1) * 200}&limit=200",
+        "query_urn": "soundcloud:search:0123456789abcdef",
+    }).encode()
+
+
+# ── Decoders ─────────────────────────────────────────────────────────
+
+def full_stdlib(body: bytes) -> list[dict]:
+    return [t["user"] for t in json.loads(body)["collection"]]
+
+
+def full_orjson(body: bytes) -> list[dict]:
+    return [t["user"] for t in codec.loads(body)["collection"]]
+
+
+def extract(body: bytes) -> list[dict]:
+    return codec.extract_users(body)[0]
+
+
+def extract_scan(body: bytes) -> list[dict]:
+    return codec._scan_users(body)[0]
+
+
+def main() -> None:
+    n_pages = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    rng = random.Random(7)
+    pages = [make_page(p, rng) for p in range(n_pages)]
+    size = sum(len(p) for p in pages)
+    print(f"{n_pages} pages, {size / n_pages / 1024:.0f} KiB/page, orjson={codec.ORJSON_AVAILABLE}")
+
+    decoders = {"json.loads (full)": full_stdlib, "extract_users": extract, "key scan (no orjson)": extract_scan}
+    if codec.ORJSON_AVAILABLE:
+        decoders["orjson.loads (full)"] = full_orjson
+
+    expected = [full_stdlib(p) for p in pages]
+    for name, fn in decoders.items():
+        mismatches = sum(fn(p) != e for p, e in zip(pages, expected))
+        print(f"  {name:24s} mismatches: {mismatches}")
+
+    print("decode, per page:")
+    for name, fn in decoders.items():
+        t = min(timeit.repeat(lambda: [fn(p) for p in pages], number=3, repeat=3)) / (3 * n_pages)
+        print(f"  {name:24s} {t * 1e3:7.2f} ms")
+
+    print("peak allocation, one page:")
+    for name, fn in decoders.items():
+        tracemalloc.start()
+        fn(pages[0])
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"  {name:24s} {peak / 1024:7.0f} KiB")
+
+    # A multi-tap `complete` event: 1000 result rows
+    rows = [
+        {"sc_user_id": u["id"], "name": u["username"], "url": u["permalink_url"],
+         "followers": u["followers_count"], "genre": "Techno", "source_tap": "genre_search"}
+        for users in expected[:7] for u in users
+    ][:1000]
+    event = {"results": rows, "total_found": 5000, "filtered_count": len(rows)}
+    encoders = {"json.dumps": json.dumps}
+    if codec.ORJSON_AVAILABLE:
+        encoders["codec.dumps (orjson)"] = codec.dumps
+    print("encode, 1000-row event:")
+    for name, fn in encoders.items():
+        t = min(timeit.repeat(lambda: fn(event), number=20, repeat=3)) / 20
+        print(f"  {name:24s} {t * 1e3:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: candidate ingest and re-filtering, with dates parsed once.
+Compares the original ingest (filter user dicts, then project survivors,
+parsing last_modified in both steps) with admit_candidates(), and
+/filter-candidates over rows with and without a carried modified_at.
+Checks every pair agrees, then times each.
+
+    python benchmarks/bench_columnar.py [users] [page_size]
+"""
+import sys
+import time
+import random
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from services.columnar import CandidateBatch, admit_candidates, filter_candidates  # noqa: E402
+from services.models import Candidate, parse_epoch, user_summary  # noqa: E402
+
+
+MIN_FOLLOWERS, MAX_FOLLOWERS = 1_000, 50_000
+
+
+# ── Original implementation ──────────────────────────────────────────
+
+def legacy_filter(users, min_followers, max_followers, cutoff):
+    passed = []
+    for u in users:
+        fc = u.get("followers_count", 0) or 0
+        tc = u.get("track_count")
+        if fc < min_followers or fc > max_followers:
+            continue
+        if (tc or 0) < 1 and tc is not None:
+            continue
+        if cutoff is not None:
+            epoch = parse_epoch(u.get("last_modified"))
+            if epoch is not None and epoch < cutoff:
+                continue
+        passed.append(u)
+    return passed
+
+
+def legacy_admit(users, cutoff):
+    passed = legacy_filter(users, MIN_FOLLOWERS, MAX_FOLLOWERS, cutoff)
+    return [Candidate.from_user(u, "trending") for u in passed]  # parses last_modified again
+
+
+# ── Corpus ───────────────────────────────────────────────────────────
+
+def make_users(n, seed=7):
+    rng = random.Random(seed)
+    now = time.time()
+    users = []
+    for i in range(n):
+        age_days = rng.choice([3, 40, 200, 900])
+        stamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now - age_days * 86400 - rng.randrange(86400)))
+        users.append({
+            "id": i + 1, "username": f"artist-{i}", "permalink": f"artist-{i}",
+            # Search pages are mostly out of range; that's what the filter is for
+            "followers_count": int(rng.lognormvariate(7, 2.5)),
+            "track_count": rng.choice([None, 0, 3, 40]),
+            "last_modified": stamp, "genre": "techno", "city": "Berlin", "country_code": "DE",
+            "avatar_url": f"https://i1.sndcdn.com/avatars-{i}-large.jpg",
+            "description": "Producer / DJ. Bookings via mgmt. " * rng.randint(0, 4),
+        })
+    return users
+
+
+def pages(users, size):
+    return [users[i:i + size] for i in range(0, len(users), size)]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    page_size = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    users = make_users(n)
+    cutoff = time.time() - 365 * 86400
+    batches = pages(users, page_size)
+
+    legacy = [c for page in batches for c in legacy_admit(page, cutoff)]
+    admitted = [
+        c for page in batches
+        for c in admit_candidates(page, MIN_FOLLOWERS, MAX_FOLLOWERS, cutoff, True, source_tap="trending")[0]
+    ]
+    print(f"{n} users in pages of {page_size}, {len(admitted)} admitted, "
+          f"mismatches: {legacy != admitted}")
+
+    rows = [user_summary(u) for u in users]
+    bare_rows = [{k: v for k, v in row.items() if k != "modified_at"} for row in rows]
+    with_epoch = CandidateBatch(rows, followers_key="followers").filter(MIN_FOLLOWERS, MAX_FOLLOWERS, cutoff, True)
+    reparsed = CandidateBatch(bare_rows, followers_key="followers").filter(MIN_FOLLOWERS, MAX_FOLLOWERS, cutoff, True)
+    print(f"{len(rows)} rows re-filtered, mismatches: {with_epoch[1] != reparsed[1]}")
+
+    cases = [
+        ("ingest legacy", lambda: [legacy_admit(page, cutoff) for page in batches]),
+        ("ingest admit", lambda: [
+            admit_candidates(page, MIN_FOLLOWERS, MAX_FOLLOWERS, cutoff, True, source_tap="trending")
+            for page in batches
+        ]),
+        ("filter rows, parse", lambda: CandidateBatch(bare_rows, followers_key="followers").filter(
+            MIN_FOLLOWERS, MAX_FOLLOWERS, cutoff, True)),
+        ("filter rows, epoch", lambda: CandidateBatch(rows, followers_key="followers").filter(
+            MIN_FOLLOWERS, MAX_FOLLOWERS, cutoff, True)),
+        ("filter candidates", lambda: filter_candidates(admitted, MIN_FOLLOWERS, MAX_FOLLOWERS, cutoff)),
+    ]
+    for name, fn in cases:
+        best = min(timeit.repeat(fn, number=1, repeat=5))
+        print(f"{name:>20}: {best * 1000:8.1f} ms  ({best / n * 1e6:.2f} us/user)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: compiled email classifier vs the original per-call checks.
+Verifies both agree on every address, then times each.
+
+    python benchmarks/bench_email_utils.py [n]
+"""
+import re
+import sys
+import random
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from services.email_utils import (  # noqa: E402
+    JUNK_EMAIL_DOMAINS, JUNK_EMAIL_PATTERNS, classify_emails, is_junk_email, validate_email,
+)
+
+
+# ── Original implementations ─────────────────────────────────────────
+
+def legacy_validate_email(email):
+    if not email or "@" not in email:
+        return None
+    local, domain = email.split("@", 1)
+    if re.fullmatch(r"[0-9a-f]+", local.lower()):
+        return None
+    if local.replace(".", "").replace("-", "").replace("_", "").isdigit():
+        return None
+    if not re.search(r"[a-zA-Z]", local):
+        return None
+    if len(local) > 40:
+        return None
+    if not re.match(r"[a-zA-Z0-9.-]+\.[a-zA-Z]{2,7}$", domain):
+        return None
+    if domain.endswith((".png", ".jpg", ".js", ".css", ".svg", ".woff", ".woff2", ".ttf", ".eot")):
+        return None
+    return email
+
+
+def legacy_is_junk_email(email):
+    lower = email.lower()
+    domain = lower.split("@")[1] if "@" in lower else ""
+    if domain in JUNK_EMAIL_DOMAINS:
+        return True
+    for junk_domain in JUNK_EMAIL_DOMAINS:
+        if domain.endswith("." + junk_domain):
+            return True
+    return any(pattern in lower for pattern in JUNK_EMAIL_PATTERNS)
+
+
+# ── Corpus ───────────────────────────────────────────────────────────
+
+def make_corpus(n, seed=7):
+    rng = random.Random(seed)
+    locals_ = ["bookings", "info", "support", "djname", "mgmt.team", "7c33659f530ef43f", "12345",
+               "noreply", "hello", "a" * 45, "press", "x_y-z", "copyright", "artist.name"]
+    domains = ["gmail.com", "artist.net", "soundcloud.com", "jamie.bandcamp.com", "sentry.io",
+               "label-records.co.uk", "logo.png", "beatport.com", "example.com", "mail.patreon.com"]
+    junk = sorted(JUNK_EMAIL_DOMAINS)
+    out = []
+    for _ in range(n):
+        domain = rng.choice(domains) if rng.random() < 0.8 else f"sub.{rng.choice(junk)}"
+        local = rng.choice(locals_)
+        if rng.random() < 0.5:
+            local += f".{rng.randrange(10_000)}"  # keep most addresses distinct
+        out.append(f"{local}@{domain}")
+    return out
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    corpus = make_corpus(n)
+
+    mismatches = 0
+    for email, verdict in zip(corpus, classify_emails(corpus)):
+        legacy = "invalid" if not legacy_validate_email(email) else "junk" if legacy_is_junk_email(email) else "ok"
+        mismatches += legacy != verdict.verdict
+        mismatches += bool(validate_email(email)) != bool(legacy_validate_email(email))
+        mismatches += is_junk_email(email) != legacy_is_junk_email(email)
+    print(f"{n} addresses, {mismatches} mismatches")
+
+    def legacy():
+        for e in corpus:
+            legacy_validate_email(e) and legacy_is_junk_email(e)
+
+    def compiled_single():
+        for e in corpus:
+            validate_email(e) and is_junk_email(e)
+
+    def compiled_batch():
+        classify_emails(corpus)
+
+    for name, fn in [("legacy", legacy), ("compiled", compiled_single), ("batch", compiled_batch)]:
+        best = min(timeit.repeat(fn, number=1, repeat=5))
+        print(f"{name:>10}: {best * 1000:8.1f} ms  ({best / n * 1e6:.2f} us/email)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Background deep-scrape job routes.
+The JobManager lives on app.state.jobs (created in main.py's lifespan).
+"""
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from services import codec
+from services.jobs import JobManager
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+class DeepScrapeJobRequest(BaseModel):
+    candidates: list[dict[str, Any]]
+    force_refresh: bool = False
+
+
+def _manager(request: Request) -> JobManager:
+    return request.app.state.jobs
+
+
+async def _job_or_404(request: Request, job_id: str) -> dict:
+    job = await _manager(request).status(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/deep-scrape", status_code=202)
+async def create_deep_scrape_job(req: DeepScrapeJobRequest, request: Request):
+    """Queue a deep scrape. Returns immediately with the job id."""
+    if not req.candidates:
+        raise HTTPException(status_code=400, detail="No candidates provided")
+    return await _manager(request).submit(req.candidates, force_refresh=req.force_refresh)
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str, request: Request):
+    """Job status and progress counters."""
+    return await _job_or_404(request, job_id)
+
+
+@router.get("/{job_id}/results")
+async def get_job_results(
+    job_id: str,
+    request: Request,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """Finished results so far, in candidate order."""
+    job = await _job_or_404(request, job_id)
+    results = await _manager(request).results(job_id, offset, limit)
+    return {
+        "job_id": job_id,
+        "status": job["status"],
+        "offset": offset,
+        "results": results,
+        "next_offset": offset + len(results) if offset + len(results) < job["done"] else None,
+    }
+
+
+@router.get("/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request):
+    """SSE stream of `progress` and `result` events, ending with `complete`."""
+    await _job_or_404(request, job_id)
+
+    async def event_stream():
+        async for event, data in _manager(request).events(job_id):
+            yield f"event: {event}\ndata: {codec.dumps(data)}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+@router.post("/{job_id}/cancel")
+async def cancel_job(job_id: str, request: Request):
+    """Stop a job; results saved so far stay available."""
+    await _job_or_404(request, job_id)
+    if not await _manager(request).cancel(job_id):
+        raise HTTPException(status_code=409, detail="Job already finished")
+    return await _manager(request).status(job_id)
@@ -2,19 +2,29 @@
 Bifrost Scraper — SoundCloud artist discovery & profile scraping.
 Minimal FastAPI app. No database, no Redis, no Playwright.
 """
-import json
 import asyncio
+from dataclasses import asdict
 from contextlib import asynccontextmanager
 from typing import Optional, Any
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+from services import codec
 from services.soundcloud_scraper import SoundCloudScraper
 from services.multi_tap import multi_tap_discover
-from services.deep_scrape import deep_scrape_batch
+from services.deep_scrape import deep_scrape_batch, iter_deep_scrape
+from services.models import user_summary
+from services.columnar import CandidateBatch, recency_cutoff
+from services.graph_crawler import (
+    CrawlConfig, DEFAULT_BRANCHING, DEFAULT_DEPTH, DEFAULT_REQUEST_BUDGET,
+    DISCOVER_FOLLOWERS_PAGES, DISCOVER_REQUEST_BUDGET, SEED_FOLLOWERS_PAGES,
+)
+from services.email_utils import classify_emails, reload_rules, rule_stats
+from services.jobs import JobManager, JobStore
+from api.routes import jobs as job_routes
 
 # ── Shared scraper instance ───────────────────────────────────────────
 
@@ -26,7 +36,10 @@ async def lifespan(app: FastAPI):
     global scraper
     scraper = SoundCloudScraper()
     await scraper.__aenter__()
+    app.state.jobs = JobManager(scraper, JobStore())
+    await app.state.jobs.resume()
     yield
+    await app.state.jobs.aclose()
     await scraper.__aexit__(None, None, None)
 
 
@@ -44,6 +57,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.include_router(job_routes.router)
+
 
 # ── Request models ───────────────────────────────────────────────────
 
@@ -59,6 +74,10 @@ class DiscoverRequest(BaseModel):
     genres: Optional[list[str]] = None
     max_results: int = 50
     uploaded_within_days: Optional[int] = None
+    # Seed-graph crawl shape (see services/graph_crawler.py)
+    graph_depth: int = DEFAULT_DEPTH
+    graph_branching: int = DEFAULT_BRANCHING
+    graph_request_budget: int = DISCOVER_REQUEST_BUDGET
 
 
 class MultiTapDiscoverRequest(BaseModel):
@@ -68,10 +87,54 @@ class MultiTapDiscoverRequest(BaseModel):
     seed_url: Optional[str] = None
     uploaded_within_days: Optional[int] = None
     target_pool: int = 1000
+    max_results: Optional[int] = None
+    deadline_seconds: Optional[float] = None
+    request_budget: Optional[int] = None
+    graph_depth: int = DEFAULT_DEPTH
+    graph_branching: int = DEFAULT_BRANCHING
+    graph_request_budget: int = DEFAULT_REQUEST_BUDGET
 
 
 class DeepScrapeRequest(BaseModel):
     candidates: list[dict[str, Any]]
+    force_refresh: bool = False
+
+
+class FilterCandidatesRequest(BaseModel):
+    # Discovery result rows (or raw SoundCloud users)
+    candidates: list[dict[str, Any]]
+    min_followers: int = 0
+    max_followers: int = 999_999_999
+    uploaded_within_days: Optional[int] = None
+
+
+class EmailRulesRequest(BaseModel):
+    junk_domains: list[str] = []
+    junk_patterns: list[str] = []
+    # Rows from the dashboard's blocked_terms table ({term, type})
+    blocked_terms: list[dict[str, Any]] = []
+
+
+class ClassifyEmailsRequest(BaseModel):
+    emails: list[str]
+
+
+def _crawl_config(req: DiscoverRequest | MultiTapDiscoverRequest) -> CrawlConfig:
+    pages = DISCOVER_FOLLOWERS_PAGES if isinstance(req, DiscoverRequest) else SEED_FOLLOWERS_PAGES
+    return CrawlConfig(req.graph_depth, req.graph_branching, req.graph_request_budget, pages)
+
+
+# ── NDJSON streaming ─────────────────────────────────────────────────
+
+NDJSON = "application/x-ndjson"
+
+
+def _wants_ndjson(request: Request) -> bool:
+    return NDJSON in request.headers.get("accept", "")
+
+
+def _ndjson_line(record: dict) -> str:
+    return codec.dumps(record) + "\n"
 
 
 # ── Routes ────────────────────────────────────────────────────────────
@@ -87,6 +150,12 @@ async def health():
     return {"status": "ok"}
 
 
+@app.get("/stats")
+async def stats():
+    """Scraper runtime counters — rate limiter state, etc."""
+    return scraper.stats()
+
+
 @app.post("/scrape/soundcloud")
 async def scrape_soundcloud(req: ScrapeRequest):
     """Scrape a single SoundCloud profile."""
@@ -95,8 +164,41 @@ async def scrape_soundcloud(req: ScrapeRequest):
 
 
 @app.post("/discover")
-async def discover_artists(req: DiscoverRequest):
-    """Discover artists similar to a seed profile."""
+async def discover_artists(req: DiscoverRequest, request: Request):
+    """
+    Discover artists similar to a seed profile. With Accept: application/x-ndjson,
+    every passing artist is streamed as found (result records are not capped
+    at max_results), then a summary record whose `top` lists the max_results
+    best-ranked sc_user_ids, with their score breakdowns in `scores`. As in
+    the JSON response, `filtered_count` counts that ranked slice; the number
+    of result records is filter_stats.passed.
+    """
+    if _wants_ndjson(request):
+        async def ndjson_stream():
+            try:
+                async for kind, data in scraper.iter_discover(
+                    seed_url=req.seed_url,
+                    min_followers=req.min_followers,
+                    max_followers=req.max_followers,
+                    genres=req.genres,
+                    uploaded_within_days=req.uploaded_within_days,
+                    max_results=req.max_results,
+                    crawl=_crawl_config(req),
+                ):
+                    if kind == "result":
+                        yield _ndjson_line({"type": "result", **user_summary(data)})
+                    else:
+                        ranked = data.pop("ranked", [])
+                        yield _ndjson_line({
+                            "type": "summary", **data,
+                            "top": [r.candidate.id for r in ranked],
+                            "scores": [{"sc_user_id": r.candidate.id, **r.to_dict()} for r in ranked],
+                        })
+            except Exception as e:
+                yield _ndjson_line({"type": "summary", "error": str(e)})
+
+        return StreamingResponse(ndjson_stream(), media_type=NDJSON)
+
     return await scraper.discover(
         seed_url=req.seed_url,
         min_followers=req.min_followers,
@@ -104,6 +206,7 @@ async def discover_artists(req: DiscoverRequest):
         genres=req.genres,
         max_results=req.max_results,
         uploaded_within_days=req.uploaded_within_days,
+        crawl=_crawl_config(req),
     )
 
 
@@ -119,6 +222,10 @@ async def multi_tap_discover_endpoint(req: MultiTapDiscoverRequest):
             seed_url=req.seed_url,
             uploaded_within_days=req.uploaded_within_days,
             target_pool=req.target_pool,
+            max_results=req.max_results,
+            crawl=_crawl_config(req),
+            deadline_seconds=req.deadline_seconds,
+            request_budget=req.request_budget,
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Multi-tap discovery failed: {e}")
@@ -126,7 +233,10 @@ async def multi_tap_discover_endpoint(req: MultiTapDiscoverRequest):
 
 @app.post("/multi-tap-discover-stream")
 async def multi_tap_discover_stream(req: MultiTapDiscoverRequest):
-    """Streaming multi-tap discovery with SSE progress events."""
+    """
+    Streaming multi-tap discovery with SSE progress events. `candidates`
+    events carry partial result batches as taps find them.
+    """
 
     async def event_stream():
         progress_queue: asyncio.Queue = asyncio.Queue()
@@ -142,36 +252,107 @@ async def multi_tap_discover_stream(req: MultiTapDiscoverRequest):
             seed_url=req.seed_url,
             uploaded_within_days=req.uploaded_within_days,
             target_pool=req.target_pool,
+            max_results=req.max_results,
+            crawl=_crawl_config(req),
+            deadline_seconds=req.deadline_seconds,
+            request_budget=req.request_budget,
             progress_callback=on_progress,
         ))
 
         while not task.done():
             try:
                 msg = await asyncio.wait_for(progress_queue.get(), timeout=0.5)
-                yield f"event: {msg['event']}\ndata: {json.dumps(msg['data'])}\n\n"
+                yield f"event: {msg['event']}\ndata: {codec.dumps(msg['data'])}\n\n"
             except asyncio.TimeoutError:
                 continue
 
         # Drain remaining queued events
         while not progress_queue.empty():
             msg = await progress_queue.get()
-            yield f"event: {msg['event']}\ndata: {json.dumps(msg['data'])}\n\n"
+            yield f"event: {msg['event']}\ndata: {codec.dumps(msg['data'])}\n\n"
 
         result = await task
-        yield f"event: complete\ndata: {json.dumps(result)}\n\n"
+        yield f"event: complete\ndata: {codec.dumps(result)}\n\n"
 
     return StreamingResponse(event_stream(), media_type="text/event-stream")
 
 
 @app.post("/deep-scrape")
-async def deep_scrape_endpoint(req: DeepScrapeRequest):
-    """Deep scrape candidates for emails — batch enrichment."""
+async def deep_scrape_endpoint(req: DeepScrapeRequest, request: Request):
+    """
+    Deep scrape candidates for emails — batch enrichment. With Accept:
+    application/x-ndjson, each result is streamed as it completes, then a
+    summary record.
+    """
     if not req.candidates:
         raise HTTPException(status_code=400, detail="No candidates provided")
 
+    if _wants_ndjson(request):
+        async def ndjson_stream():
+            total = emails_found = failed = 0
+            try:
+                async for result in iter_deep_scrape(
+                    scraper, req.candidates, concurrency=5, force_refresh=req.force_refresh,
+                ):
+                    total += 1
+                    emails_found += 1 if result.get("email") else 0
+                    failed += 0 if result.get("success") else 1
+                    yield _ndjson_line({"type": "result", **result})
+                yield _ndjson_line({"type": "summary", "total": total, "emails_found": emails_found, "failed": failed})
+            except Exception as e:
+                yield _ndjson_line({
+                    "type": "summary", "total": total, "emails_found": emails_found, "failed": failed, "error": str(e),
+                })
+
+        return StreamingResponse(ndjson_stream(), media_type=NDJSON)
+
     try:
-        results = await deep_scrape_batch(scraper, req.candidates, concurrency=5)
+        results = await deep_scrape_batch(
+            scraper, req.candidates, concurrency=5, force_refresh=req.force_refresh,
+        )
         emails_found = sum(1 for r in results if r.get("email"))
-        return {"results": results, "total": len(results), "emails_found": emails_found}
+        failed = sum(1 for r in results if not r.get("success"))
+        return {"results": results, "total": len(results), "emails_found": emails_found, "failed": failed}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Deep scrape failed: {e}")
+
+
+@app.post("/filter-candidates")
+async def filter_candidates_endpoint(req: FilterCandidatesRequest):
+    """
+    Re-filter an existing candidate pool with new ranges, without re-discovering.
+    Discovery rows carry modified_at, so building the columns parses no dates.
+    """
+    rows = req.candidates
+    followers_key = "followers" if rows and "followers" in rows[0] else "followers_count"
+    batch = CandidateBatch(rows, followers_key=followers_key)
+    passed, stats = batch.filter(
+        req.min_followers, req.max_followers, recency_cutoff(req.uploaded_within_days),
+        missing_tracks_ok=True,
+    )
+    return {"results": passed, "filtered_count": len(passed), "filter_stats": stats}
+
+
+@app.get("/email-rules")
+async def get_email_rules():
+    """Sizes of the active email junk rules."""
+    return rule_stats()
+
+
+@app.post("/email-rules")
+async def set_email_rules(req: EmailRulesRequest):
+    """Replace the extra email junk rules (built-in rules are always kept)."""
+    terms = [
+        str(row.get("term", "")).strip() for row in req.blocked_terms if row.get("type") == "email_domain"
+    ]
+    # The dashboard matches blocked terms as substrings, so a dotless term
+    # like "gmail" is a pattern here, not a domain
+    domains = req.junk_domains + [t for t in terms if "." in t]
+    patterns = req.junk_patterns + [t for t in terms if t and "." not in t]
+    return reload_rules(domains, patterns)
+
+
+@app.post("/classify-emails")
+async def classify_emails_endpoint(req: ClassifyEmailsRequest):
+    """Validate + junk-check a batch of addresses."""
+    return {"results": [asdict(v) for v in classify_emails(req.emails)]}
@@ -0,0 +1,116 @@
+"""
+SoundCloud client_id management.
+One coordinated refresh per key rotation (lock + generation counter), with
+the last good id persisted to disk so cold starts don't wait on soundcloud.com.
+"""
+import os
+import re
+import json
+import time
+import asyncio
+import logging
+from typing import Optional
+
+import httpx
+
+from .models import state_path
+
+logger = logging.getLogger(__name__)
+
+
+CLIENT_ID_PATH = state_path("SC_CLIENT_ID_PATH", "data/sc_client_id.json")
+
+_SCRIPT_RE = re.compile(r'src="(https://a-v2\.sndcdn\.com/assets/[^"]+\.js)"')
+_CLIENT_ID_RE = re.compile(r'client_id:"([a-zA-Z0-9]+)"')
+
+
+class ClientIdManager:
+    """
+    Holds the current client_id. The first caller to see a 401 refreshes it;
+    callers that hit a 401 with an older generation just wait for that
+    refresh and retry with the new id.
+    """
+
+    def __init__(self, default: str, path: Optional[str] = CLIENT_ID_PATH) -> None:
+        self.client_id = default
+        self.generation = 0
+        self.path = path
+        self._lock = asyncio.Lock()
+        self.refreshes = 0
+        self.failures = 0
+        self.last_refresh: Optional[float] = None
+
+    def load(self) -> bool:
+        """Load the last good client_id from disk. Returns True if one was found."""
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            cid = data.get("client_id")
+            if not cid:
+                return False
+            self.client_id = cid
+            self.last_refresh = data.get("fetched_at")
+            logger.info(f"Loaded persisted client_id: {cid[:8]}...")
+            return True
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load persisted client_id: {e}")
+            return False
+
+    async def refresh(self, client: httpx.AsyncClient, seen_generation: Optional[int] = None) -> bool:
+        """
+        Scrape a fresh client_id. If seen_generation is given and another
+        caller already refreshed since then, return immediately.
+        """
+        async with self._lock:
+            if seen_generation is not None and self.generation != seen_generation:
+                return True
+            cid = await _scrape_client_id(client)
+            if not cid:
+                self.failures += 1
+                return False
+            self.client_id = cid
+            self.generation += 1
+            self.refreshes += 1
+            self.last_refresh = time.time()
+            self._save()
+            logger.info(f"Refreshed client_id: {cid[:8]}...")
+            return True
+
+    def stats(self) -> dict:
+        return {
+            "generation": self.generation,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "last_refresh": self.last_refresh,
+        }
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({"client_id": self.client_id, "fetched_at": self.last_refresh}, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning(f"Could not persist client_id: {e}")
+
+
+async def _scrape_client_id(client: httpx.AsyncClient) -> Optional[str]:
+    """Scrape a client_id from SoundCloud's JS bundles."""
+    try:
+        html = await client.get("https://soundcloud.com/", headers={"Accept": "text/html"})
+        if html.status_code != 200:
+            return None
+        for script_url in _SCRIPT_RE.findall(html.text)[-3:]:
+            js = await client.get(script_url)
+            if js.status_code == 200:
+                m = _CLIENT_ID_RE.search(js.text)
+                if m:
+                    return m.group(1)
+        return None
+    except Exception:
+        return None
@@ -0,0 +1,95 @@
+"""
+JSON codec for SoundCloud responses and streamed output.
+
+Uses orjson when it's installed, the stdlib json module otherwise. For track
+collections where only the artists matter, extract_users() pulls the
+`collection[*].user` objects. With orjson a full parse is already as fast
+as anything smarter, so it just does that. Without it, user keys are
+located by scanning the raw text and only those objects are decoded — on a
+200-track page about twice as fast as json.loads (see
+benchmarks/bench_codec.py).
+"""
+import re
+import json
+from typing import Any, Optional
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+# A "user" key opening an object (literal prefix, so the scan stays in C)
+_USER_KEY = re.compile(r'"user"\s*:\s*(?=\{)')
+_NEXT_HREF = re.compile(r'"next_href"\s*:\s*("(?:[^"\\]|\\.)*"|null)')
+
+_decoder = json.JSONDecoder()
+
+
+def loads(data: bytes | str) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> str:
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            pass  # e.g. ints past 64 bits — json copes
+    return json.dumps(obj)
+
+
+def extract_users(data: bytes | str) -> tuple[list[dict], Optional[str]]:
+    """
+    (users, next_href) from a track collection page (/search/tracks,
+    playlists' tracks, toptracks). One user per track, in page order,
+    duplicates included. Raises ValueError on malformed JSON.
+    """
+    if orjson is not None:
+        return _users_from_page(orjson.loads(data))
+    return _scan_users(data)
+
+
+def _scan_users(data: bytes | str) -> tuple[list[dict], Optional[str]]:
+    """extract_users() without orjson: find user keys in the text, decode just those."""
+    text = data.decode("utf-8") if isinstance(data, (bytes, bytearray)) else data
+    users: list[dict] = []
+    pos = 0
+    while match := _USER_KEY.search(text, pos):
+        pos = match.end()
+        if not _is_key(text, match.start()):
+            continue
+        user, pos = _decoder.raw_decode(text, pos)
+        if isinstance(user, dict) and (user.get("kind") == "user" or "id" in user):
+            users.append(user)
+    if not users:
+        # Empty, malformed or not a collection page — let the full parse decide
+        return _users_from_page(loads(text))
+
+    next_href = None
+    # The top-level next_href follows the collection, so take the last one
+    for match in _NEXT_HREF.finditer(text, pos):
+        next_href = json.loads(match.group(1))
+    return users, next_href
+
+
+def _is_key(text: str, start: int) -> bool:
+    """
+    A real key follows { or ,. Inside a string the quote would be escaped,
+    so '"user":' preceded by either can't be string content.
+    """
+    i = start - 1
+    while i >= 0 and text[i] in " \t\r\n":
+        i -= 1
+    return i >= 0 and text[i] in "{,"
+
+
+def _users_from_page(page: Any) -> tuple[list[dict], Optional[str]]:
+    if not isinstance(page, dict):
+        raise ValueError("Expected a collection object")
+    users = [t["user"] for t in page.get("collection") or () if isinstance(t, dict) and t.get("user")]
+    return users, page.get("next_href")
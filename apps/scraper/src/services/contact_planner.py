@@ -0,0 +1,231 @@
+"""
+Contact-page planning for artist websites.
+
+Instead of probing a fixed list of subpaths, rank the homepage's own
+anchors (path + link text) and, when the homepage links nothing useful,
+the site's sitemap.xml. Paths that actually yielded an email are learned
+and persisted, so they rank higher on later runs — and are the fallback
+for JS-only sites that expose no anchors at all.
+"""
+import os
+import re
+import json
+import time
+import asyncio
+import logging
+from typing import Optional
+from urllib.parse import urljoin, urlparse
+
+from .models import state_path
+
+logger = logging.getLogger(__name__)
+
+
+CONTACT_PATHS_PATH = state_path("SC_CONTACT_PATHS_PATH", "data/contact_paths.json")
+
+# Keyword → prior that a page matching it shows a contact address
+CONTACT_HINTS = {
+    "contact": 1.0, "kontakt": 1.0, "booking": 0.95, "bookings": 0.95,
+    "book": 0.7, "management": 0.8, "mgmt": 0.8, "enquiries": 0.8,
+    "inquiries": 0.8, "get-in-touch": 0.9, "press": 0.6, "epk": 0.6,
+    "about": 0.5, "info": 0.4, "impressum": 0.7, "imprint": 0.7,
+}
+# Used only when nothing better is known (no anchors, no sitemap)
+DEFAULT_PATHS = ["/contact", "/booking", "/about"]
+
+_ANCHOR_RE = re.compile(r"<a\s[^>]*?href\s*=\s*[\"']([^\"'#]+)[\"'][^>]*>(.*?)</a>", re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]+>")
+_LOC_RE = re.compile(r"<loc>\s*([^<\s]+)\s*</loc>", re.IGNORECASE)
+_WORD_RE = re.compile(r"[a-z]+(?:-[a-z]+)*")
+_SKIP_EXT = (".jpg", ".jpeg", ".png", ".gif", ".svg", ".pdf", ".mp3", ".wav", ".zip", ".css", ".js")
+
+
+def contact_links(base_url: str, html: str, limit: int = 8) -> list[str]:
+    """Same-site anchors that look like contact pages, best first."""
+    scored: dict[str, float] = {}
+    for href, label in _ANCHOR_RE.findall(html):
+        url = _same_site(base_url, href)
+        if not url:
+            continue
+        text = _TAG_RE.sub(" ", label).lower()
+        score = max(_score_path(urlparse(url).path), _score_words(text))
+        if score > 0:
+            scored[url] = max(score, scored.get(url, 0))
+    return sorted(scored, key=scored.get, reverse=True)[:limit]
+
+
+def sitemap_links(base_url: str, xml: str, limit: int = 8) -> list[str]:
+    """Contact-like pages listed in a sitemap, best first."""
+    scored: dict[str, float] = {}
+    for loc in _LOC_RE.findall(xml):
+        url = _same_site(base_url, loc)
+        if url:
+            score = _score_path(urlparse(url).path)
+            if score > 0:
+                scored[url] = score
+    return sorted(scored, key=scored.get, reverse=True)[:limit]
+
+
+class ContactPlanner:
+    """
+    Picks which subpages of a site to fetch. Link-derived candidates are
+    re-ranked by the learned hit rate of their path; learned paths fill in
+    when the site gave us nothing to go on.
+    """
+
+    def __init__(self, path: Optional[str] = CONTACT_PATHS_PATH, max_pages: int = 3, save_interval: float = 30.0) -> None:
+        self.path = path
+        self.max_pages = max_pages
+        self.save_interval = save_interval
+        self._paths: dict[str, list[int]] = {}  # normalized path -> [tries, hits]
+        self._dirty = False
+        self._last_save = 0.0
+        self._saving: Optional[asyncio.Future] = None
+        self.planned = 0
+        self.from_links = 0
+        self.from_sitemap = 0
+        self.from_learned = 0
+
+    def plan(self, base_url: str, linked: list[str], sitemap: Optional[list[str]] = None) -> list[str]:
+        """Up to max_pages URLs to fetch, most promising first."""
+        base = base_url.rstrip("/")
+        if linked:
+            source, candidates = "links", linked
+        elif sitemap:
+            source, candidates = "sitemap", sitemap
+        else:
+            source, candidates = "learned", [base + p for p in self._learned_paths()]
+
+        ranked = sorted(
+            enumerate(candidates),
+            # Learned hit rate first, page order (link score) as tie-break
+            key=lambda item: (-self._hit_rate(urlparse(item[1]).path), item[0]),
+        )
+        picked = [url for _, url in ranked[:self.max_pages]]
+        self.planned += len(picked)
+        if source == "links":
+            self.from_links += len(picked)
+        elif source == "sitemap":
+            self.from_sitemap += len(picked)
+        else:
+            self.from_learned += len(picked)
+        return picked
+
+    def record(self, url: str, hit: bool) -> None:
+        """Feed back whether fetching url produced an email."""
+        key = _path_key(urlparse(url).path)
+        if not key:
+            return
+        stats = self._paths.setdefault(key, [0, 0])
+        stats[0] += 1
+        stats[1] += int(hit)
+        self._dirty = True
+        if hit and time.time() - self._last_save > self.save_interval:
+            self._save_in_background()
+
+    def load(self) -> None:
+        """Read the learned paths (blocking — run it off the event loop)."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            self._paths = {k: [int(v[0]), int(v[1])] for k, v in data.get("paths", {}).items()}
+        except (OSError, ValueError, TypeError, IndexError) as e:
+            logger.warning(f"Could not load contact paths: {e}")
+
+    def save(self) -> None:
+        """Write the learned paths now (blocking — run it off the event loop)."""
+        if not self.path or not self._dirty:
+            return
+        self._write(self._snapshot())
+
+    async def aclose(self) -> None:
+        """Let a background save finish, then write whatever is left."""
+        if self._saving:
+            await self._saving
+        await asyncio.to_thread(self.save)
+
+    def stats(self) -> dict:
+        top = sorted(self._paths.items(), key=lambda kv: kv[1][1], reverse=True)[:5]
+        return {
+            "planned": self.planned,
+            "from_links": self.from_links,
+            "from_sitemap": self.from_sitemap,
+            "from_learned": self.from_learned,
+            "known_paths": len(self._paths),
+            "top_paths": {p: {"tries": t, "hits": h} for p, (t, h) in top},
+        }
+
+    # ── Internals ─────────────────────────────────────────────────────
+
+    def _save_in_background(self) -> None:
+        if not self.path or (self._saving and not self._saving.done()):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.save()
+            return
+        self._saving = loop.create_task(asyncio.to_thread(self._write, self._snapshot()))
+
+    def _snapshot(self) -> str:
+        self._dirty = False
+        self._last_save = time.time()
+        return json.dumps({"paths": self._paths})
+
+    def _write(self, data: str) -> None:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w") as f:
+                f.write(data)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            self._dirty = True
+            logger.warning(f"Could not persist contact paths: {e}")
+
+    def _hit_rate(self, path: str) -> float:
+        tries, hits = self._paths.get(_path_key(path), (0, 0))
+        # Smoothed toward the keyword prior so one lucky hit doesn't dominate
+        return (hits + _score_path(path)) / (tries + 1)
+
+    def _learned_paths(self) -> list[str]:
+        learned = sorted(
+            (p for p, (_, hits) in self._paths.items() if hits),
+            key=lambda p: self._hit_rate(p), reverse=True,
+        )
+        return learned + [p for p in DEFAULT_PATHS if p not in learned]
+
+
+def _same_site(base_url: str, href: str) -> Optional[str]:
+    href = href.strip()
+    if href.lower().startswith(("mailto:", "tel:", "javascript:")):
+        return None
+    url = urljoin(base_url, href)
+    parsed, base = urlparse(url), urlparse(base_url)
+    if parsed.scheme not in ("http", "https"):
+        return None
+    if parsed.netloc.lower().removeprefix("www.") != base.netloc.lower().removeprefix("www."):
+        return None
+    path = parsed.path.rstrip("/")
+    if not path or path.lower().endswith(_SKIP_EXT):
+        return None
+    return f"{parsed.scheme}://{parsed.netloc}{path}"
+
+
+def _path_key(path: str) -> str:
+    return "/" + "/".join(s for s in path.lower().split("/") if s)[:80] if path.strip("/") else ""
+
+
+def _score_path(path: str) -> float:
+    return _score_words(path.lower().replace("_", "-"))
+
+
+def _score_words(text: str) -> float:
+    best = 0.0
+    for word in _WORD_RE.findall(text):
+        best = max(best, CONTACT_HINTS.get(word, 0.0))
+        for part in word.split("-"):
+            best = max(best, CONTACT_HINTS.get(part, 0.0))
+    return best
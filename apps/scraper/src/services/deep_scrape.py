@@ -4,14 +4,33 @@ Ported from TempoV3's Smart Lead Generator Phase 4.
 """
 import asyncio
 import logging
-from typing import Optional, Any
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Optional
 
-from .models import SC_API, normalize_url
+from .models import normalize_url
 from .email_utils import extract_email, validate_email, is_junk_email
 from .email_scraper import find_email_from_links
+from .enrichment_store import EnrichmentStore, PROFILE_FIELDS
+from .pipeline import AdaptiveLimit, Stage, run_pipeline
 
 logger = logging.getLogger(__name__)
 
+# Upper bounds for the adaptive per-stage concurrency. SoundCloud calls are
+# throttled by the scraper's limiter anyway; external fetches are mostly waiting.
+SC_STAGE_MAX = 8
+EMAIL_STAGE_MAX = 24
+
+_END = object()
+
+
+@dataclass
+class SoundCloudProfile:
+    """Everything the SoundCloud half of a deep scrape fetched."""
+    user: dict
+    web_profiles: list[dict]
+    recent_track: Optional[dict]
+
 
 async def deep_scrape_artist(
     scraper: Any,  # SoundCloudScraper instance
@@ -22,38 +41,57 @@ async def deep_scrape_artist(
     Deep scrape a single artist: fetch web-profiles, run multi-strategy
     email extraction, collect social links, latest track info.
     """
+    profile = await fetch_sc_profile(scraper, sc_url, sc_user_id)
+    if isinstance(profile, dict):
+        return profile
+    return await enrich_profile(scraper, sc_url, profile)
+
+
+async def fetch_sc_profile(
+    scraper: Any,
+    sc_url: str,
+    sc_user_id: Optional[int] = None,
+) -> SoundCloudProfile | dict:
+    """SoundCloud half: user, web-profiles, latest track. A dict means it failed."""
     try:
         # Resolve user — shortcut if we have the ID
         if sc_user_id:
-            params = {"client_id": scraper.client_id}
-            resp = await scraper._get(f"{SC_API}/users/{sc_user_id}", params)
-            if resp.status_code == 401:
-                await scraper._refresh_id()
-                params["client_id"] = scraper.client_id
-                resp = await scraper._get(f"{SC_API}/users/{sc_user_id}", params)
-            if resp.status_code != 200:
-                return {"url": sc_url, "success": False, "error": f"User fetch failed: {resp.status_code}"}
-            user = resp.json()
+            user, status = await scraper._fetch_user(sc_user_id)
+            if not user:
+                error = f"User fetch failed: {status}" if status else "User fetch failed"
+                return {"url": sc_url, "success": False, "error": error}
         else:
             clean = normalize_url(sc_url)
             user = await scraper._resolve(clean)
             if not user:
                 return {"url": sc_url, "success": False, "error": "Could not resolve user"}
 
-        user_id = user.get("id")
-        username = user.get("username") or user.get("full_name") or "Unknown"
-
         # Fetch web-profiles + latest track concurrently
         wp_result, track_result = await asyncio.gather(
-            scraper._web_profiles(user_id),
-            scraper._get_latest_track(user_id),
+            scraper._web_profiles(user.get("id")),
+            scraper._get_latest_track(user.get("id")),
             return_exceptions=True,
         )
         web_profiles = wp_result if isinstance(wp_result, list) else []
         recent_track = track_result if isinstance(track_result, dict) else None
+        return SoundCloudProfile(user, web_profiles, recent_track)
+    except Exception as e:
+        logger.error(f"deep_scrape_artist failed for {sc_url}: {e}")
+        return {"url": sc_url, "success": False, "error": str(e)}
+
+
+async def enrich_profile(scraper: Any, sc_url: str, profile: SoundCloudProfile) -> dict:
+    """External half: email strategies over linked sites, then the result row."""
+    user, web_profiles, recent_track = profile.user, profile.web_profiles, profile.recent_track
+    try:
+        user_id = user.get("id")
+        username = user.get("username") or user.get("full_name") or "Unknown"
 
         # Multi-strategy email extraction
-        email, email_source = await find_email_from_links(scraper._client, user, web_profiles)
+        email, email_source = await find_email_from_links(
+            scraper._external, user, web_profiles,
+            cache=scraper._fetch_cache, planner=scraper._contacts,
+        )
 
         # Fallback to bio regex
         if not email:
@@ -129,6 +167,7 @@ async def deep_scrape_artist(
             "latest_track_title": track_title,
             "latest_track_url": track_url,
             "latest_track_plays": track_plays,
+            "last_modified": user.get("last_modified"),
             "success": True,
         }
     except Exception as e:
@@ -140,24 +179,143 @@ async def deep_scrape_batch(
     scraper: Any,
     candidates: list[dict],
     concurrency: int = 5,
+    force_refresh: bool = False,
 ) -> list[dict]:
+    """Deep scrape a batch of candidates, results in completion order (see iter_deep_scrape)."""
+    return [r async for r in iter_deep_scrape(scraper, candidates, concurrency, force_refresh)]
+
+
+async def iter_deep_scrape(
+    scraper: Any,
+    candidates: list[dict],
+    concurrency: int = 5,
+    force_refresh: bool = False,
+) -> AsyncIterator[dict]:
+    """
+    Yield each candidate's result as soon as it completes.
+
+    Runs as two pipelined stages joined by a bounded queue: SoundCloud
+    (store reuse, user, web-profiles, latest track) and external email
+    discovery. Each stage's concurrency adapts to its own latency and
+    error rate, so slow artist websites never hold SoundCloud slots.
+    """
+    async with aclosing(iter_deep_scrape_indexed(scraper, candidates, concurrency, force_refresh)) as results:
+        async for _, result in results:
+            yield result
+
+
+async def iter_deep_scrape_indexed(
+    scraper: Any,
+    candidates: list[dict],
+    concurrency: int = 5,
+    force_refresh: bool = False,
+) -> AsyncIterator[tuple[int, dict]]:
+    """Like iter_deep_scrape, but yields (position in candidates, result)."""
+    store: Optional[EnrichmentStore] = getattr(scraper, "_enrichment", None)
+    out: asyncio.Queue = asyncio.Queue()
+
+    # The SC stage runs at most SC_STAGE_MAX lookups at a time, too few to
+    # fill a /users?ids= batch — hydrate every known id in full chunks first
+    hydrator = getattr(scraper, "_hydrator", None)
+    if hydrator:
+        await hydrator.prefetch(c["sc_user_id"] for c in candidates if c.get("sc_user_id"))
+
+    async def _sc_stage(item: tuple[int, dict]) -> list:
+        i, candidate = item
+        if store and store.enabled and not force_refresh:
+            reused = await _reuse_stored(scraper, store, candidate)
+            if reused:
+                return [(i, reused)]
+        url = candidate.get("url", "")
+        profile = await fetch_sc_profile(scraper, url, candidate.get("sc_user_id"))
+        return [(i, profile if isinstance(profile, dict) else (url, profile))]
+
+    async def _email_stage(item: tuple[int, dict | tuple[str, SoundCloudProfile]]) -> list[tuple[int, dict]]:
+        i, found = item
+        if isinstance(found, dict):
+            return [item]  # finished upstream (reused or failed)
+        result = await enrich_profile(scraper, *found)
+        if store and result.get("success"):
+            store.rescraped += 1
+            await store.put(result, result.get("last_modified"))
+        return [(i, result)]
+
+    stages = [
+        Stage(
+            "soundcloud", _sc_stage, queue_size=concurrency * 2,
+            limit=AdaptiveLimit(initial=concurrency, max_limit=max(concurrency, SC_STAGE_MAX)),
+            failed=lambda item: isinstance(item[1], dict) and not item[1].get("success") and not item[1].get("cached"),
+            on_error=_failed_result,
+        ),
+        Stage(
+            "email", _email_stage, queue_size=concurrency * 2,
+            limit=AdaptiveLimit(initial=concurrency, max_limit=max(concurrency, EMAIL_STAGE_MAX)),
+            on_error=_failed_result,
+        ),
+    ]
+    pipeline = asyncio.create_task(run_pipeline(enumerate(candidates), stages, sink=out.put))
+    pipeline.add_done_callback(lambda _: out.put_nowait(_END))
+    try:
+        while (result := await out.get()) is not _END:
+            yield result
+        metrics = await pipeline
+        logger.debug(f"Deep scrape pipeline: {metrics}")
+    finally:
+        # Consumer went away (e.g. client disconnected) — stop the rest
+        pipeline.cancel()
+
+
+def _failed_result(item: tuple[int, Any], error: Exception) -> list[tuple[int, dict]]:
+    """Result row for a candidate whose stage raised, so it isn't silently lost."""
+    i, found = item
+    url = found.get("url", "") if isinstance(found, dict) else found[0]
+    return [(i, {"url": url, "success": False, "error": str(error) or "Deep scrape failed"})]
+
+
+async def _reuse_stored(scraper: Any, store: EnrichmentStore, candidate: dict) -> Optional[dict]:
     """
-    Deep scrape a batch of candidates concurrently.
-    Each candidate dict should have 'url' and optionally 'sc_user_id'.
+    The stored result for an unchanged artist, with stale cheap fields
+    (profile counts, latest track) refreshed. None means deep scrape it.
     """
-    sem = asyncio.Semaphore(concurrency)
-    results: list[dict] = []
-
-    async def _scrape_one(candidate: dict) -> dict:
-        async with sem:
-            return await deep_scrape_artist(
-                scraper,
-                sc_url=candidate.get("url", ""),
-                sc_user_id=candidate.get("sc_user_id"),
-            )
-
-    tasks = [_scrape_one(c) for c in candidates]
-    for coro in asyncio.as_completed(tasks):
-        result = await coro
-        results.append(result)
-    return results
+    record = await store.get(candidate.get("sc_user_id"), candidate.get("url"))
+    if not record:
+        return None
+    stale = record.stale_groups(store.ttls)
+    if stale & {"email", "socials"}:
+        return None
+
+    # Discovery candidates carry last_modified; otherwise one hydrated
+    # (batched, cached) user lookup tells us whether the profile changed
+    user = None
+    last_modified = candidate.get("last_modified")
+    if not last_modified or not candidate.get("sc_user_id"):
+        user = await scraper._get_user(record.sc_user_id)
+        if not user:
+            return None
+        last_modified = user.get("last_modified")
+    if not last_modified or last_modified != record.last_modified:
+        return None
+
+    result = dict(record.result)
+    if user:
+        for key, sc_key in PROFILE_FIELDS.items():
+            if sc_key in user:
+                result[key] = user[sc_key]
+    else:
+        for key in PROFILE_FIELDS:
+            if key in candidate:
+                result[key] = candidate[key]
+
+    if "track" in stale:
+        track = await scraper._get_latest_track(record.sc_user_id)
+        result["latest_track_title"] = track.get("title") if track else None
+        result["latest_track_url"] = track.get("permalink_url") if track else None
+        result["latest_track_plays"] = track.get("playback_count") if track else None
+        store.partial_refreshes += 1
+        await store.put(result, last_modified, groups={"track"}, previous=record)
+    else:
+        store.reused += 1
+
+    result["url"] = candidate.get("url") or result.get("url")
+    result["cached"] = True
+    return result
@@ -1,26 +1,62 @@
 """
 Async email extraction from artist profiles — linktree, websites, Instagram.
-Requires an httpx.AsyncClient to make HTTP requests.
+Requires an ExternalPool (third-party connection pool) to make HTTP requests.
 """
+import os
 import re
-from typing import Optional
+import codecs
+import asyncio
+from functools import partial
+from typing import Awaitable, Callable, Optional, Union
+from urllib.parse import urlparse
 
 import httpx
 
 from .email_utils import (
     extract_email, validate_email, is_junk_email,
-    SKIP_DOMAINS, LINKTREE_DOMAINS,
+    SKIP_DOMAINS, LINKTREE_DOMAINS, JUNK_EMAIL_DOMAINS, DomainTrie, StreamingEmailScanner,
 )
+from .http_pools import ExternalPool
+from .fetch_cache import FetchCache, FetchResult
+from .link_in_bio import parse_link_page
+from .contact_planner import ContactPlanner, contact_links, sitemap_links
+
+# Stop scanning a page after this many bytes
+SCAN_MAX_BYTES = int(os.environ.get("EMAIL_SCAN_MAX_BYTES", 1_000_000))
+# Only pages that can plausibly show a contact address
+SCANNABLE_TYPES = ("text/html", "application/xhtml", "text/plain")
+# Statuses cached as "no email here" for the long negative TTL
+GONE_STATUSES = (404, 410)
+# Homepage outcomes that rule out probing the rest of the site
+FAILED_REASONS = ("status", "timeout", "error", "circuit_open")
+# Wall-clock budget for all external probes of one artist
+ARTIST_BUDGET = float(os.environ.get("EMAIL_ARTIST_BUDGET", 20.0))
+# Outbound websites followed from a link-in-bio page that had no email
+LINK_HOPS = 2
+# Anchors are only collected from the start of a homepage (nav, header)
+ANCHOR_SCAN_BYTES = 256_000
+# sitemap.xml is only worth it while small
+SITEMAP_MAX_BYTES = 128_000
+# Hosts that are never an artist's own website
+_PLATFORMS = DomainTrie(JUNK_EMAIL_DOMAINS | SKIP_DOMAINS | LINKTREE_DOMAINS)
+
+ProbeResult = Union[Optional[str], tuple[Optional[str], str]]
 
 
 async def find_email_from_links(
-    client: httpx.AsyncClient,
+    client: ExternalPool,
     user: dict,
     web_profiles: list[dict],
+    budget: float = ARTIST_BUDGET,
+    cache: Optional[FetchCache] = None,
+    planner: Optional[ContactPlanner] = None,
 ) -> tuple[Optional[str], str]:
     """
     Multi-strategy email finder. Returns (email, source).
     Source is one of: 'sc_profile', 'linktree', 'website', 'instagram', or ''.
+    External probes race within `budget` seconds per artist; page results
+    go through `cache` so pages shared across artists are fetched once.
+    `planner` picks which website subpages to fetch and learns from hits.
     """
     # Strategy 0: Direct email in web_profiles
     for wp in web_profiles:
@@ -56,74 +92,305 @@ async def find_email_from_links(
             all_urls.append(link)
 
     for url in all_urls:
-        ul = url.lower()
-        domain = ul.split("//")[-1].split("/")[0].lstrip("www.")
-        if domain in SKIP_DOMAINS:
-            if "instagram.com" in ul and not ig_url:
+        kind = _link_kind(url)
+        if kind == "skip":
+            if "instagram.com" in url.lower() and not ig_url:
                 ig_url = url
             continue
-        if domain in LINKTREE_DOMAINS:
+        if kind == "linktree":
             linktrees.append(url)
         else:
             websites.append(url)
 
-    # Strategy 1: Linktree / link-in-bio
-    for url in linktrees[:2]:
-        email = await _fetch_email(client, url)
-        if email and not is_junk_email(email):
-            return email, "linktree"
+    if planner is None:
+        planner = ContactPlanner(path=None)
 
-    # Strategy 2: Personal websites + subpages
+    # Probes in priority order: linktree > website (homepage, then planned subpages) > instagram.
+    # They all run concurrently; the race keeps this order when picking a winner.
+    probes: list[tuple[str, Callable[[], Awaitable[ProbeResult]]]] = []
+    for url in linktrees[:2]:
+        probes.append(("linktree", partial(_probe_link_page, client, url, cache, planner, websites[:2])))
     for url in websites[:2]:
-        email = await _fetch_email(client, url)
+        probes.append(("website", partial(_probe_website, client, url, cache, planner)))
+    if ig_url:
+        probes.append(("instagram", partial(_scrape_ig_email, client, ig_url)))
+
+    return await _race_probes(probes, budget)
+
+
+async def _race_probes(
+    probes: list[tuple[str, Callable[[], Awaitable[ProbeResult]]]],
+    budget: float,
+) -> tuple[Optional[str], str]:
+    """
+    Run probes concurrently and return the highest-priority hit. A probe
+    returns an email, or (email, source) when the source isn't its label.
+
+    A hit wins as soon as every probe ranked above it has finished empty,
+    since nothing better can still arrive; the rest are cancelled. When
+    the budget runs out, the best hit so far wins.
+    """
+    if not probes:
+        return None, ""
+
+    async def _run(label: str, fn: Callable[[], Awaitable[ProbeResult]]) -> tuple[Optional[str], str]:
+        found = await fn()
+        email, source = found if isinstance(found, tuple) else (found, label)
+        return (email, source) if email and not is_junk_email(email) else (None, label)
+
+    tasks = [asyncio.ensure_future(_run(label, fn)) for label, fn in probes]
+    rank = {task: i for i, task in enumerate(tasks)}
+    results: list[tuple[Optional[str], str]] = [(None, label) for label, _ in probes]
+    finished = [False] * len(tasks)
+    deadline = asyncio.get_running_loop().time() + budget
+    pending = set(tasks)
+    try:
+        while pending:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                i = rank[task]
+                finished[i] = True
+                if not task.cancelled() and task.exception() is None:
+                    results[i] = task.result()
+            # Walk down the priority list until an unfinished probe blocks us
+            for i in range(len(tasks)):
+                if results[i][0]:
+                    return results[i]
+                if not finished[i]:
+                    break
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    for email, source in results:
+        if email:
+            return email, source
+    return None, ""
+
+
+def _link_kind(url: str) -> str:
+    """'skip' (social platform), 'linktree' or 'website'."""
+    domain = url.lower().split("//")[-1].split("/")[0].removeprefix("www.")
+    if domain in SKIP_DOMAINS:
+        return "skip"
+    if domain in LINKTREE_DOMAINS:
+        return "linktree"
+    return "website"
+
+
+async def _probe_link_page(
+    client: ExternalPool,
+    url: str,
+    cache: Optional[FetchCache],
+    planner: ContactPlanner,
+    known_websites: list[str],
+) -> tuple[Optional[str], str]:
+    """
+    (email, source) from a link-in-bio page's embedded data. If it has none,
+    run the website strategy on up to LINK_HOPS outbound artist sites it
+    lists; a hit there is reported as 'website'.
+    """
+    email, links, _ = await _fetch_page(client, url, cache, _fetch_link_page)
+    if email:
+        return email, "linktree"
+
+    known = {w.rstrip("/").lower() for w in known_websites}
+    hops = [
+        link for link in links
+        if _link_kind(link) == "website"
+        and not _PLATFORMS.match(link.lower().split("//")[-1].split("/")[0])
+        and link.rstrip("/").lower() not in known
+    ][:LINK_HOPS]
+    for email in await asyncio.gather(*[_probe_website(client, link, cache, planner) for link in hops]):
         if email and not is_junk_email(email):
+            # Found on the artist's own site, the page only pointed there
             return email, "website"
-        base = url.rstrip("/")
-        for path in ["/contact", "/about", "/booking", "/bookings", "/press", "/info"]:
-            email = await _fetch_email(client, base + path)
-            if email and not is_junk_email(email):
-                return email, "website"
+    return None, "linktree"
 
-    # Strategy 3: Instagram bio
-    if ig_url:
-        email = await _scrape_ig_email(client, ig_url)
-        if email and not is_junk_email(email):
-            return email, "instagram"
 
-    return None, ""
+async def _probe_website(
+    client: ExternalPool,
+    url: str,
+    cache: Optional[FetchCache],
+    planner: ContactPlanner,
+) -> Optional[str]:
+    """
+    Homepage first; if it has no email, fetch only the subpages the planner
+    ranks highest — from the homepage's anchors, else from sitemap.xml,
+    else from paths that worked on other sites.
+    """
+    email, linked, reason = await _fetch_page(client, url, cache, partial(_fetch_page_email, collect_links=True))
+    if email and not is_junk_email(email):
+        return email
+    if reason in FAILED_REASONS:
+        # Site is down, gone or blocking us — its subpages won't do better
+        return None
+
+    sitemap: Optional[list[str]] = None
+    if not linked:
+        parsed = urlparse(url)
+        _, found, _ = await _fetch_page(client, f"{parsed.scheme}://{parsed.netloc}/sitemap.xml", cache, _fetch_sitemap)
+        sitemap = list(found)
+
+    candidates = planner.plan(url, list(linked), sitemap)
+    emails = await asyncio.gather(*[_fetch_email(client, c, cache) for c in candidates])
+    best = None
+    for candidate, email in zip(candidates, emails):
+        hit = bool(email) and not is_junk_email(email)
+        planner.record(candidate, hit)
+        if hit and best is None:
+            best = email
+    return best
 
 
-async def _fetch_email(client: httpx.AsyncClient, url: str) -> Optional[str]:
-    """Fetch a URL and extract the first valid email."""
+async def _fetch_link_page(client: ExternalPool, url: str, headers: dict, max_bytes: int = SCAN_MAX_BYTES) -> FetchResult:
+    """Fetch a link-in-bio page and parse its embedded JSON for emails and links."""
     try:
-        resp = await client.get(url, timeout=httpx.Timeout(8.0), follow_redirects=True)
-        if resp.status_code != 200:
-            return None
-        ct = resp.headers.get("content-type", "")
-        if "text" not in ct and "html" not in ct:
-            return None
-        text = resp.text
-        # mailto: links first (most reliable)
-        mailtos = re.findall(r'mailto:([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,7})', text)
-        for m in mailtos:
-            email = validate_email(m)
-            if email:
-                return email
-        return extract_email(text)
+        async with client.stream("GET", url, headers=headers) as resp:
+            result = _start_result(resp)
+            if result.status != 200 or result.reason:
+                return result
+            decoder = codecs.getincrementaldecoder(resp.charset_encoding or "utf-8")(errors="replace")
+            parts: list[str] = []
+            read = 0
+            async for chunk in resp.aiter_bytes():
+                read += len(chunk)
+                parts.append(decoder.decode(chunk))
+                if read >= max_bytes:
+                    break
+            parts.append(decoder.decode(b"", final=True))
+            page = parse_link_page(url, "".join(parts))
+            result.email = next((e for e in page.emails if not is_junk_email(e)), None)
+            result.links = tuple(page.links)
+            return result
+    except httpx.TimeoutException:
+        return FetchResult(reason="timeout")
     except Exception:
-        return None
+        return FetchResult(reason="error")
+
+
+def _start_result(resp: httpx.Response) -> FetchResult:
+    """FetchResult with status, validators and the negative reason, if any."""
+    result = FetchResult(
+        status=resp.status_code,
+        etag=resp.headers.get("etag"),
+        last_modified=resp.headers.get("last-modified"),
+    )
+    if resp.status_code == 200:
+        ct = resp.headers.get("content-type", "").lower()
+        if not any(t in ct for t in SCANNABLE_TYPES):
+            result.reason = "non_html"
+    elif resp.status_code != 304:
+        result.reason = _status_reason(resp.status_code)
+    return result
+
+
+def _status_reason(status: int) -> str:
+    """Negative reason for a non-200: 'status' if the page is gone, else 'error'."""
+    # 403/408/429/5xx and the like may well succeed later
+    return "status" if status in GONE_STATUSES else "error"
+
+
+async def _fetch_email(
+    client: ExternalPool,
+    url: str,
+    cache: Optional[FetchCache] = None,
+    max_bytes: int = SCAN_MAX_BYTES,
+) -> Optional[str]:
+    """Extract the first valid email from a page, through the fetch cache when given."""
+    email, _, _ = await _fetch_page(client, url, cache, partial(_fetch_page_email, max_bytes=max_bytes))
+    return email
+
+
+async def _fetch_page(
+    client: ExternalPool,
+    url: str,
+    cache: Optional[FetchCache],
+    fetch: Callable[..., Awaitable[FetchResult]],
+) -> tuple[Optional[str], tuple[str, ...], str]:
+    """Run fetch(client, url, headers) for (email, links, reason), through the cache when given."""
+    if cache is None:
+        result = await fetch(client, url, {})
+        return result.email, result.links, result.reason
+    return await cache.fetch_page(url, lambda validators: fetch(client, url, validators))
+
+
+async def _fetch_page_email(
+    client: ExternalPool,
+    url: str,
+    headers: dict,
+    max_bytes: int = SCAN_MAX_BYTES,
+    collect_links: bool = False,
+) -> FetchResult:
+    """
+    Stream a page and extract the first valid email. Stops reading at the
+    first validated mailto: link (most reliable) or after max_bytes. With
+    collect_links, an email-less page also reports its contact-like anchors.
+    """
+    try:
+        async with client.stream("GET", url, headers=headers) as resp:
+            result = _start_result(resp)
+            if result.status != 200 or result.reason:
+                return result
+            scanner = StreamingEmailScanner()
+            decoder = codecs.getincrementaldecoder(resp.charset_encoding or "utf-8")(errors="replace")
+            head: list[str] = []
+            read = 0
+            async for chunk in resp.aiter_bytes():
+                text = decoder.decode(chunk)
+                if collect_links and read < ANCHOR_SCAN_BYTES:
+                    head.append(text)
+                read += len(chunk)
+                result.email = scanner.feed(text)
+                if result.email:
+                    return result
+                if read >= max_bytes:
+                    break
+            scanner.feed(decoder.decode(b"", final=True))
+            result.email = scanner.finish()
+            if collect_links and not result.email:
+                # Resolve relative anchors against where redirects landed
+                result.links = tuple(contact_links(str(resp.url), "".join(head)))
+            return result
+    except httpx.TimeoutException:
+        return FetchResult(reason="timeout")
+    except Exception:
+        return FetchResult(reason="error")
+
+
+async def _fetch_sitemap(client: ExternalPool, url: str, headers: dict) -> FetchResult:
+    """Contact-like pages listed in a (small) sitemap.xml."""
+    try:
+        async with client.stream("GET", url, headers=headers) as resp:
+            result = FetchResult(status=resp.status_code)
+            if resp.status_code == 304:
+                return result
+            if resp.status_code != 200:
+                result.reason = _status_reason(resp.status_code)
+                return result
+            if int(resp.headers.get("content-length") or 0) > SITEMAP_MAX_BYTES:
+                result.reason = "non_html"
+                return result
+            body = bytearray()
+            async for chunk in resp.aiter_bytes():
+                body.extend(chunk)
+                if len(body) > SITEMAP_MAX_BYTES:
+                    break
+            result.links = tuple(sitemap_links(str(resp.url), body.decode("utf-8", errors="replace")))
+            return result
+    except httpx.TimeoutException:
+        return FetchResult(reason="timeout")
+    except Exception:
+        return FetchResult(reason="error")
 
 
-async def _scrape_ig_email(client: httpx.AsyncClient, ig_url: str) -> Optional[str]:
+async def _scrape_ig_email(client: ExternalPool, ig_url: str) -> Optional[str]:
     """Try to extract email from Instagram profile page."""
     try:
-        resp = await client.get(
-            ig_url, timeout=httpx.Timeout(8.0), follow_redirects=True,
-            headers={
-                "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                "Accept": "text/html,application/xhtml+xml",
-            },
-        )
+        resp = await client.get(ig_url)
         if resp.status_code != 200:
             return None
         text = resp.text
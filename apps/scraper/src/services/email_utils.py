@@ -3,7 +3,8 @@ Email extraction, validation, and junk filtering utilities.
 Used by both single scrape and deep scrape flows.
 """
 import re
-from typing import Optional
+from dataclasses import dataclass
+from typing import Iterable, Optional
 
 
 # Junk emails scraped from websites that aren't real artist contacts
@@ -39,56 +40,213 @@ LINKTREE_DOMAINS = {
 }
 
 
+EMAIL_RE = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,7}(?=[^A-Za-z]|$)")
+MAILTO_RE = re.compile(r"mailto:([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,7})")
+
+_HEX_RE = re.compile(r"[0-9a-f]+")
+_LETTER_RE = re.compile(r"[a-zA-Z]")
+_DOMAIN_RE = re.compile(r"[a-zA-Z0-9.-]+\.[a-zA-Z]{2,7}$")
+_FILE_EXTENSIONS = (".png", ".jpg", ".js", ".css", ".svg", ".woff", ".woff2", ".ttf", ".eot")
+
+
+@dataclass
+class EmailVerdict:
+    email: str
+    verdict: str  # 'ok', 'invalid' or 'junk'
+    reason: str = ""
+
+
+class DomainTrie:
+    """Reversed-label trie: one walk answers exact and subdomain matches."""
+
+    _END = ""
+
+    def __init__(self, domains: Iterable[str] = ()) -> None:
+        self._root: dict = {}
+        for d in domains:
+            self.add(d)
+
+    def add(self, domain: str) -> None:
+        node = self._root
+        for label in reversed(domain.lower().strip(".").split(".")):
+            node = node.setdefault(label, {})
+        node[self._END] = domain.lower()
+
+    def match(self, domain: str) -> Optional[str]:
+        """Return the listed domain that `domain` equals or is a subdomain of."""
+        node = self._root
+        for label in reversed(domain.split(".")):
+            node = node.get(label)
+            if node is None:
+                return None
+            if self._END in node:
+                return node[self._END]
+        return None
+
+
+class EmailClassifier:
+    """
+    Compiled validation + junk rules. Junk domains live in a DomainTrie;
+    junk patterns are one compiled alternation scanned in a single pass.
+    """
+
+    def __init__(self, junk_domains: Iterable[str], junk_patterns: Iterable[str]) -> None:
+        self.junk_domains = frozenset(d.lower() for d in junk_domains if d)
+        self.junk_patterns = frozenset(p.lower() for p in junk_patterns if p)
+        self._trie = DomainTrie(self.junk_domains)
+        # Longest first so the reported reason is the most specific pattern
+        alternation = "|".join(re.escape(p) for p in sorted(self.junk_patterns, key=len, reverse=True))
+        self._patterns = re.compile(alternation) if alternation else None
+
+    def invalid_reason(self, email: str) -> str:
+        """Empty string if the address is well-formed, else why it isn't."""
+        if not email or "@" not in email:
+            return "malformed"
+        local, domain = email.split("@", 1)
+        # All-hex local part (JS hashes like 7c33659f530ef43fb4532fc6e83354)
+        if _HEX_RE.fullmatch(local.lower()):
+            return "hex_local"
+        # All-digit local part
+        if local.replace(".", "").replace("-", "").replace("_", "").isdigit():
+            return "numeric_local"
+        if not _LETTER_RE.search(local):
+            return "no_letters"
+        if len(local) > 40:
+            return "local_too_long"
+        if not _DOMAIN_RE.match(domain):
+            return "bad_domain"
+        # File extension false positives
+        if domain.endswith(_FILE_EXTENSIONS):
+            return "file_extension"
+        return ""
+
+    def junk_reason(self, email: str) -> str:
+        """Empty string if the address isn't a known junk/platform address."""
+        lower = email.lower()
+        domain = lower.split("@")[1] if "@" in lower else ""
+        hit = self._trie.match(domain)
+        if hit:
+            return f"junk_domain:{hit}"
+        if self._patterns:
+            m = self._patterns.search(lower)
+            if m:
+                return f"junk_pattern:{m.group(0)}"
+        return ""
+
+    def classify(self, email: str) -> EmailVerdict:
+        reason = self.invalid_reason(email)
+        if reason:
+            return EmailVerdict(email, "invalid", reason)
+        reason = self.junk_reason(email)
+        if reason:
+            return EmailVerdict(email, "junk", reason)
+        return EmailVerdict(email, "ok")
+
+
+_classifier = EmailClassifier(JUNK_EMAIL_DOMAINS, JUNK_EMAIL_PATTERNS)
+
+
+def reload_rules(extra_domains: Iterable[str] = (), extra_patterns: Iterable[str] = ()) -> dict:
+    """
+    Rebuild the classifier from the built-in rules plus extras (e.g. the
+    dashboard's blocked email domains). The swap is atomic for callers.
+    """
+    global _classifier
+    _classifier = EmailClassifier(
+        JUNK_EMAIL_DOMAINS | {d.strip().lower() for d in extra_domains if d.strip()},
+        JUNK_EMAIL_PATTERNS | {p.strip().lower() for p in extra_patterns if p.strip()},
+    )
+    return rule_stats()
+
+
+def rule_stats() -> dict:
+    return {
+        "junk_domains": len(_classifier.junk_domains),
+        "junk_patterns": len(_classifier.junk_patterns),
+    }
+
+
+def classify_emails(emails: list[str]) -> list[EmailVerdict]:
+    """Batch validate + junk check. One verdict per input, in order."""
+    classifier = _classifier
+    seen: dict[str, EmailVerdict] = {}
+    out = []
+    for email in emails:
+        if email not in seen:
+            seen[email] = classifier.classify(email)
+        out.append(seen[email])
+    return out
+
+
 def extract_email(text: str) -> Optional[str]:
     """Extract and validate the first email found in text."""
     if not text:
         return None
-    found = re.findall(
-        r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,7}(?=[^A-Za-z]|$)",
-        text,
-    )
-    for email in found:
-        if validate_email(email):
-            return email
+    classifier = _classifier
+    for m in EMAIL_RE.finditer(text):
+        if not classifier.invalid_reason(m.group(0)):
+            return m.group(0)
     return None
 
 
 def validate_email(email: str) -> Optional[str]:
     """Validate a single email string. Returns it if valid, None if junk."""
-    if not email or "@" not in email:
-        return None
-    local, domain = email.split("@", 1)
-    # All-hex local part (JS hashes like 7c33659f530ef43fb4532fc6e83354)
-    if re.fullmatch(r"[0-9a-f]+", local.lower()):
-        return None
-    # All-digit local part
-    if local.replace(".", "").replace("-", "").replace("_", "").isdigit():
-        return None
-    # No letters at all
-    if not re.search(r"[a-zA-Z]", local):
-        return None
-    # Unreasonably long
-    if len(local) > 40:
-        return None
-    # Domain format check
-    if not re.match(r"[a-zA-Z0-9.-]+\.[a-zA-Z]{2,7}$", domain):
-        return None
-    # File extension false positives
-    if domain.endswith((".png", ".jpg", ".js", ".css", ".svg", ".woff", ".woff2", ".ttf", ".eot")):
-        return None
-    return email
+    return None if _classifier.invalid_reason(email) else email
 
 
 def is_junk_email(email: str) -> bool:
     """Check if an email is a known junk/platform support address."""
-    lower = email.lower()
-    domain = lower.split("@")[1] if "@" in lower else ""
-    # Exact domain match
-    if domain in JUNK_EMAIL_DOMAINS:
-        return True
-    # Subdomain match (e.g. jamiegos.bandcamp.com)
-    for junk_domain in JUNK_EMAIL_DOMAINS:
-        if domain.endswith("." + junk_domain):
-            return True
-    # Pattern match
-    return any(pattern in lower for pattern in JUNK_EMAIL_PATTERNS)
+    return bool(_classifier.junk_reason(email))
+
+
+class StreamingEmailScanner:
+    """
+    Incremental email scanner for page bodies read in chunks.
+
+    feed() returns a validated mailto: address as soon as one is seen (the
+    most reliable signal, so callers can stop reading). Otherwise finish()
+    returns the first mailto, else the first plain email, in document order —
+    the same answer a full-text scan gives. Matches that straddle a chunk
+    boundary are held back until the next chunk completes them.
+    """
+
+    # Longer than any address validate_email accepts
+    OVERLAP = 320
+
+    def __init__(self) -> None:
+        self._buf = ""
+        self.first_email: Optional[str] = None
+
+    def feed(self, chunk: str) -> Optional[str]:
+        self._buf += chunk
+        limit = len(self._buf) - self.OVERLAP
+        if limit <= 0:
+            return None
+        found, cut = self._scan(limit)
+        self._buf = self._buf[cut:]
+        return found
+
+    def finish(self) -> Optional[str]:
+        found, _ = self._scan(len(self._buf))
+        self._buf = ""
+        return found or self.first_email
+
+    def _scan(self, limit: int) -> tuple[Optional[str], int]:
+        """Scan matches ending at or before limit; return (mailto, safe cut point)."""
+        cut = limit
+        for m in MAILTO_RE.finditer(self._buf):
+            if m.end() > limit:
+                cut = min(cut, m.start())
+                break
+            email = validate_email(m.group(1))
+            if email:
+                return email, cut
+        if self.first_email is None:
+            for m in EMAIL_RE.finditer(self._buf):
+                if m.end() > limit:
+                    cut = min(cut, m.start())
+                    break
+                if validate_email(m.group(0)):
+                    self.first_email = m.group(0)
+                    break
+        return None, cut
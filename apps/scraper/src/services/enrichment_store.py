@@ -0,0 +1,174 @@
+"""
+Persistent store of deep-scrape results, keyed by sc_user_id.
+
+Each record keeps the SoundCloud last_modified it was derived from and a
+freshness timestamp per field group, so a re-run only redoes the work that
+is actually stale: nothing for an unchanged artist, the latest-track lookup
+when only that has aged out, and a full deep scrape when the profile
+changed or the email/socials record expired.
+"""
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+
+from .models import normalize_url, state_path
+
+logger = logging.getLogger(__name__)
+
+
+ENRICHMENT_PATH = state_path("SC_ENRICHMENT_PATH", "data/enrichment.sqlite3")
+
+# Result fields covered by each freshness timestamp
+FIELD_GROUPS: dict[str, tuple[str, ...]] = {
+    "email": ("email", "email_source"),
+    "socials": ("social_links", "spotify", "instagram"),
+    "track": ("latest_track_title", "latest_track_url", "latest_track_plays"),
+}
+# Seconds each group stays fresh
+DEFAULT_TTLS: dict[str, float] = {
+    "email": 30 * 86400,
+    "email_miss": 7 * 86400,  # no email found — worth retrying sooner
+    "socials": 30 * 86400,
+    "track": 3 * 86400,
+}
+# Result key -> SoundCloud user key. Refreshed on every reuse, from the user
+# object when it was looked up, else from the discovery row (result keys)
+PROFILE_FIELDS = {
+    "followers": "followers_count",
+    "track_count": "track_count",
+    "genre": "genre",
+    "bio": "description",
+}
+
+
+@dataclass
+class StoredEnrichment:
+    sc_user_id: int
+    last_modified: Optional[str]
+    result: dict
+    fetched_at: dict[str, float] = field(default_factory=dict)  # group -> unix time
+
+    def stale_groups(self, ttls: dict[str, float], now: Optional[float] = None) -> set[str]:
+        now = now or time.time()
+        stale = set()
+        for group in FIELD_GROUPS:
+            ttl = ttls[group]
+            if group == "email" and not self.result.get("email"):
+                ttl = ttls["email_miss"]
+            if now - self.fetched_at.get(group, 0) > ttl:
+                stale.add(group)
+        return stale
+
+
+class EnrichmentStore:
+    def __init__(self, path: Optional[str] = ENRICHMENT_PATH, ttls: Optional[dict[str, float]] = None) -> None:
+        self.path = path
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self.reused = 0
+        self.partial_refreshes = 0
+        self.rescraped = 0
+        self.writes = 0
+        if path:
+            self._open_db(path)
+
+    @property
+    def enabled(self) -> bool:
+        return self._db is not None
+
+    async def get(self, sc_user_id: Optional[int] = None, url: Optional[str] = None) -> Optional[StoredEnrichment]:
+        """Stored record by id, falling back to the profile URL."""
+        if not self._db or not (sc_user_id or url):
+            return None
+        return await asyncio.to_thread(self._read, sc_user_id, url)
+
+    async def put(self, result: dict, last_modified: Optional[str], groups: Optional[set[str]] = None,
+                  previous: Optional[StoredEnrichment] = None) -> None:
+        """
+        Save a successful result. `groups` are the field groups that were just
+        fetched (all of them by default); the rest keep their old timestamps.
+        """
+        uid = result.get("sc_user_id")
+        if not self._db or not uid or not result.get("success"):
+            return
+        now = time.time()
+        fetched_at = dict(previous.fetched_at) if previous else {}
+        for group in (groups if groups is not None else FIELD_GROUPS):
+            fetched_at[group] = now
+        await asyncio.to_thread(self._write, uid, result, last_modified, fetched_at, now)
+
+    def stats(self) -> dict:
+        count = 0
+        if self._db:
+            try:
+                with self._db_lock:
+                    count = self._db.execute("SELECT COUNT(*) FROM enrichment").fetchone()[0]
+            except sqlite3.Error:
+                pass
+        return {
+            "enabled": self.enabled,
+            "records": count,
+            "reused": self.reused,
+            "partial_refreshes": self.partial_refreshes,
+            "rescraped": self.rescraped,
+            "writes": self.writes,
+        }
+
+    # ── Internals ─────────────────────────────────────────────────────
+
+    def _open_db(self, path: str) -> None:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS enrichment ("
+                "sc_user_id INTEGER PRIMARY KEY, url TEXT, last_modified TEXT, "
+                "result TEXT, fetched_at TEXT, updated_at REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS enrichment_url ON enrichment (url)")
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Enrichment store disabled ({path}): {e}")
+            self._db = None
+
+    def _read(self, sc_user_id: Optional[int], url: Optional[str]) -> Optional[StoredEnrichment]:
+        try:
+            with self._db_lock:
+                if sc_user_id:
+                    row = self._db.execute(
+                        "SELECT sc_user_id, last_modified, result, fetched_at FROM enrichment WHERE sc_user_id = ?",
+                        (int(sc_user_id),),
+                    ).fetchone()
+                else:
+                    row = self._db.execute(
+                        "SELECT sc_user_id, last_modified, result, fetched_at FROM enrichment WHERE url = ?",
+                        (normalize_url(url),),
+                    ).fetchone()
+        except (sqlite3.Error, ValueError) as e:
+            logger.debug(f"Enrichment store read failed: {e}")
+            return None
+        if not row:
+            return None
+        return StoredEnrichment(row[0], row[1], json.loads(row[2]), json.loads(row[3]))
+
+    def _write(self, uid: int, result: dict, last_modified: Optional[str], fetched_at: dict, now: float) -> None:
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO enrichment (sc_user_id, url, last_modified, result, fetched_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (int(uid), normalize_url(result.get("url", "")), last_modified,
+                     json.dumps(result), json.dumps(fetched_at), now),
+                )
+                self._db.commit()
+            self.writes += 1
+        except (sqlite3.Error, ValueError) as e:
+            logger.debug(f"Enrichment store write failed: {e}")
@@ -0,0 +1,187 @@
+"""
+Per-URL cache for external email fetches.
+
+Stores the extracted email (not the page), negative results with their own
+TTLs (404/410 and non-HTML for negative_ttl; timeouts, throttling and
+server errors for the shorter error_ttl), and ETag/Last-Modified validators
+for conditional revalidation. Concurrent fetches of one URL are collapsed, and
+a per-domain circuit breaker skips domains that keep timing out or refusing
+connections (a domain that answers, even with 403/429/5xx, is reachable).
+"""
+import time
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+from urllib.parse import urlparse
+
+from .single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FetchResult:
+    """Outcome of one page fetch."""
+    status: int = 0
+    email: Optional[str] = None
+    reason: str = ""  # '', 'status' (404/410), 'non_html', 'timeout', 'error'
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    links: tuple[str, ...] = ()  # outbound links (link-in-bio pages only)
+
+    @property
+    def unreachable(self) -> bool:
+        """Timed out, or failed before any response arrived (status stays 0)."""
+        return self.reason == "timeout" or (self.reason == "error" and not self.status)
+
+
+@dataclass
+class _Entry:
+    expires: float
+    email: Optional[str]
+    reason: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    links: tuple[str, ...] = ()
+
+
+Fetcher = Callable[[dict], Awaitable[FetchResult]]
+
+
+class FetchCache:
+    def __init__(
+        self,
+        max_entries: int = 20000,
+        ttl: float = 24 * 3600,
+        negative_ttl: float = 6 * 3600,
+        error_ttl: float = 1800,
+        breaker_threshold: int = 3,
+        breaker_cooldown: float = 300,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.error_ttl = error_ttl
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._flight = SingleFlight()
+        self._failures: dict[str, int] = {}  # domain -> consecutive timeouts/connection failures
+        self._open_until: dict[str, float] = {}
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.short_circuited = 0
+
+    async def fetch(self, url: str, fetcher: Fetcher) -> Optional[str]:
+        """Return the cached email for url, fetching (or revalidating) when stale."""
+        email, _, _ = await self.fetch_page(url, fetcher)
+        return email
+
+    async def fetch_page(self, url: str, fetcher: Fetcher) -> tuple[Optional[str], tuple[str, ...], str]:
+        """
+        Like fetch(), but returns (email, outbound links, negative reason);
+        the reason is 'circuit_open' when the domain is being skipped.
+        """
+        key = _normalize(url)
+        entry = self._entries.get(key)
+        if entry and entry.expires > time.time():
+            self._entries.move_to_end(key)
+            if entry.reason:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return entry.email, entry.links, entry.reason
+
+        domain = urlparse(key).netloc
+        if self._open_until.get(domain, 0) > time.time():
+            self.short_circuited += 1
+            return None, (), "circuit_open"
+
+        self.misses += 1
+        entry = await self._flight.do(key, lambda: self._refresh(key, domain, entry, fetcher))
+        return entry.email, entry.links, entry.reason
+
+    def stats(self) -> dict:
+        now = time.time()
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "coalesced": self._flight.coalesced,
+            "short_circuited": self.short_circuited,
+            "open_circuits": sum(1 for t in self._open_until.values() if t > now),
+        }
+
+    # ── Internals ─────────────────────────────────────────────────────
+
+    async def _refresh(self, key: str, domain: str, entry: Optional[_Entry], fetcher: Fetcher) -> _Entry:
+        validators: dict[str, str] = {}
+        if entry and not entry.reason:
+            if entry.etag:
+                validators["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                validators["If-Modified-Since"] = entry.last_modified
+
+        result = await fetcher(validators)
+        if result.status == 304:
+            if validators:
+                self._track_domain(domain, result)
+                self.revalidated += 1
+                entry.expires = time.time() + self.ttl
+                self._store(key, entry)
+                return entry
+            # Nothing of ours was revalidated, so a 304 here has no body
+            # to scan — fetch it plainly rather than record "no email"
+            result = await fetcher({})
+            if result.status == 304:
+                result.reason = "error"
+        self._track_domain(domain, result)
+
+        if result.reason in ("timeout", "error"):
+            ttl = self.error_ttl
+        elif result.reason:
+            ttl = self.negative_ttl
+        else:
+            ttl = self.ttl
+        fresh = _Entry(
+            expires=time.time() + ttl,
+            email=result.email,
+            reason=result.reason,
+            etag=result.etag,
+            last_modified=result.last_modified,
+            links=tuple(result.links),
+        )
+        self._store(key, fresh)
+        return fresh
+
+    def _track_domain(self, domain: str, result: FetchResult) -> None:
+        if result.unreachable:
+            failures = self._failures.get(domain, 0) + 1
+            self._failures[domain] = failures
+            if failures >= self.breaker_threshold:
+                self._open_until[domain] = time.time() + self.breaker_cooldown
+                logger.info(f"Circuit open for {domain} after {failures} failures")
+        else:
+            self._failures.pop(domain, None)
+            self._open_until.pop(domain, None)
+
+    def _store(self, key: str, entry: _Entry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+def _normalize(url: str) -> str:
+    parsed = urlparse(url.strip())
+    host = parsed.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parsed.path.rstrip("/") or "/"
+    query = f"?{parsed.query}" if parsed.query else ""
+    return f"{parsed.scheme.lower() or 'https'}://{host}{path}{query}"
@@ -0,0 +1,242 @@
+"""
+Seed-graph crawler.
+
+Walks followings / followers / related artists outward from a seed. The
+frontier is a priority queue: a user is worth expanding when its own
+follower count sits near the target band and its parent's neighbours
+mostly landed in range, so the request budget goes to the parts of the
+graph that keep producing candidates instead of a fixed top-N per level.
+Users are yielded per API call as soon as it returns.
+"""
+import math
+import heapq
+import asyncio
+import logging
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Any, AsyncIterator
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_DEPTH = 2
+DEFAULT_BRANCHING = 10
+DEFAULT_REQUEST_BUDGET = 26  # what multi-tap's fixed L1 + top-10 L2 expansion cost
+DISCOVER_REQUEST_BUDGET = 13  # what /discover's fixed L1 + top-3 L2 expansion cost
+
+# Pages fetched per edge type when expanding the seed itself
+SEED_FOLLOWINGS_PAGES = 3
+SEED_FOLLOWERS_PAGES = 2
+DISCOVER_FOLLOWERS_PAGES = 3
+
+# Priority lost per hop, so equally promising nodes nearer the seed go first
+DEPTH_PENALTY = 0.1
+
+
+@dataclass(frozen=True)
+class CrawlConfig:
+    depth: int = DEFAULT_DEPTH
+    branching: int = DEFAULT_BRANCHING
+    request_budget: int = DEFAULT_REQUEST_BUDGET
+    seed_followers_pages: int = SEED_FOLLOWERS_PAGES
+
+
+# /discover's crawl when the caller doesn't shape one
+DISCOVER_CRAWL = CrawlConfig(request_budget=DISCOVER_REQUEST_BUDGET, seed_followers_pages=DISCOVER_FOLLOWERS_PAGES)
+
+
+class VisitedSet:
+    """
+    Exact set of user ids at ~8 bytes each: a sorted array('q') plus a
+    small set of recent additions, merged once it grows past `buffer`.
+    """
+
+    def __init__(self, buffer: int = 4096) -> None:
+        self._sorted = array("q")
+        self._recent: set[int] = set()
+        self.buffer = buffer
+
+    def __contains__(self, uid: int) -> bool:
+        if uid in self._recent:
+            return True
+        i = bisect_left(self._sorted, uid)
+        return i < len(self._sorted) and self._sorted[i] == uid
+
+    def __len__(self) -> int:
+        return len(self._sorted) + len(self._recent)
+
+    def add(self, uid: int) -> None:
+        if uid in self:
+            return
+        self._recent.add(uid)
+        if len(self._recent) >= self.buffer:
+            self._sorted = array("q", sorted([*self._sorted, *self._recent]))
+            self._recent.clear()
+
+
+class GraphCrawler:
+    """
+    One crawl from one seed. `depth` bounds hops from the seed, `branching`
+    how many of a node's neighbours per edge type (followings, followers,
+    related) join the frontier, `request_budget` the SoundCloud requests
+    spent on expansions (paginated calls count every page they may fetch),
+    `concurrency` how many nodes are expanded at once.
+    """
+
+    def __init__(
+        self,
+        scraper: Any,  # SoundCloudScraper instance
+        min_followers: int = 0,
+        max_followers: int = 999_999_999,
+        depth: int = DEFAULT_DEPTH,
+        branching: int = DEFAULT_BRANCHING,
+        request_budget: int = DEFAULT_REQUEST_BUDGET,
+        seed_followers_pages: int = SEED_FOLLOWERS_PAGES,
+        concurrency: int = 4,
+    ) -> None:
+        self._scraper = scraper
+        self.min_followers = min_followers
+        self.max_followers = max_followers
+        self.depth = depth
+        self.branching = branching
+        self.request_budget = request_budget
+        self.seed_followers_pages = seed_followers_pages
+        self.concurrency = concurrency
+        self.visited = VisitedSet()
+        # (-priority, seq, uid, depth)
+        self._frontier: list[tuple[float, int, int, int]] = []
+        self._seq = 0
+        self.requests = 0
+        self.expanded = 0
+        self.found = 0
+        self.in_range = 0
+        self.failed = 0
+        self.frontier_peak = 0
+
+    async def crawl(self, seed: dict) -> AsyncIterator[tuple[int, list[dict]]]:
+        """
+        Yield (hops from seed, users) per completed API call. A user can
+        come back from several calls — repeat sightings are a ranking
+        signal — but is only counted and queued the first time.
+        """
+        seed_id = seed.get("id")
+        if not seed_id:
+            return
+        self.visited.add(seed_id)
+        self._push(seed_id, 0, 1.0)
+        running: dict[asyncio.Future, tuple[int, int]] = {}  # call -> (uid, depth)
+        open_calls: dict[int, int] = {}  # node being expanded -> calls still running
+        try:
+            while self._frontier or running:
+                while self._frontier and len(open_calls) < self.concurrency:
+                    cost = self._cost(self._frontier[0][3])
+                    if self.requests + cost > self.request_budget:
+                        break
+                    _, _, uid, depth = heapq.heappop(self._frontier)
+                    self.requests += cost
+                    self.expanded += 1
+                    calls = self._calls(uid, depth)
+                    open_calls[uid] = len(calls)
+                    for coro in calls:
+                        running[asyncio.ensure_future(coro)] = (uid, depth)
+                if not running:
+                    break
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for call in done:
+                    uid, depth = running.pop(call)
+                    open_calls[uid] -= 1
+                    if not open_calls[uid]:
+                        del open_calls[uid]
+                    try:
+                        users = call.result() or []
+                    except Exception as e:
+                        self.failed += 1
+                        logger.debug(f"Graph expansion of {uid} failed: {e}")
+                        continue
+                    fresh = []
+                    for u in users:
+                        vid = u.get("id")
+                        if vid and vid not in self.visited:
+                            self.visited.add(vid)
+                            fresh.append(u)
+                    if fresh:
+                        hits = sum(1 for u in fresh if self._in_range(u))
+                        self.found += len(fresh)
+                        self.in_range += hits
+                        if depth + 1 < self.depth:
+                            # How well this neighbourhood matches the band
+                            self._enqueue(fresh, depth + 1, hits / len(fresh))
+                    if users:
+                        yield depth + 1, users
+        except Exception:
+            # Surfaced in stats(); merge() only logs a source that dies
+            self.failed += 1
+            raise
+        finally:
+            for call in running:
+                call.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.depth,
+            "branching": self.branching,
+            "request_budget": self.request_budget,
+            "requests": self.requests,
+            "expanded": self.expanded,
+            "found": self.found,
+            "in_range": self.in_range,
+            "failed": self.failed,
+            "frontier_left": len(self._frontier),
+            "frontier_peak": self.frontier_peak,
+        }
+
+    # ── Internals ─────────────────────────────────────────────────────
+
+    def _calls(self, uid: int, depth: int) -> list[Any]:
+        """One coroutine per edge type to expand."""
+        s = self._scraper
+        if depth == 0:
+            return [
+                s._followings_paginated(uid, max_pages=SEED_FOLLOWINGS_PAGES),
+                s._followers_paginated(uid, max_pages=self.seed_followers_pages),
+                s._related(uid),
+            ]
+        return [s._followings(uid), s._related(uid)]
+
+    def _cost(self, depth: int) -> int:
+        """Most requests _calls() can make (every page of the paginated ones)."""
+        return SEED_FOLLOWINGS_PAGES + self.seed_followers_pages + 1 if depth == 0 else 2
+
+    def _enqueue(self, users: list[dict], depth: int, parent_yield: float) -> None:
+        """Queue the `branching` most promising users from one expansion call."""
+        scored = [(self._fit(u) * (0.5 + 0.5 * parent_yield) - DEPTH_PENALTY * depth, u["id"]) for u in users]
+        for priority, uid in heapq.nlargest(self.branching, scored):
+            self._push(uid, depth, priority)
+
+    def _push(self, uid: int, depth: int, priority: float) -> None:
+        self._seq += 1
+        heapq.heappush(self._frontier, (-priority, self._seq, uid, depth))
+        self.frontier_peak = max(self.frontier_peak, len(self._frontier))
+
+    def _in_range(self, u: dict) -> bool:
+        return self.min_followers <= (u.get("followers_count") or 0) <= self.max_followers
+
+    def _fit(self, u: dict) -> float:
+        """
+        Likelihood a user's neighbourhood is in range: 1 inside the band,
+        falling off with log distance outside it.
+        """
+        followers = u.get("followers_count") or 0
+        if followers < self.min_followers:
+            gap = math.log10(self.min_followers + 1) - math.log10(followers + 1)
+        elif followers > self.max_followers:
+            gap = math.log10(followers + 1) - math.log10(self.max_followers + 1)
+        else:
+            gap = 0.0
+        fit = math.exp(-1.5 * gap)
+        # No followings means only related-artists edges to walk
+        if u.get("followings_count") == 0:
+            fit *= 0.5
+        return fit
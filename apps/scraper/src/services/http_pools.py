@@ -0,0 +1,257 @@
+"""
+Managed HTTP connection pools.
+SoundCloud API traffic and third-party website fetches get separate pools
+so a slow artist website can't hold connections api-v2 calls need.
+"""
+import time
+import socket
+import asyncio
+import logging
+import ipaddress
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Optional
+from urllib.parse import urlparse
+
+import httpx
+import httpcore
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401 — enables HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+# Hosts whose per-host semaphore is kept
+MAX_TRACKED_HOSTS = 1024
+
+SC_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
+    "Accept": "application/json",
+    "Origin": "https://soundcloud.com",
+    "Referer": "https://soundcloud.com/",
+}
+
+BROWSER_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml",
+}
+
+
+class PoolStats:
+    """In-flight / peak / error counters for one pool."""
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.in_flight = 0
+        self.peak = 0
+        self.requests = 0
+        self.errors = 0
+        self.busy_time = 0.0
+
+    @asynccontextmanager
+    async def track(self):
+        self.in_flight += 1
+        self.requests += 1
+        self.peak = max(self.peak, self.in_flight)
+        start = time.monotonic()
+        try:
+            yield
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self.busy_time += time.monotonic() - start
+
+    def to_dict(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "in_flight": self.in_flight,
+            "utilization": round(self.in_flight / self.capacity, 3) if self.capacity else 0.0,
+            "peak": self.peak,
+            "requests": self.requests,
+            "errors": self.errors,
+            "avg_latency_ms": round(self.busy_time / self.requests * 1000, 1) if self.requests else 0.0,
+        }
+
+
+class CachingResolverBackend(httpcore.AsyncNetworkBackend):
+    """
+    Network backend that caches DNS results for a TTL and tries each
+    resolved address in turn. TLS SNI still uses the hostname.
+    """
+
+    def __init__(self, backend: Optional[httpcore.AsyncNetworkBackend] = None, ttl: float = 300.0) -> None:
+        self._backend = backend or httpcore.AnyIOBackend()
+        self._ttl = ttl
+        self._cache: dict[tuple[str, int], tuple[float, list[str]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        addrs = await self._resolve(host, port)
+        for i, addr in enumerate(addrs):
+            try:
+                return await self._backend.connect_tcp(addr, port, timeout, local_address, socket_options)
+            except Exception:
+                if i == len(addrs) - 1:
+                    # Every record failed — resolve fresh next time
+                    self._cache.pop((host, port), None)
+                    raise
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self._backend.connect_unix_socket(path, timeout, socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+    async def _resolve(self, host: str, port: int) -> list[str]:
+        try:
+            ipaddress.ip_address(host)
+            return [host]
+        except ValueError:
+            pass
+        now = time.monotonic()
+        cached = self._cache.get((host, port))
+        if cached and cached[0] > now:
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        addrs = list(dict.fromkeys(info[4][0] for info in infos))
+        self._cache[(host, port)] = (now + self._ttl, addrs)
+        return addrs
+
+
+class ResolvingTransport(httpx.AsyncHTTPTransport):
+    """httpx transport whose connection pool connects through a CachingResolverBackend."""
+
+    def __init__(self, resolver: CachingResolverBackend, limits: httpx.Limits, http2: bool = False) -> None:
+        # Skips the base __init__, which would build a pool only to replace
+        # it; the inherited request / close methods only use self._pool
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http1=True,
+            http2=http2,
+            network_backend=resolver,
+        )
+
+
+class ApiPool:
+    """HTTP/2 keep-alive pool sized for api-v2.soundcloud.com."""
+
+    def __init__(self, max_connections: int = 10) -> None:
+        self.client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(30.0, connect=10.0),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=60.0,
+            ),
+            follow_redirects=True,
+            headers=SC_HEADERS,
+        )
+        self._stats = PoolStats(max_connections)
+
+    async def get(self, url: str, params: Optional[dict] = None) -> httpx.Response:
+        async with self._stats.track():
+            return await self.client.get(url, params=params)
+
+    def stats(self) -> dict:
+        return {**self._stats.to_dict(), "http2": HTTP2_AVAILABLE}
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+class ExternalPool:
+    """
+    Wide pool for third-party sites (artist websites, linktrees, Instagram).
+    Short connect timeout, per-host connection caps, cached DNS.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 64,
+        per_host: int = 4,
+        connect_timeout: float = 3.0,
+        read_timeout: float = 8.0,
+        dns_ttl: float = 300.0,
+    ) -> None:
+        self.per_host = per_host
+        self._resolver = CachingResolverBackend(ttl=dns_ttl)
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            transport=ResolvingTransport(
+                self._resolver,
+                httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections // 2,
+                    keepalive_expiry=15.0,
+                ),
+            ),
+            follow_redirects=True,
+            headers=BROWSER_HEADERS,
+        )
+        # Per-host caps, least recently used idle host dropped past MAX_TRACKED_HOSTS
+        self._host_slots: OrderedDict[str, asyncio.Semaphore] = OrderedDict()
+        self._host_users: dict[str, int] = {}  # host -> requests holding or waiting on its slot
+        self._stats = PoolStats(max_connections)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        async with self._host_slot(url), self._stats.track():
+            return await self.client.get(url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs):
+        async with self._host_slot(url), self._stats.track():
+            async with self.client.stream(method, url, **kwargs) as resp:
+                yield resp
+
+    def stats(self) -> dict:
+        busy_hosts = sum(1 for s in self._host_slots.values() if s.locked())
+        return {
+            **self._stats.to_dict(),
+            "per_host_cap": self.per_host,
+            "saturated_hosts": busy_hosts,
+            "tracked_hosts": len(self._host_slots),
+            "dns_cache": {"hits": self._resolver.hits, "misses": self._resolver.misses},
+        }
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    @asynccontextmanager
+    async def _host_slot(self, url: str):
+        host = urlparse(url).netloc.lower()
+        self._host_users[host] = self._host_users.get(host, 0) + 1
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = self._host_slots[host] = asyncio.Semaphore(self.per_host)
+            self._evict_idle_hosts()
+        else:
+            self._host_slots.move_to_end(host)
+        try:
+            async with slot:
+                yield
+        finally:
+            self._host_users[host] -= 1
+            if not self._host_users[host]:
+                del self._host_users[host]
+
+    def _evict_idle_hosts(self) -> None:
+        """Drop least recently used hosts past the cap, never one still in use."""
+        excess = len(self._host_slots) - MAX_TRACKED_HOSTS
+        if excess <= 0:
+            return
+        idle = [h for h in self._host_slots if h not in self._host_users][:excess]
+        for host in idle:
+            del self._host_slots[host]
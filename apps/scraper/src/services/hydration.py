@@ -0,0 +1,167 @@
+"""
+Micro-batched user hydration.
+get_user(id) calls arriving within a short window are fetched together
+through SoundCloud's multi-id /users endpoint, with single-user requests
+as the fallback. Callers that know their ids up front (deep scrape batches)
+prefetch() them in full chunks instead. Results are written back into the
+response cache under the per-user URL, so later /users/{id} lookups are free.
+"""
+import asyncio
+import logging
+from typing import Any, Iterable, Optional
+
+import httpx
+
+from . import codec
+from .models import SC_API
+
+logger = logging.getLogger(__name__)
+
+
+class UserHydrator:
+    def __init__(self, scraper: Any, window: float = 0.05, max_batch: int = 50) -> None:
+        self._scraper = scraper  # SoundCloudScraper instance
+        self.window = window
+        self.max_batch = max_batch
+        self._queue: list[int] = []
+        self._pending: dict[int, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: set[asyncio.Task] = set()
+        self.requested = 0
+        self.cache_hits = 0
+        self.batches = 0
+        self.batched_ids = 0
+        self.prefetched = 0
+        self.fallbacks = 0
+
+    async def get_user(self, user_id: int) -> Optional[dict]:
+        """Full user object for an id, or None if it can't be fetched."""
+        return (await self.fetch(user_id))[0]
+
+    async def fetch(self, user_id: int) -> tuple[Optional[dict], Optional[int]]:
+        """
+        (user, status): status is 200 with a user, the HTTP status of the
+        failed single-user request, or None if it never got a response.
+        """
+        user_id = int(user_id)
+        self.requested += 1
+        # Misses are counted by the request that follows
+        cached = await self._scraper._cache.get(_user_url(user_id), count_miss=False)
+        if cached is not None:
+            self.cache_hits += 1
+            return codec.loads(cached.content), 200
+
+        fut = self._pending.get(user_id)
+        if fut is None:
+            fut = asyncio.get_running_loop().create_future()
+            self._pending[user_id] = fut
+            self._queue.append(user_id)
+            if len(self._queue) >= self.max_batch:
+                self._schedule_flush(0)
+            elif self._timer is None:
+                self._schedule_flush(self.window)
+        return await asyncio.shield(fut)
+
+    async def prefetch(self, user_ids: Iterable[Any]) -> int:
+        """
+        Hydrate a known set of users up front in full /users?ids= chunks,
+        so later get_user() calls are cache hits. Returns how many were found.
+        """
+        ids: list[int] = []
+        for uid in dict.fromkeys(_as_id(u) for u in user_ids):
+            if uid is None or uid in self._pending:
+                continue
+            if await self._scraper._cache.get(_user_url(uid), count_miss=False) is None:
+                ids.append(uid)
+        chunks = [ids[i:i + self.max_batch] for i in range(0, len(ids), self.max_batch)]
+        found = await asyncio.gather(*[self._fetch_bulk(chunk) for chunk in chunks])
+        count = sum(len(f) for f in found)
+        self.prefetched += count
+        return count
+
+    def stats(self) -> dict:
+        return {
+            "requested": self.requested,
+            "cache_hits": self.cache_hits,
+            "batches": self.batches,
+            "batched_ids": self.batched_ids,
+            "prefetched": self.prefetched,
+            "fallbacks": self.fallbacks,
+            "pending": len(self._pending),
+        }
+
+    # ── Internals ─────────────────────────────────────────────────────
+
+    def _schedule_flush(self, delay: float) -> None:
+        if self._timer:
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_later(delay, self._start_flush)
+
+    def _start_flush(self) -> None:
+        self._timer = None
+        ids, self._queue = self._queue[:self.max_batch], self._queue[self.max_batch:]
+        if self._queue:
+            self._schedule_flush(0)
+        if ids:
+            task = asyncio.ensure_future(self._flush(ids))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, ids: list[int]) -> None:
+        found: dict[int, tuple[Optional[dict], Optional[int]]] = {}
+        try:
+            found = {uid: (user, 200) for uid, user in (await self._fetch_bulk(ids)).items()}
+        finally:
+            missing = [uid for uid in ids if uid not in found]
+            if missing:
+                self.fallbacks += len(missing)
+                singles = await asyncio.gather(*[self._fetch_one(uid) for uid in missing], return_exceptions=True)
+                for uid, result in zip(missing, singles):
+                    found[uid] = result if isinstance(result, tuple) else (None, None)
+            for uid in ids:
+                fut = self._pending.pop(uid, None)
+                if fut and not fut.done():
+                    fut.set_result(found.get(uid, (None, None)))
+
+    async def _fetch_bulk(self, ids: list[int]) -> dict[int, dict]:
+        if len(ids) == 1:
+            return {}
+        self.batches += 1
+        self.batched_ids += len(ids)
+        try:
+            resp = await self._scraper._get(
+                f"{SC_API}/users",
+                {"ids": ",".join(str(i) for i in ids), "client_id": self._scraper.client_id},
+            )
+            if resp.status_code != 200:
+                return {}
+            data = codec.loads(resp.content)
+            users = data.get("collection", []) if isinstance(data, dict) else data
+        except Exception as e:
+            logger.debug(f"Bulk user fetch failed ({len(ids)} ids): {e}")
+            return {}
+
+        wanted = set(ids)
+        found: dict[int, dict] = {}
+        for user in users or []:
+            uid = user.get("id") if isinstance(user, dict) else None
+            if uid in wanted:
+                found[uid] = user
+                # Seed the per-user cache entry
+                await self._scraper._cache.put(_user_url(uid), None, httpx.Response(200, json=user))
+        return found
+
+    async def _fetch_one(self, user_id: int) -> tuple[Optional[dict], int]:
+        resp = await self._scraper._get(_user_url(user_id), {"client_id": self._scraper.client_id})
+        return (codec.loads(resp.content) if resp.status_code == 200 else None), resp.status_code
+
+
+def _user_url(user_id: int) -> str:
+    return f"{SC_API}/users/{user_id}"
+
+
+def _as_id(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,273 @@
+"""
+Background deep-scrape jobs.
+
+A job is a persisted list of candidates. The unfinished ones run through
+the deep-scrape pipeline; each result is saved as soon as it lands and
+published to subscribers (SSE). Jobs left queued or running by a restart are picked up again from
+the first unfinished candidate. JobStore is blocking SQLite; JobManager
+runs every store call in a worker thread.
+"""
+import os
+import json
+import time
+import uuid
+import sqlite3
+import asyncio
+import logging
+import threading
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Optional
+
+from .deep_scrape import iter_deep_scrape_indexed
+from .models import state_path
+
+logger = logging.getLogger(__name__)
+
+
+JOBS_PATH = state_path("SC_JOBS_PATH", "data/jobs.sqlite3")
+
+ACTIVE = ("queued", "running")
+FINISHED = ("completed", "cancelled", "failed")
+
+
+class JobStore:
+    """SQLite tables for jobs and their per-candidate items (thread-safe, blocking)."""
+
+    def __init__(self, path: str = JOBS_PATH) -> None:
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, kind TEXT, status TEXT, params TEXT, total INTEGER,"
+            " done INTEGER DEFAULT 0, emails_found INTEGER DEFAULT 0, error TEXT,"
+            " created_at REAL, updated_at REAL);"
+            "CREATE TABLE IF NOT EXISTS job_items ("
+            " job_id TEXT, idx INTEGER, candidate TEXT, result TEXT, finished_at REAL,"
+            " PRIMARY KEY (job_id, idx));"
+        )
+        self._db.commit()
+
+    def create(self, kind: str, candidates: list[dict], params: dict) -> str:
+        with self._lock:
+            job_id = uuid.uuid4().hex[:12]
+            now = time.time()
+            self._db.execute(
+                "INSERT INTO jobs (id, kind, status, params, total, created_at, updated_at) VALUES (?, ?, 'queued', ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(params), len(candidates), now, now),
+            )
+            self._db.executemany(
+                "INSERT INTO job_items (job_id, idx, candidate) VALUES (?, ?, ?)",
+                [(job_id, i, json.dumps(c)) for i, c in enumerate(candidates)],
+            )
+            self._db.commit()
+            return job_id
+
+    def job(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, kind, status, params, total, done, emails_found, error, created_at, updated_at "
+                "FROM jobs WHERE id = ?", (job_id,),
+            ).fetchone()
+            if not row:
+                return None
+            return {
+                "job_id": row[0], "kind": row[1], "status": row[2], "params": json.loads(row[3] or "{}"),
+                "total": row[4], "done": row[5], "emails_found": row[6], "error": row[7],
+                "created_at": row[8], "updated_at": row[9],
+            }
+
+    def set_status(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, error, time.time(), job_id),
+            )
+            self._db.commit()
+
+    def transition(self, job_id: str, status: str, error: Optional[str] = None) -> bool:
+        """Set the status of a queued or running job; False if it had already finished."""
+        with self._lock:
+            cur = self._db.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ? AND status IN (?, ?)",
+                (status, error, time.time(), job_id, *ACTIVE),
+            )
+            self._db.commit()
+            return cur.rowcount > 0
+
+    def pending_items(self, job_id: str) -> list[tuple[int, dict]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT idx, candidate FROM job_items WHERE job_id = ? AND result IS NULL ORDER BY idx", (job_id,),
+            ).fetchall()
+            return [(idx, json.loads(candidate)) for idx, candidate in rows]
+
+    def save_result(self, job_id: str, idx: int, result: dict) -> Optional[dict]:
+        """Store one result; returns the job with its updated counters."""
+        with self._lock:
+            now = time.time()
+            self._db.execute(
+                "UPDATE job_items SET result = ?, finished_at = ? WHERE job_id = ? AND idx = ?",
+                (json.dumps(result), now, job_id, idx),
+            )
+            self._db.execute(
+                "UPDATE jobs SET done = done + 1, emails_found = emails_found + ?, updated_at = ? WHERE id = ?",
+                (1 if result.get("email") else 0, now, job_id),
+            )
+            self._db.commit()
+            return self.job(job_id)
+
+    def results(self, job_id: str, offset: int = 0, limit: int = 100) -> list[dict]:
+        """Finished results in candidate order."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT result FROM job_items WHERE job_id = ? AND result IS NOT NULL ORDER BY idx LIMIT ? OFFSET ?",
+                (job_id, limit, offset),
+            ).fetchall()
+            return [json.loads(r[0]) for r in rows]
+
+    def unfinished(self) -> list[str]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at", ACTIVE,
+            ).fetchall()
+            return [r[0] for r in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class JobManager:
+    def __init__(self, scraper: Any, store: JobStore, concurrency: int = 5, max_running: int = 2) -> None:
+        self._scraper = scraper  # SoundCloudScraper instance
+        self.store = store
+        self.concurrency = concurrency
+        self._slots = asyncio.Semaphore(max_running)
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+
+    async def submit(self, candidates: list[dict], force_refresh: bool = False) -> dict:
+        job_id = await asyncio.to_thread(self.store.create, "deep_scrape", candidates, {"force_refresh": force_refresh})
+        self._start(job_id)
+        return await self.status(job_id)
+
+    async def status(self, job_id: str) -> Optional[dict]:
+        return await asyncio.to_thread(self.store.job, job_id)
+
+    async def results(self, job_id: str, offset: int = 0, limit: int = 100) -> list[dict]:
+        return await asyncio.to_thread(self.store.results, job_id, offset, limit)
+
+    async def cancel(self, job_id: str) -> bool:
+        """Stop a job. Results saved so far are kept."""
+        if not await asyncio.to_thread(self.store.transition, job_id, "cancelled"):
+            return False
+        task = self._tasks.get(job_id)
+        if task:
+            task.cancel()
+        self._publish(job_id, "complete", await self._progress(job_id))
+        return True
+
+    async def resume(self) -> int:
+        """Restart jobs a previous process left unfinished."""
+        job_ids = await asyncio.to_thread(self.store.unfinished)
+        for job_id in job_ids:
+            await asyncio.to_thread(self.store.set_status, job_id, "queued")
+            self._start(job_id)
+        if job_ids:
+            logger.info(f"Resuming {len(job_ids)} deep-scrape job(s)")
+        return len(job_ids)
+
+    async def events(self, job_id: str) -> AsyncIterator[tuple[str, dict]]:
+        """Progress events for a job until it finishes."""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        try:
+            progress = await self._progress(job_id)
+            yield "progress", progress
+            if progress["status"] in FINISHED:
+                yield "complete", progress
+                return
+            while True:
+                event, data = await queue.get()
+                yield event, data
+                if event == "complete":
+                    return
+        finally:
+            self._subscribers.get(job_id, set()).discard(queue)
+
+    async def aclose(self) -> None:
+        """Stop workers without marking jobs finished, so they resume on restart."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.to_thread(self.store.close)
+
+    def stats(self) -> dict:
+        return {"running": len(self._tasks), "subscribers": sum(len(s) for s in self._subscribers.values())}
+
+    # ── Internals ─────────────────────────────────────────────────────
+
+    def _start(self, job_id: str) -> None:
+        task = asyncio.create_task(self._run(job_id))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    async def _run(self, job_id: str) -> None:
+        async with self._slots:
+            job = await self.status(job_id)
+            if not job or not await asyncio.to_thread(self.store.transition, job_id, "running"):
+                return
+            force_refresh = bool(job["params"].get("force_refresh"))
+            pending = await asyncio.to_thread(self.store.pending_items, job_id)
+            candidates = [candidate for _, candidate in pending]
+            left = set(range(len(pending)))
+
+            try:
+                # Same pipelined, prefetching path as the streaming endpoint
+                async with aclosing(iter_deep_scrape_indexed(
+                    self._scraper, candidates, self.concurrency, force_refresh,
+                )) as results:
+                    async for pos, result in results:
+                        left.discard(pos)
+                        await self._save(job_id, pending[pos][0], result)
+                # Safety net: every candidate should come out the other end
+                for pos in sorted(left):
+                    await self._save(job_id, pending[pos][0], {
+                        "url": candidates[pos].get("url", ""), "success": False, "error": "Deep scrape failed",
+                    })
+                # No-op if cancel() got there first
+                await asyncio.to_thread(self.store.transition, job_id, "completed")
+            except asyncio.CancelledError:
+                # cancel() already set the status; on shutdown it stays active
+                raise
+            except Exception as e:
+                logger.error(f"Job {job_id} failed: {e}")
+                await asyncio.to_thread(self.store.transition, job_id, "failed", str(e))
+            self._publish(job_id, "complete", await self._progress(job_id))
+
+    async def _save(self, job_id: str, idx: int, result: dict) -> None:
+        job = await asyncio.to_thread(self.store.save_result, job_id, idx, result)
+        self._publish(job_id, "result", {"index": idx, **result})
+        self._publish(job_id, "progress", _progress(job_id, job))
+
+    async def _progress(self, job_id: str) -> dict:
+        return _progress(job_id, await self.status(job_id))
+
+    def _publish(self, job_id: str, event: str, data: dict) -> None:
+        for queue in self._subscribers.get(job_id, ()):
+            queue.put_nowait((event, data))
+
+
+def _progress(job_id: str, job: Optional[dict]) -> dict:
+    job = job or {"status": "unknown", "done": 0, "total": 0, "emails_found": 0}
+    return {
+        "job_id": job_id,
+        "status": job["status"],
+        "done": job["done"],
+        "total": job["total"],
+        "emails_found": job["emails_found"],
+    }
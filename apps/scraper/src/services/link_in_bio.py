@@ -0,0 +1,175 @@
+"""
+Structured extraction for link-in-bio pages (linktr.ee, beacons.ai, ...).
+
+These pages ship their links and contact blocks as embedded JSON — Next.js
+__NEXT_DATA__, JSON-LD, or an inline state blob — so we parse that instead
+of regex-scanning the whole document. Per-platform extractors know where the
+profile lives in the JSON; anything unknown falls back to a generic walk.
+"""
+import re
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from .email_utils import EMAIL_RE, MAILTO_RE, validate_email, extract_email
+
+logger = logging.getLogger(__name__)
+
+_NEXT_DATA_RE = re.compile(
+    r'<script[^>]+id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.DOTALL | re.IGNORECASE
+)
+_LD_JSON_RE = re.compile(
+    r'<script[^>]+type="application/ld\+json"[^>]*>(.*?)</script>', re.DOTALL | re.IGNORECASE
+)
+_STATE_RE = re.compile(
+    r"window\.__(?:INITIAL_STATE|PRELOADED_STATE|APOLLO_STATE|NUXT)__\s*=\s*(\{)", re.IGNORECASE
+)
+_HREF_RE = re.compile(r'href="(https?://[^"]+)"', re.IGNORECASE)
+
+# Keys whose string values are contact addresses or outbound links
+_EMAIL_KEYS = {"email", "emailaddress", "contactemail", "businessemail", "mail"}
+_LINK_KEYS = {"url", "href", "link", "website", "sameas", "target", "destination"}
+
+# Images, scripts and the CDNs serving them — never an artist's site
+_ASSET_EXTENSIONS = (
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".svg", ".ico",
+    ".css", ".js", ".json", ".woff", ".woff2", ".ttf", ".mp3", ".mp4", ".webm",
+)
+_ASSET_HOST_RE = re.compile(
+    r"^(static|assets?|img|images|media)[0-9]*\.|(^|[.-])cdn[0-9]*[.-]"
+    r"|(cloudfront\.net|amazonaws\.com|googleusercontent\.com|cloudinary\.com|imgix\.net|sndcdn\.com)$"
+)
+
+
+@dataclass
+class LinkPage:
+    """What a link-in-bio page told us."""
+    emails: list[str] = field(default_factory=list)
+    links: list[str] = field(default_factory=list)
+    structured: bool = False  # True if embedded JSON was found
+
+    @property
+    def email(self) -> Optional[str]:
+        return self.emails[0] if self.emails else None
+
+
+def parse_link_page(url: str, html: str) -> LinkPage:
+    """Extract emails and outbound links from a link-in-bio page."""
+    page = LinkPage()
+    host = _host(url)
+    for blob in _embedded_json(html):
+        page.structured = True
+        root = _EXTRACTORS.get(host, _generic_root)(blob)
+        _walk(root if root is not None else blob, page, "")
+
+    if not page.structured:
+        # Plain HTML page — anchors are all we have for links
+        for m in _HREF_RE.finditer(html):
+            _add_link(page, m.group(1))
+    if not page.emails:
+        # Contact blocks are often rendered outside the embedded JSON
+        for m in MAILTO_RE.finditer(html):
+            _add_email(page, m.group(1))
+        email = extract_email(html)
+        if email:
+            _add_email(page, email)
+
+    page.links = [link for link in page.links if _host(link) != host]
+    return page
+
+
+# ── Per-platform roots ────────────────────────────────────────────────
+# Each returns the subtree holding the profile (links, socials, contact),
+# or None to walk the whole blob.
+
+
+def _dig(blob: Any, *path: str) -> Any:
+    for key in path:
+        if not isinstance(blob, dict):
+            return None
+        blob = blob.get(key)
+    return blob
+
+
+def _linktree_root(blob: Any) -> Any:
+    return _dig(blob, "props", "pageProps", "account") or _dig(blob, "props", "pageProps")
+
+
+def _beacons_root(blob: Any) -> Any:
+    return _dig(blob, "props", "pageProps", "profile") or _dig(blob, "props", "pageProps")
+
+
+def _generic_root(blob: Any) -> Any:
+    return _dig(blob, "props", "pageProps")
+
+
+_EXTRACTORS: dict[str, Callable[[Any], Any]] = {
+    "linktr.ee": _linktree_root,
+    "beacons.ai": _beacons_root,
+}
+
+
+# ── Internals ─────────────────────────────────────────────────────────
+
+
+def _embedded_json(html: str) -> list[Any]:
+    blobs: list[Any] = []
+    for regex in (_NEXT_DATA_RE, _LD_JSON_RE):
+        for m in regex.finditer(html):
+            try:
+                blobs.append(json.loads(m.group(1)))
+            except ValueError:
+                continue
+    for m in _STATE_RE.finditer(html):
+        try:
+            blob, _ = json.JSONDecoder().raw_decode(html, m.start(1))
+            blobs.append(blob)
+        except ValueError:
+            continue
+    return blobs
+
+
+def _walk(node: Any, page: LinkPage, key: str, depth: int = 0) -> None:
+    if depth > 30:
+        return
+    if isinstance(node, dict):
+        for k, v in node.items():
+            _walk(v, page, k.lower() if isinstance(k, str) else "", depth + 1)
+    elif isinstance(node, list):
+        for v in node:
+            _walk(v, page, key, depth + 1)
+    elif isinstance(node, str):
+        value = node.strip()
+        if value.lower().startswith("mailto:"):
+            _add_email(page, value[7:].split("?")[0])
+        elif key in _EMAIL_KEYS and "@" in value:
+            _add_email(page, value)
+        elif value.startswith(("http://", "https://")):
+            if key in _LINK_KEYS:
+                _add_link(page, value)
+        elif "@" in value and len(value) < 2000:
+            # Free text (bio, contact block) — take any address in it
+            for m in EMAIL_RE.finditer(value):
+                _add_email(page, m.group(0))
+
+
+def _add_email(page: LinkPage, candidate: str) -> None:
+    email = validate_email(candidate.strip())
+    if email and email not in page.emails:
+        page.emails.append(email)
+
+
+def _add_link(page: LinkPage, link: str) -> None:
+    if link not in page.links and not _is_asset(link):
+        page.links.append(link)
+
+
+def _is_asset(link: str) -> bool:
+    path = link.lower().split("//")[-1].split("?")[0].split("#")[0]
+    return path.endswith(_ASSET_EXTENSIONS) or bool(_ASSET_HOST_RE.search(_host(link)))
+
+
+def _host(url: str) -> str:
+    host = url.lower().split("//")[-1].split("/")[0].split("?")[0]
+    return host.removeprefix("www.")
@@ -1,8 +1,12 @@
 """
 Shared data models and constants for the SoundCloud scraper.
 """
+import os
 from dataclasses import dataclass, field
-from typing import Optional
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import urlparse
 
 from .email_utils import extract_email
 
@@ -40,10 +44,37 @@ GENRE_VARIANTS: dict[str, list[str]] = {
 }
 
 
+# apps/scraper — local state lives under its data/ whatever the working directory
+APP_DIR = Path(__file__).resolve().parents[2]
+
+
+def state_path(env_var: str, default: Optional[str] = None) -> Optional[str]:
+    """
+    Path of a local state file: env_var if set, else `default`. Relative
+    paths resolve against APP_DIR; empty and ':memory:' pass through.
+    """
+    value = os.environ.get(env_var, default)
+    if not value or value == ":memory:":
+        return value
+    return str(APP_DIR / value)
+
+
 SC_API = "https://api-v2.soundcloud.com"
 DEFAULT_CLIENT_ID = "WU4bVxk5Df0g5JC8ULzW77Ry7OM10Lyj"
 
 
+def endpoint_class(url: str) -> str:
+    """Bucket an SC API URL into an endpoint class (search, users, resolve, ...)."""
+    path = urlparse(url).path
+    for prefix, cls in (
+        ("/search", "search"), ("/resolve", "resolve"), ("/stream", "stream"),
+        ("/users", "users"), ("/playlists", "playlists"),
+    ):
+        if path.startswith(prefix):
+            return cls
+    return "other"
+
+
 @dataclass
 class ScrapedArtist:
     name: str
@@ -92,6 +123,81 @@ class ScrapedArtist:
         }
 
 
+# Bios are only kept for display; the full text is never needed after ingest
+BIO_MAX = 500
+
+# from_user() default: parse last_modified (None is a parsed "unknown")
+UNPARSED: Any = object()
+
+
+@dataclass(slots=True)
+class Candidate:
+    """
+    Compact discovery candidate, projected once from a SoundCloud user dict.
+    Attribute names match the API keys, and get() mirrors dict.get, so
+    filters and user_summary() take either form.
+    """
+    id: int
+    username: str = ""
+    permalink: str = ""
+    followers_count: int = 0
+    track_count: Optional[int] = None
+    genre: str = ""
+    last_modified: Optional[str] = None
+    avatar_url: str = ""
+    city: str = ""
+    country_code: str = ""
+    description: str = ""
+    source_tap: str = ""
+    modified_at: Optional[float] = None  # last_modified as epoch seconds
+    hits: int = 1  # sources / seed edges that surfaced this user
+    distance: Optional[int] = None  # hops from the seed, if found through its graph
+
+    @classmethod
+    def from_user(
+        cls, user: dict, source_tap: str = "", distance: Optional[int] = None, modified_at: Any = UNPARSED,
+    ) -> "Candidate":
+        """Project a user dict; pass modified_at if a filter already parsed last_modified."""
+        if modified_at is UNPARSED:
+            modified_at = parse_epoch(user.get("last_modified"))
+        bio = user.get("description") or ""
+        return cls(
+            id=user["id"],
+            username=user.get("username") or user.get("full_name") or "",
+            permalink=user.get("permalink") or "",
+            followers_count=user.get("followers_count") or 0,
+            track_count=user.get("track_count"),
+            genre=user.get("genre") or "",
+            last_modified=user.get("last_modified"),
+            avatar_url=user.get("avatar_url") or "",
+            city=user.get("city") or "",
+            country_code=user.get("country_code") or "",
+            description=bio[:BIO_MAX],
+            source_tap=source_tap,
+            modified_at=modified_at,
+            distance=distance,
+        )
+
+    def seen_again(self, distance: Optional[int] = None) -> None:
+        """Another source surfaced this user."""
+        self.hits += 1
+        if distance is not None and (self.distance is None or distance < self.distance):
+            self.distance = distance
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+
+def parse_epoch(iso_date: Optional[str]) -> Optional[float]:
+    """SoundCloud ISO timestamp to epoch seconds, or None if it doesn't parse."""
+    if not iso_date:
+        return None
+    try:
+        return datetime.fromisoformat(iso_date.replace("Z", "+00:00")).timestamp()
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
 def normalize_url(url: str) -> str:
     """Clean and normalize SoundCloud URL."""
     url = url.strip()
@@ -176,22 +282,26 @@ def build_artist(user: dict, sc_url: str, web_profiles: list[dict] = None) -> Sc
     )
 
 
-def user_summary(u: dict) -> dict:
+def user_summary(u: "dict | Candidate") -> dict:
     """Lightweight user summary for discovery results."""
-    avatar = u.get("avatar_url", "")
+    # `or` defaults: a Candidate holds None (or "") where a dict lacks the key
+    avatar = u.get("avatar_url") or ""
     if avatar:
         avatar = avatar.replace("-large.", "-t200x200.")
-    permalink = u.get("permalink", "")
+    permalink = u.get("permalink") or ""
+    # Epoch travels with the row so /filter-candidates never re-parses it
+    modified_at = u.modified_at if isinstance(u, Candidate) else parse_epoch(u.get("last_modified"))
     return {
-        "name": u.get("username") or "Unknown",
+        "name": u.get("username") or u.get("full_name") or "Unknown",
         "url": f"https://soundcloud.com/{permalink}" if permalink else "",
-        "followers": u.get("followers_count", 0),
-        "track_count": u.get("track_count", 0),
-        "genre": u.get("genre", ""),
+        "followers": u.get("followers_count") or 0,
+        "track_count": u.get("track_count") or 0,
+        "genre": u.get("genre") or "",
         "avatar_url": avatar,
-        "city": u.get("city", ""),
-        "country": u.get("country_code", ""),
+        "city": u.get("city") or "",
+        "country": u.get("country_code") or "",
         "last_modified": u.get("last_modified"),
+        "modified_at": modified_at,
         "sc_user_id": u.get("id"),
     }
 
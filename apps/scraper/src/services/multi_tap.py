@@ -4,13 +4,28 @@ Ported from TempoV3's Smart Lead Generator.
 """
 import asyncio
 import logging
-from datetime import datetime, timezone, timedelta
-from typing import Optional, Any
-
-from .models import SC_API, GENRE_VARIANTS
+from contextlib import aclosing
+from typing import Optional, Any, AsyncIterator, Awaitable, Callable
+
+from . import codec
+from .models import SC_API, GENRE_VARIANTS, Candidate
+from .pagination import iter_offset_pages
+from .tap_scheduler import TapScheduler
+from .pipeline import Stage, run_pipeline, iter_completed
+from .columnar import admit_candidates, recency_cutoff
+from .ranking import Ranker
+from .graph_crawler import CrawlConfig
 
 logger = logging.getLogger(__name__)
 
+# Taps push each batch of users here as it arrives
+OnUsers = Callable[[list[dict]], Awaitable[Any]]
+
+# Per-tap fan-out. With a request budget the taps get the wider fan-out and
+# the scheduler decides how much of it each one actually spends.
+DEFAULT_FANOUT = {"trending_pages": 3, "playlists": 20, "labels": 10, "genres": 6}
+BUDGETED_FANOUT = {"trending_pages": 6, "playlists": 40, "labels": 20, "genres": 8}
+
 
 async def multi_tap_discover(
     scraper: Any,  # SoundCloudScraper instance
@@ -20,35 +35,56 @@ async def multi_tap_discover(
     seed_url: Optional[str] = None,
     uploaded_within_days: Optional[int] = None,
     target_pool: int = 1000,
+    max_results: Optional[int] = None,
+    crawl: Optional[CrawlConfig] = None,
     progress_callback: Optional[Any] = None,
+    deadline_seconds: Optional[float] = None,
+    request_budget: Optional[int] = None,
 ) -> dict:
     """
     Multi-tap genre-driven discovery. Pulls candidates from 5 parallel
-    sources to build a diverse pool of 500-1000 artists.
+    sources. Taps stream users into the pool as pages arrive; once
+    target_pool filtered candidates exist the remaining taps are cancelled.
+
+    With deadline_seconds / request_budget, a TapScheduler caps SoundCloud
+    requests and steers budget to the highest-yield taps; hitting either
+    limit returns partial results with truncated=True.
+
+    Results come back ranked (see ranking.Ranker), best first, each with its
+    score breakdown; max_results keeps only the top slice. The seed tap walks
+    the seed's graph with a GraphCrawler shaped by `crawl`.
     """
     genre_lower = genre.lower().strip()
     variants = GENRE_VARIANTS.get(genre_lower, [])
     all_genres = [genre_lower] + [v for v in variants if v != genre_lower]
 
-    pool: dict[int, dict] = {}  # sc_user_id -> user dict
-    tap_stats = {"trending": 0, "playlists": 0, "labels": 0, "seed_graph": 0, "genre_search": 0}
+    cutoff = recency_cutoff(uploaded_within_days)
 
-    def _add_to_pool(users: list[dict], source: str) -> int:
-        added = 0
+    pool: dict[int, Candidate] = {}  # sc_user_id -> candidate (passed every filter)
+    seen: set[int] = set()
+    in_range = 0
+    tap_stats = {"trending": 0, "playlists": 0, "labels": 0, "seed_graph": 0, "genre_search": 0}
+    pool_full = asyncio.Event()
+    fanout = BUDGETED_FANOUT if request_budget else DEFAULT_FANOUT
+    pipeline_stats: dict[str, dict] = {}
+    crawler = scraper.graph_crawler(min_followers, max_followers, crawl) if seed_url else None
+
+    def _admit(users: list[dict], source: str, distance: Optional[int]) -> list[Candidate]:
+        """Dedup and filter one page of users, then project the survivors."""
+        nonlocal in_range
+        fresh = []
         for user in users:
             uid = user.get("id")
-            if not uid or uid in pool:
-                continue
-            followers = user.get("followers_count", 0) or 0
-            if followers < min_followers or followers > max_followers:
-                continue
-            tc = user.get("track_count")
-            if tc is not None and tc < 1:
-                continue
-            user["_source_tap"] = source
-            pool[uid] = user
-            added += 1
-        return added
+            if uid and uid not in seen:
+                seen.add(uid)
+                fresh.append(user)
+            elif uid in pool:
+                pool[uid].seen_again(distance)
+        passed, stats = admit_candidates(
+            fresh, min_followers, max_followers, cutoff, missing_tracks_ok=True, source_tap=source, distance=distance,
+        )
+        in_range += stats["passed"] + stats["too_old"]
+        return passed
 
     async def _notify(event: str, data: dict) -> None:
         if progress_callback:
@@ -57,171 +93,181 @@ async def multi_tap_discover(
             except Exception:
                 pass
 
-    # --- Tap 1: Trending tracks ---
-    async def tap_trending() -> int:
-        users = await _search_trending_tracks(scraper, genre_lower, all_genres, pages=3)
-        count = _add_to_pool(users, "trending")
-        tap_stats["trending"] = count
-        await _notify("tap_complete", {"tap": "trending", "candidates": count})
-        return count
-
-    # --- Tap 2: Playlist mining ---
-    async def tap_playlists() -> int:
-        users = await _search_playlists(scraper, genre_lower, max_playlists=20)
-        count = _add_to_pool(users, "playlists")
-        tap_stats["playlists"] = count
-        await _notify("tap_complete", {"tap": "playlists", "candidates": count})
-        return count
-
-    # --- Tap 3: Label rosters ---
-    async def tap_labels() -> int:
-        users = await _find_label_rosters(scraper, genre_lower, max_labels=10)
-        count = _add_to_pool(users, "labels")
-        tap_stats["labels"] = count
-        await _notify("tap_complete", {"tap": "labels", "candidates": count})
-        return count
+    def _ingester(source: str) -> Callable[..., Awaitable[int]]:
+        async def _ingest(users: list[dict], distance: Optional[int] = None) -> int:
+            if pool_full.is_set():
+                return 0
+            batch = []
+            for candidate in _admit(users, source, distance):
+                if pool_full.is_set():
+                    break
+                pool[candidate.id] = candidate
+                batch.append(_result_row(candidate))
+                if len(pool) >= target_pool:
+                    pool_full.set()
+            if batch:
+                tap_stats[source] += len(batch)
+                scheduler.credit(source, len(batch))
+                await _notify("candidates", {"tap": source, "results": batch, "pool_size": len(pool)})
+            return len(batch)
+        return _ingest
+
+    async def _run_tap(name: str, fn: Callable[[], Awaitable[Any]]) -> None:
+        extra: dict = {}
+        try:
+            with scheduler.bind(name):
+                await fn()
+        except asyncio.CancelledError:
+            extra["cancelled"] = True
+            raise
+        finally:
+            await _notify("tap_complete", {"tap": name, "candidates": tap_stats[name], **extra})
 
     # --- Tap 4: Seed graph (optional) ---
-    async def tap_seed_graph() -> int:
-        if not seed_url:
-            await _notify("tap_complete", {"tap": "seed_graph", "candidates": 0, "skipped": True})
-            return 0
+    async def tap_seed_graph() -> None:
+        ingest = _ingester("seed_graph")
         from .models import normalize_url
-        clean = normalize_url(seed_url)
-        seed_user = await scraper._resolve(clean)
+        seed_user = await scraper._resolve(normalize_url(seed_url))
         if not seed_user:
-            return 0
-        seed_id = seed_user.get("id")
-
-        # Level 1
-        l1 = await asyncio.gather(
-            scraper._followings_paginated(seed_id, max_pages=3),
-            scraper._followers_paginated(seed_id, max_pages=2),
-            scraper._related(seed_id),
-            return_exceptions=True,
-        )
-        l1_users: list[dict] = []
-        for r in l1:
-            if isinstance(r, list):
-                l1_users.extend(r)
-        count = _add_to_pool(l1_users, "seed_graph")
-
-        # Level 2: top 10 from L1 -> their followings + related
-        l1_in_pool = [u for u in l1_users if u.get("id") in pool][:10]
-        l2_tasks = []
-        for u in l1_in_pool:
-            uid = u.get("id")
-            if uid:
-                l2_tasks.append(scraper._followings(uid))
-                l2_tasks.append(scraper._related(uid))
-        if l2_tasks:
-            l2 = await asyncio.gather(*l2_tasks, return_exceptions=True)
-            for r in l2:
-                if isinstance(r, list):
-                    count += _add_to_pool(r, "seed_graph")
-
-        tap_stats["seed_graph"] = count
-        await _notify("tap_complete", {"tap": "seed_graph", "candidates": count})
-        return count
+            return
+        async with aclosing(crawler.crawl(seed_user)) as batches:
+            async for distance, users in batches:
+                await ingest(users, distance)
 
     # --- Tap 5: Genre/tag search ---
-    async def tap_genre_search() -> int:
+    async def tap_genre_search() -> None:
+        ingest = _ingester("genre_search")
         tasks = []
-        for g in all_genres[:6]:
+        for g in all_genres[:fanout["genres"]]:
             tasks.append(scraper._search(g, limit=200))
             tasks.append(scraper._search_tracks_by_tag(g, limit=200))
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        all_users: list[dict] = []
-        for r in results:
-            if isinstance(r, list):
-                all_users.extend(r)
-        count = _add_to_pool(all_users, "genre_search")
-        tap_stats["genre_search"] = count
-        await _notify("tap_complete", {"tap": "genre_search", "candidates": count})
-        return count
-
-    # Run all 5 taps concurrently
+        async with aclosing(iter_completed(tasks)) as results:
+            async for users in results:
+                await ingest(users)
+
+    taps: dict[str, Callable[[], Awaitable[Any]]] = {
+        "trending": lambda: _search_trending_tracks(
+            scraper, genre_lower, all_genres, pages=fanout["trending_pages"], on_users=_ingester("trending")),
+        "playlists": lambda: _search_playlists(
+            scraper, genre_lower, max_playlists=fanout["playlists"],
+            on_users=_ingester("playlists"), stage_metrics=pipeline_stats),
+        "labels": lambda: _find_label_rosters(
+            scraper, genre_lower, max_labels=fanout["labels"],
+            on_users=_ingester("labels"), stage_metrics=pipeline_stats),
+        "genre_search": tap_genre_search,
+    }
+    if seed_url:
+        taps["seed_graph"] = tap_seed_graph
+    else:
+        await _notify("tap_complete", {"tap": "seed_graph", "candidates": 0, "skipped": True})
+
+    scheduler = TapScheduler(list(taps), request_budget=request_budget, deadline=deadline_seconds)
+
+    # Run taps concurrently; stop as soon as the pool is full or time is up
     await _notify("phase", {"phase": "crawl", "status": "running"})
-    await asyncio.gather(
-        tap_trending(), tap_playlists(), tap_labels(),
-        tap_seed_graph(), tap_genre_search(),
-        return_exceptions=True,
-    )
-
-    total_found = len(pool)
-    await _notify("crawl_progress", {"candidates_found": total_found, "taps_completed": 5, "taps_total": 5})
-
-    # Apply upload recency filter
-    if uploaded_within_days and uploaded_within_days > 0:
-        cutoff = datetime.now(timezone.utc) - timedelta(days=uploaded_within_days)
-        filtered_pool = {}
-        for uid, user in pool.items():
-            last_mod = user.get("last_modified")
-            if last_mod:
-                try:
-                    last_dt = datetime.fromisoformat(last_mod.replace("Z", "+00:00"))
-                    if last_dt < cutoff:
-                        continue
-                except Exception:
-                    pass
-            filtered_pool[uid] = user
-        pool = filtered_pool
-
-    # Build results
-    results = []
-    for uid, user in pool.items():
-        avatar = user.get("avatar_url", "")
-        if avatar:
-            avatar = avatar.replace("-large.", "-t200x200.")
-        permalink = user.get("permalink", "")
-        results.append({
-            "name": user.get("username") or user.get("full_name") or "Unknown",
-            "url": f"https://soundcloud.com/{permalink}" if permalink else "",
-            "followers": user.get("followers_count", 0),
-            "track_count": user.get("track_count", 0),
-            "genre": user.get("genre", ""),
-            "last_modified": user.get("last_modified", ""),
-            "avatar_url": avatar,
-            "city": user.get("city", ""),
-            "country": user.get("country_code", ""),
-            "sc_user_id": uid,
-            "bio": user.get("description", ""),
-            "source_tap": user.get("_source_tap", "unknown"),
-        })
-
-    return {"results": results, "total_found": total_found, "filtered_count": len(results), "tap_stats": tap_stats}
+    tasks = [asyncio.create_task(_run_tap(name, fn)) for name, fn in taps.items()]
+    full_waiter = asyncio.create_task(pool_full.wait())
+    timed_out = False
+    while not pool_full.is_set() and not all(t.done() for t in tasks):
+        pending = [t for t in tasks if not t.done()]
+        done, _ = await asyncio.wait(
+            [*pending, full_waiter], timeout=scheduler.time_left(), return_when=asyncio.FIRST_COMPLETED,
+        )
+        if not done:
+            timed_out = True
+            break
+    stopped_early = pool_full.is_set() and not all(t.done() for t in tasks)
+    for t in [*tasks, full_waiter]:
+        t.cancel()
+    await asyncio.gather(*tasks, full_waiter, return_exceptions=True)
+    truncated = timed_out or (scheduler.truncated and not pool_full.is_set())
+
+    await _notify("crawl_progress", {
+        "candidates_found": in_range, "taps_completed": len(taps), "taps_total": len(taps),
+        "stopped_early": stopped_early, "truncated": truncated,
+    })
+
+    ranker = Ranker([genre_lower], min_followers, max_followers)
+    results = [{**_result_row(r.candidate), **r.to_dict()} for r in ranker.top(pool.values(), max_results)]
+    return {
+        "results": results,
+        "total_found": in_range,
+        "filtered_count": len(pool),
+        "tap_stats": tap_stats,
+        "stopped_early": stopped_early,
+        "truncated": truncated,
+        "scheduler": scheduler.stats(),
+        "pipeline_stats": pipeline_stats,
+        "graph_crawl": crawler.stats() if crawler else None,
+    }
+
+
+def _result_row(c: Candidate) -> dict:
+    """Shape a pool entry for the API response."""
+    avatar = c.avatar_url.replace("-large.", "-t200x200.")
+    return {
+        "name": c.username or "Unknown",
+        "url": f"https://soundcloud.com/{c.permalink}" if c.permalink else "",
+        "followers": c.followers_count,
+        "track_count": c.track_count or 0,
+        "genre": c.genre,
+        "last_modified": c.last_modified or "",
+        "modified_at": c.modified_at,
+        "avatar_url": avatar,
+        "city": c.city,
+        "country": c.country_code,
+        "sc_user_id": c.id,
+        "bio": c.description,
+        "source_tap": c.source_tap or "unknown",
+    }
+
+
+async def _emit(on_users: Optional[OnUsers], users: list[dict]) -> None:
+    if on_users and users:
+        await on_users(users)
 
 
 # ── Tap helpers ──────────────────────────────────────────────────────
 
 
-async def _search_trending_tracks(scraper: Any, genre: str, all_genres: list[str], pages: int = 3) -> list[dict]:
+async def _search_trending_tracks(
+    scraper: Any, genre: str, all_genres: list[str], pages: int = 3, on_users: Optional[OnUsers] = None,
+) -> list[dict]:
     """Tap 1: trending tracks in genre, extract unique artists."""
+    queries = [genre] + [g for g in all_genres if g != genre][:2]
     all_users: list[dict] = []
     seen_ids: set[int] = set()
-    for page in range(pages):
-        for query in [genre] + all_genres[:2]:
-            params = {"q": query, "client_id": scraper.client_id, "limit": 200, "offset": page * 200}
-            try:
-                resp = await scraper._get(f"{SC_API}/search/tracks", params)
-                if resp.status_code == 401:
-                    await scraper._refresh_id()
-                    params["client_id"] = scraper.client_id
-                    resp = await scraper._get(f"{SC_API}/search/tracks", params)
-                if resp.status_code != 200:
-                    continue
-                for track in resp.json().get("collection", []):
-                    user = track.get("user")
-                    if user and user.get("id") not in seen_ids:
+
+    async def _query_tracks(query: str) -> None:
+        try:
+            async for collection in iter_offset_pages(
+                scraper, f"{SC_API}/search/tracks", {"q": query}, max_pages=pages, limit=200, users_only=True,
+            ):
+                batch = []
+                for user in collection:
+                    if user.get("id") not in seen_ids:
                         seen_ids.add(user["id"])
-                        all_users.append(user)
-            except Exception as e:
-                logger.debug(f"Trending search failed for {query} page {page}: {e}")
+                        batch.append(user)
+                all_users.extend(batch)
+                await _emit(on_users, batch)
+        except Exception as e:
+            logger.debug(f"Trending search failed for {query}: {e}")
+
+    await asyncio.gather(*[_query_tracks(q) for q in queries])
     return all_users
 
 
-async def _search_playlists(scraper: Any, genre: str, max_playlists: int = 20) -> list[dict]:
-    """Tap 2: find playlists in genre, extract artists from tracks."""
+async def _search_playlists(
+    scraper: Any,
+    genre: str,
+    max_playlists: int = 20,
+    on_users: Optional[OnUsers] = None,
+    stage_metrics: Optional[dict] = None,
+) -> list[dict]:
+    """
+    Tap 2: find playlists in genre, extract artists from tracks.
+    Pipeline: playlist search -> full track list expansion.
+    """
     queries = [
         f"best {genre} 2026", f"best {genre} 2025", f"underground {genre}",
         f"{genre} vibes", f"{genre} picks", f"{genre} new", f"{genre} mix", f"fresh {genre}",
@@ -230,40 +276,46 @@ async def _search_playlists(scraper: Any, genre: str, max_playlists: int = 20) -
     seen_ids: set[int] = set()
     playlist_ids: list[int] = []
 
-    for query in queries:
+    async def _collect(users: list[dict]) -> None:
+        batch = []
+        for u in users:
+            uid = u.get("id")
+            if uid and uid not in seen_ids:
+                seen_ids.add(uid)
+                batch.append(u)
+        all_users.extend(batch)
+        await _emit(on_users, batch)
+
+    async def search(query: str) -> list[int]:
         if len(playlist_ids) >= max_playlists:
-            break
+            return []
         for endpoint in ["/search/playlists_without_albums", "/search/playlists"]:
             params = {"q": query, "client_id": scraper.client_id, "limit": 10}
             try:
                 resp = await scraper._get(f"{SC_API}{endpoint}", params)
-                if resp.status_code == 401:
-                    await scraper._refresh_id()
-                    params["client_id"] = scraper.client_id
-                    resp = await scraper._get(f"{SC_API}{endpoint}", params)
                 if resp.status_code != 200:
                     continue
-                for pl in resp.json().get("collection", []):
+                new_ids = []
+                for pl in codec.loads(resp.content).get("collection", []):
                     pid = pl.get("id")
-                    if pid and pid not in playlist_ids:
+                    if pid and pid not in playlist_ids and len(playlist_ids) < max_playlists:
                         playlist_ids.append(pid)
-                        for track in pl.get("tracks", []):
-                            user = track.get("user")
-                            if user and user.get("id") and user["id"] not in seen_ids:
-                                seen_ids.add(user["id"])
-                                all_users.append(user)
-                break  # First endpoint worked, skip fallback
+                        new_ids.append(pid)
+                        await _collect([t["user"] for t in pl.get("tracks", []) if t.get("user")])
+                return new_ids  # First endpoint worked, skip fallback
             except Exception:
                 continue
+        return []
 
-    # Fetch full track lists for playlists
-    for pid in playlist_ids:
-        users = await _fetch_playlist_artists(scraper, pid)
-        for u in users:
-            uid = u.get("id")
-            if uid and uid not in seen_ids:
-                seen_ids.add(uid)
-                all_users.append(u)
+    async def expand(pid: int) -> None:
+        await _collect(await _fetch_playlist_artists(scraper, pid))
+
+    metrics = await run_pipeline(queries, [
+        Stage("search", search, concurrency=2),
+        Stage("expand", expand, concurrency=4),
+    ])
+    if stage_metrics is not None:
+        stage_metrics["playlists"] = metrics
     return all_users
 
 
@@ -272,15 +324,11 @@ async def _fetch_playlist_artists(scraper: Any, playlist_id: int) -> list[dict]:
     params = {"client_id": scraper.client_id}
     try:
         resp = await scraper._get(f"{SC_API}/playlists/{playlist_id}", params)
-        if resp.status_code == 401:
-            await scraper._refresh_id()
-            params["client_id"] = scraper.client_id
-            resp = await scraper._get(f"{SC_API}/playlists/{playlist_id}", params)
         if resp.status_code != 200:
             return []
         seen: set[int] = set()
         users: list[dict] = []
-        for track in resp.json().get("tracks", []):
+        for track in codec.loads(resp.content).get("tracks", []):
             user = track.get("user")
             if user and user.get("id") not in seen:
                 seen.add(user["id"])
@@ -290,38 +338,51 @@ async def _fetch_playlist_artists(scraper: Any, playlist_id: int) -> list[dict]:
         return []
 
 
-async def _find_label_rosters(scraper: Any, genre: str, max_labels: int = 10) -> list[dict]:
-    """Tap 3: find labels/collectives in genre, return their followings."""
+async def _find_label_rosters(
+    scraper: Any,
+    genre: str,
+    max_labels: int = 10,
+    on_users: Optional[OnUsers] = None,
+    stage_metrics: Optional[dict] = None,
+) -> list[dict]:
+    """
+    Tap 3: find labels/collectives in genre, return their followings.
+    Pipeline: label search -> roster (followings) expansion.
+    """
     label_queries = [f"{genre} label", f"{genre} collective", f"{genre} records", f"{genre} crew"]
     label_ids: list[int] = []
+    all_users: list[dict] = []
 
-    for query in label_queries:
+    async def search(query: str) -> list[int]:
         if len(label_ids) >= max_labels:
-            break
-        try:
-            users = await scraper._search(query, limit=50)
-            for u in users:
-                uid = u.get("id")
-                if uid and uid not in label_ids:
-                    bio = (u.get("description") or "").lower()
-                    name = (u.get("username") or "").lower()
-                    followings_count = u.get("followings_count", 0) or 0
-                    is_label = (
-                        followings_count > 20
-                        and any(kw in bio or kw in name for kw in ["label", "collective", "crew", "records", "imprint"])
-                    )
-                    if is_label:
-                        label_ids.append(uid)
-                        if len(label_ids) >= max_labels:
-                            break
-        except Exception:
-            continue
-
-    all_users: list[dict] = []
-    for lid in label_ids:
-        try:
-            followings = await scraper._followings_paginated(lid, max_pages=2)
-            all_users.extend(followings)
-        except Exception:
-            continue
+            return []
+        new_ids = []
+        for u in await scraper._search(query, limit=50):
+            uid = u.get("id")
+            if uid and uid not in label_ids:
+                bio = (u.get("description") or "").lower()
+                name = (u.get("username") or "").lower()
+                followings_count = u.get("followings_count", 0) or 0
+                is_label = (
+                    followings_count > 20
+                    and any(kw in bio or kw in name for kw in ["label", "collective", "crew", "records", "imprint"])
+                )
+                if is_label:
+                    label_ids.append(uid)
+                    new_ids.append(uid)
+                    if len(label_ids) >= max_labels:
+                        break
+        return new_ids
+
+    async def roster(lid: int) -> None:
+        followings = await scraper._followings_paginated(lid, max_pages=2)
+        all_users.extend(followings)
+        await _emit(on_users, followings)
+
+    metrics = await run_pipeline(label_queries, [
+        Stage("search", search, concurrency=2),
+        Stage("roster", roster, concurrency=3),
+    ])
+    if stage_metrics is not None:
+        stage_metrics["labels"] = metrics
     return all_users
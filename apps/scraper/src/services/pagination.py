@@ -0,0 +1,140 @@
+"""
+Pagination engine for SoundCloud collection endpoints.
+
+Two modes:
+- cursor: follow next_href one page at a time (followers/followings use
+  opaque cursors, so pages can't be predicted)
+- offset: endpoints like /search/users and /search/tracks take a plain
+  offset, so a window of pages is prefetched concurrently
+
+Both are async generators that yield each page's collection as it arrives,
+so callers can stop early. With users_only, track pages yield just each
+track's user (see codec.extract_users) instead of the full tracks. Wrap
+them in contextlib.aclosing() when breaking out of the loop so outstanding
+requests are cancelled promptly.
+"""
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Optional
+from urllib.parse import urlparse, parse_qs
+
+from . import codec
+
+logger = logging.getLogger(__name__)
+
+
+OFFSET_ENDPOINTS = ("/search/users", "/search/tracks", "/search/playlists")
+
+
+def is_offset_paginated(url: str) -> bool:
+    return urlparse(url).path.startswith(OFFSET_ENDPOINTS)
+
+
+async def iter_cursor_pages(
+    scraper: Any,  # SoundCloudScraper instance
+    url: str,
+    params: dict,
+    max_pages: int = 3,
+    limit: int = 200,
+    users_only: bool = False,
+) -> AsyncIterator[list[dict]]:
+    """Follow SC's next_href cursor, yielding one collection per page."""
+    params = {**params, "client_id": scraper.client_id, "limit": limit}
+    for _ in range(max_pages):
+        data = await _fetch_page(scraper, url, params, users_only)
+        if not data:
+            return
+        collection = data.get("collection", [])
+        if not collection:
+            return
+        yield collection
+        next_href = data.get("next_href")
+        if not next_href:
+            return
+        url = next_href.split("?")[0]
+        params = {k: v[0] for k, v in parse_qs(urlparse(next_href).query).items()}
+        params["client_id"] = scraper.client_id
+
+
+async def iter_offset_pages(
+    scraper: Any,
+    url: str,
+    params: dict,
+    max_pages: int = 3,
+    limit: int = 200,
+    window: int = 3,
+    users_only: bool = False,
+) -> AsyncIterator[list[dict]]:
+    """
+    Prefetch up to `window` offset pages concurrently, yielding them in order.
+    Stops at the first empty page or the first page without a next_href.
+    """
+    base = {**params, "limit": limit}
+    pending: dict[int, asyncio.Task] = {}
+    next_page = 0
+
+    def _schedule() -> None:
+        nonlocal next_page
+        while next_page < max_pages and len(pending) < window:
+            page_params = {**base, "client_id": scraper.client_id, "offset": next_page * limit}
+            pending[next_page] = asyncio.ensure_future(_fetch_page(scraper, url, page_params, users_only))
+            next_page += 1
+
+    try:
+        page = 0
+        _schedule()
+        while page in pending:
+            data = await pending.pop(page)
+            page += 1
+            collection = (data or {}).get("collection", [])
+            if not collection:
+                return
+            yield collection
+            if not data.get("next_href"):
+                return
+            _schedule()
+    finally:
+        for task in pending.values():
+            task.cancel()
+
+
+def iter_pages(
+    scraper: Any,
+    url: str,
+    params: dict,
+    max_pages: int = 3,
+    limit: int = 200,
+    users_only: bool = False,
+) -> AsyncIterator[list[dict]]:
+    """Pick offset prefetch or cursor walking based on the endpoint."""
+    if is_offset_paginated(url):
+        return iter_offset_pages(scraper, url, params, max_pages=max_pages, limit=limit, users_only=users_only)
+    return iter_cursor_pages(scraper, url, params, max_pages=max_pages, limit=limit, users_only=users_only)
+
+
+async def collect_pages(
+    scraper: Any,
+    url: str,
+    params: dict,
+    max_pages: int = 3,
+    limit: int = 200,
+) -> list[dict]:
+    """Collect every page into one list (the old _paginated_fetch contract)."""
+    items: list[dict] = []
+    async for collection in iter_pages(scraper, url, params, max_pages=max_pages, limit=limit):
+        items.extend(collection)
+    return items
+
+
+async def _fetch_page(scraper: Any, url: str, params: dict, users_only: bool = False) -> Optional[dict]:
+    try:
+        resp = await scraper._get(url, params)
+        if resp.status_code != 200:
+            return None
+        if users_only:
+            users, next_href = codec.extract_users(resp.content)
+            return {"collection": users, "next_href": next_href}
+        return codec.loads(resp.content)
+    except Exception as e:
+        logger.debug(f"Page fetch failed for {url}: {e}")
+        return None
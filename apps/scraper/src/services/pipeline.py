@@ -0,0 +1,251 @@
+"""
+Bounded-concurrency async pipelines.
+Stages are joined by bounded queues; each stage runs its own pool of
+workers and records timing metrics. A stage can hand its concurrency to an
+AdaptiveLimit, which tunes it from observed latency and error rate.
+"""
+import time
+import asyncio
+import logging
+import statistics
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+@dataclass
+class StageMetrics:
+    processed: int = 0
+    emitted: int = 0
+    errors: int = 0
+    busy_time: float = 0.0
+    max_latency: float = 0.0
+    started: Optional[float] = None
+    finished: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        wall = (self.finished or time.monotonic()) - self.started if self.started else 0.0
+        return {
+            "processed": self.processed,
+            "emitted": self.emitted,
+            "errors": self.errors,
+            "avg_latency_ms": round(self.busy_time / self.processed * 1000, 1) if self.processed else 0.0,
+            "max_latency_ms": round(self.max_latency * 1000, 1),
+            "wall_ms": round(wall * 1000, 1),
+        }
+
+
+class AdaptiveLimit:
+    """
+    Gradient concurrency limit. Every `window` completions: halve on an
+    error rate above `error_threshold`, step down when median latency has
+    inflated past `tolerance` x the best window seen, else step up.
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 16,
+        window: int = 8,
+        error_threshold: float = 0.25,
+        tolerance: float = 1.5,
+    ) -> None:
+        self.limit = max(min_limit, min(initial, max_limit))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.window = window
+        self.error_threshold = error_threshold
+        self.tolerance = tolerance
+        self.in_flight = 0
+        self.increases = 0
+        self.decreases = 0
+        self._baseline: Optional[float] = None
+        self._latencies: list[float] = []
+        self._errors = 0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+    async def release(self, latency: float, error: bool) -> None:
+        async with self._cond:
+            self.in_flight -= 1
+            self._latencies.append(latency)
+            self._errors += int(error)
+            if len(self._latencies) >= self.window:
+                self._adjust()
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "increases": self.increases,
+            "decreases": self.decreases,
+            "baseline_ms": round(self._baseline * 1000, 1) if self._baseline else None,
+        }
+
+    def _adjust(self) -> None:
+        latency = statistics.median(self._latencies)
+        error_rate = self._errors / len(self._latencies)
+        self._latencies.clear()
+        self._errors = 0
+        # Drift the baseline up a little so one fast window doesn't pin it forever
+        self._baseline = min(self._baseline * 1.05, latency) if self._baseline else latency
+        if error_rate > self.error_threshold:
+            new = max(self.min_limit, self.limit // 2)
+        elif latency > self._baseline * self.tolerance:
+            new = max(self.min_limit, self.limit - 1)
+        else:
+            new = min(self.max_limit, self.limit + 1)
+        if new > self.limit:
+            self.increases += 1
+        elif new < self.limit:
+            self.decreases += 1
+        self.limit = new
+
+
+@dataclass
+class Stage:
+    """
+    One pipeline step. fn takes an item and returns an iterable of items for
+    the next stage (or None to drop it). The last stage's outputs go to the sink.
+    With `limit`, concurrency is tuned at runtime (up to limit.max_limit);
+    `failed` marks outputs that count as errors for it besides exceptions.
+    `on_error(item, exc)` gives the outputs for an item whose fn raised;
+    without it the item is dropped.
+    """
+    name: str
+    fn: Callable[[Any], Awaitable[Optional[Iterable[Any]]]]
+    concurrency: int = 2
+    queue_size: int = 32
+    limit: Optional[AdaptiveLimit] = None
+    failed: Optional[Callable[[Any], bool]] = None
+    on_error: Optional[Callable[[Any, Exception], Iterable[Any]]] = None
+    metrics: StageMetrics = field(default_factory=StageMetrics)
+
+
+async def run_pipeline(
+    source: Iterable[Any],
+    stages: list[Stage],
+    sink: Optional[Callable[[Any], Awaitable[Any]]] = None,
+) -> dict:
+    """Push source items through the stages. Returns per-stage metrics."""
+    queues = [asyncio.Queue(maxsize=s.queue_size) for s in stages]
+    workers: list[list[asyncio.Task]] = []
+
+    async def _deliver(index: int, item: Any) -> None:
+        if index < len(queues):
+            await queues[index].put(item)
+        elif sink:
+            await sink(item)
+
+    async def _worker(index: int) -> None:
+        stage = stages[index]
+        while True:
+            item = await queues[index].get()
+            if item is _DONE:
+                return
+            if stage.limit:
+                await stage.limit.acquire()
+            start = time.monotonic()
+            error = False
+            outputs = None
+            try:
+                outputs = list(await stage.fn(item) or ())
+                error = bool(stage.failed) and any(stage.failed(out) for out in outputs)
+            except Exception as e:
+                error = True
+                stage.metrics.errors += 1
+                logger.debug(f"Pipeline stage {stage.name} failed: {e}")
+                if stage.on_error:
+                    outputs = list(stage.on_error(item, e))
+            finally:
+                elapsed = time.monotonic() - start
+                stage.metrics.processed += 1
+                stage.metrics.busy_time += elapsed
+                stage.metrics.max_latency = max(stage.metrics.max_latency, elapsed)
+                if stage.limit:
+                    await stage.limit.release(elapsed, error)
+            for out in outputs or ():
+                stage.metrics.emitted += 1
+                await _deliver(index + 1, out)
+
+    async def _close_stage(index: int) -> None:
+        """Wait for a stage to drain, then close the next one."""
+        await asyncio.gather(*workers[index])
+        stages[index].metrics.finished = time.monotonic()
+        if index + 1 < len(stages):
+            for _ in workers[index + 1]:
+                await queues[index + 1].put(_DONE)
+
+    now = time.monotonic()
+    for i, stage in enumerate(stages):
+        stage.metrics.started = now
+        size = stage.limit.max_limit if stage.limit else stage.concurrency
+        workers.append([asyncio.create_task(_worker(i)) for _ in range(max(1, size))])
+    closers = [asyncio.create_task(_close_stage(i)) for i in range(len(stages))]
+
+    try:
+        for item in source:
+            await queues[0].put(item)
+        for _ in workers[0]:
+            await queues[0].put(_DONE)
+        await asyncio.gather(*closers)
+    finally:
+        for task in [*closers, *(t for ws in workers for t in ws)]:
+            task.cancel()
+
+    return {
+        stage.name: {**stage.metrics.to_dict(), **({"concurrency": stage.limit.stats()} if stage.limit else {})}
+        for stage in stages
+    }
+
+
+async def iter_completed(coros: list[Awaitable[list[dict]]]) -> AsyncIterator[list[dict]]:
+    """Yield list results as they finish; cancel whatever is left when closed early."""
+    tasks = [asyncio.ensure_future(c) for c in coros]
+    try:
+        for fut in asyncio.as_completed(tasks):
+            try:
+                result = await fut
+            except Exception:
+                continue
+            if isinstance(result, list):
+                yield result
+    finally:
+        for t in tasks:
+            t.cancel()
+
+
+async def merge(*sources: AsyncIterator[Any]) -> AsyncIterator[Any]:
+    """Interleave async iterators, yielding items as they arrive; closing cancels the rest."""
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def _pump(source: AsyncIterator[Any]) -> None:
+        try:
+            async for item in source:
+                queue.put_nowait(item)
+        except Exception as e:
+            logger.warning(f"Merged source failed: {e}")
+        finally:
+            queue.put_nowait(_DONE)
+
+    tasks = [asyncio.ensure_future(_pump(s)) for s in sources]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            item = await queue.get()
+            if item is _DONE:
+                remaining -= 1
+            else:
+                yield item
+    finally:
+        for t in tasks:
+            t.cancel()
@@ -0,0 +1,108 @@
+"""
+Candidate ranking.
+
+Each candidate gets five signals in [0, 1] — how many sources surfaced it,
+graph distance from the seed, recency of last_modified, genre match and
+position in the follower band — combined with weights into one score.
+top() keeps the best k with a heap rather than sorting the whole pool.
+"""
+import math
+import time
+import heapq
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from .models import GENRE_VARIANTS, Candidate
+
+
+DEFAULT_WEIGHTS: dict[str, float] = {
+    "sources": 0.25,
+    "distance": 0.2,
+    "recency": 0.2,
+    "genre": 0.2,
+    "band": 0.15,
+}
+
+# Days for the recency signal to halve
+RECENCY_HALF_LIFE_DAYS = 90
+
+# Genre match levels
+EXACT, PARTIAL, VARIANT = 1.0, 0.8, 0.6
+
+
+@dataclass(slots=True)
+class Ranked:
+    candidate: Candidate
+    score: float
+    breakdown: dict[str, float]
+
+    def to_dict(self) -> dict:
+        return {"score": round(self.score, 4), "score_breakdown": self.breakdown}
+
+
+class Ranker:
+    """Scores candidates for one discovery run (its genres and follower band)."""
+
+    def __init__(
+        self,
+        genres: Iterable[str],
+        min_followers: int = 0,
+        max_followers: int = 999_999_999,
+        weights: Optional[dict[str, float]] = None,
+        now: Optional[float] = None,
+    ) -> None:
+        self.genres = {g.lower().strip() for g in genres if g and g.strip()}
+        self.variants = {
+            v for g in self.genres for v in GENRE_VARIANTS.get(g, []) if v not in self.genres
+        }
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.now = now or time.time()
+        self._low = math.log1p(max(min_followers, 0))
+        self._span = math.log1p(max(max_followers, min_followers, 0)) - self._low
+
+    def score(self, c: Candidate) -> Ranked:
+        signals = {
+            "sources": 1 - 0.5 ** (c.hits - 1),
+            "distance": 0.5 ** (c.distance - 1) if c.distance else 0.0,
+            "recency": self._recency(c.modified_at),
+            "genre": self._genre(c.genre),
+            "band": self._band(c.followers_count),
+        }
+        total = sum(self.weights.get(k, 0) * v for k, v in signals.items())
+        return Ranked(c, total, {k: round(v, 3) for k, v in signals.items()})
+
+    def top(self, candidates: Iterable[Candidate], k: Optional[int] = None) -> list[Ranked]:
+        """Best k (all if None) by score, then followers, best first."""
+        scored = [self.score(c) for c in candidates]
+        return heapq.nlargest(
+            len(scored) if k is None else k, scored,
+            key=lambda r: (r.score, r.candidate.followers_count),
+        )
+
+    # ── Internals ─────────────────────────────────────────────────────
+
+    def _recency(self, modified_at: Optional[float]) -> float:
+        if modified_at is None:
+            return 0.0
+        age_days = max(self.now - modified_at, 0) / 86400
+        return 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+
+    def _genre(self, genre: str) -> float:
+        g = genre.lower().strip() if genre else ""
+        if not g or not self.genres:
+            return 0.0
+        if g in self.genres:
+            return EXACT
+        # "melodic techno" for techno, and the like
+        if any(target in g for target in self.genres):
+            return PARTIAL
+        if g in self.variants or any(v in g for v in self.variants):
+            return VARIANT
+        return 0.0
+
+    def _band(self, followers: int) -> float:
+        """Log-scaled position between min and max followers."""
+        if self._span <= 0:
+            return 1.0
+        pos = (math.log1p(max(followers, 0)) - self._low) / self._span
+        return min(max(pos, 0.0), 1.0)
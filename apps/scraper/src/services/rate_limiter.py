@@ -0,0 +1,223 @@
+"""
+Adaptive rate limiter for SoundCloud API calls.
+Token buckets per host and per endpoint class, AIMD rate adjustment
+driven by 429s and latency, Retry-After support and a global cool-down.
+"""
+import time
+import random
+import asyncio
+import logging
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+
+from .models import endpoint_class
+
+logger = logging.getLogger(__name__)
+
+
+# Starting rates (requests/sec) per endpoint class. AIMD moves them from here.
+DEFAULT_CLASS_RATES: dict[str, float] = {
+    "search": 1.5,
+    "users": 3.0,
+    "resolve": 2.0,
+    "stream": 2.0,
+    "playlists": 2.0,
+    "other": 2.0,
+}
+DEFAULT_HOST_RATE = 4.0
+MIN_RATE = 0.2
+MAX_RATE = 20.0
+
+
+class TokenBucket:
+    """Token bucket that hands out reservations, so waiters queue fairly."""
+
+    def __init__(self, rate: float, burst: float = 3.0) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, now: float) -> float:
+        """Take one token; return how long the caller must wait for it."""
+        self._refill(now)
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def scale(self, factor: float) -> None:
+        """Multiplicative decrease (factor < 1)."""
+        self._refill(time.monotonic())
+        self.rate = max(MIN_RATE, self.rate * factor)
+
+    def grow(self, step: float) -> None:
+        """Additive increase."""
+        self.rate = min(MAX_RATE, self.rate + step)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateLimiter:
+    """
+    Per-host + per-endpoint-class limiter that converges on the allowed rate.
+
+    Every request waits on both its host bucket and its class bucket, holds one
+    of the host's concurrency slots while in flight, and reports the outcome
+    via record(). A 429 halves the rates involved and puts every caller into
+    a shared cool-down; successes grow the rates back additively unless
+    latency shows the server is queueing.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 3,
+        host_rate: float = DEFAULT_HOST_RATE,
+        class_rates: Optional[dict[str, float]] = None,
+        increase_step: float = 0.05,
+        decrease_factor: float = 0.5,
+        base_cooldown: float = 2.0,
+        max_cooldown: float = 60.0,
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.host_rate = host_rate
+        self.class_rates = {**DEFAULT_CLASS_RATES, **(class_rates or {})}
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+
+        self._host_buckets: dict[str, TokenBucket] = {}
+        self._class_buckets: dict[tuple[str, str], TokenBucket] = {}
+        self._slots: dict[str, asyncio.Semaphore] = {}
+        self._latency: dict[str, float] = {}  # host -> EWMA latency
+        self._latency_floor: dict[str, float] = {}  # host -> best EWMA seen
+        self._cooldown_until = 0.0
+        self._consecutive_429 = 0
+        self._throttled = 0
+        self._requests = 0
+
+    # ── Acquire / record ──────────────────────────────────────────────
+
+    @asynccontextmanager
+    async def throttle(self, url: str):
+        """Wait for a token on the host and class buckets, then hold a slot."""
+        host, cls = _host_of(url), endpoint_class(url)
+        await self._wait_turn(host, cls)
+        async with self._slot(host):
+            await self._wait_cooldown()
+            self._requests += 1
+            yield
+
+    def record(self, url: str, status: int, latency: float, retry_after: Optional[str] = None) -> None:
+        """Feed a response back into the AIMD controller."""
+        host, cls = _host_of(url), endpoint_class(url)
+        host_bucket = self._host_bucket(host)
+        class_bucket = self._class_bucket(host, cls)
+
+        if status == 429:
+            self._throttled += 1
+            self._consecutive_429 += 1
+            host_bucket.scale(self.decrease_factor)
+            class_bucket.scale(self.decrease_factor)
+            delay = parse_retry_after(retry_after)
+            if delay is None:
+                delay = self.base_cooldown * (2 ** (self._consecutive_429 - 1))
+            delay = min(self.max_cooldown, delay) + random.uniform(0.1, 0.5)
+            self._cooldown_until = max(self._cooldown_until, time.monotonic() + delay)
+            logger.warning(
+                f"Rate limited on {host} [{cls}] — cooling down {delay:.1f}s, "
+                f"rate now {class_bucket.rate:.2f}/s"
+            )
+            return
+
+        self._consecutive_429 = 0
+        if status >= 500:
+            return
+        if self._latency_rising(host, latency):
+            # Server is queueing us — back off gently instead of growing
+            host_bucket.scale(0.9)
+            class_bucket.scale(0.9)
+            return
+        # Additive increase: roughly one step per second of traffic
+        host_bucket.grow(self.increase_step / max(host_bucket.rate, 1.0))
+        class_bucket.grow(self.increase_step / max(class_bucket.rate, 1.0))
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "requests": self._requests,
+            "throttled": self._throttled,
+            "cooldown_remaining": round(max(0.0, self._cooldown_until - now), 2),
+            "hosts": {h: round(b.rate, 3) for h, b in self._host_buckets.items()},
+            "classes": {f"{h}:{c}": round(b.rate, 3) for (h, c), b in self._class_buckets.items()},
+            "latency_ms": {h: round(v * 1000, 1) for h, v in self._latency.items()},
+        }
+
+    # ── Internals ─────────────────────────────────────────────────────
+
+    async def _wait_turn(self, host: str, cls: str) -> None:
+        now = time.monotonic()
+        wait = max(
+            self._host_bucket(host).reserve(now),
+            self._class_bucket(host, cls).reserve(now),
+        )
+        if wait > 0:
+            await asyncio.sleep(wait)
+        await self._wait_cooldown()
+
+    async def _wait_cooldown(self) -> None:
+        while True:
+            remaining = self._cooldown_until - time.monotonic()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(remaining)
+
+    def _slot(self, host: str) -> asyncio.Semaphore:
+        if host not in self._slots:
+            self._slots[host] = asyncio.Semaphore(self.max_concurrency)
+        return self._slots[host]
+
+    def _host_bucket(self, host: str) -> TokenBucket:
+        if host not in self._host_buckets:
+            self._host_buckets[host] = TokenBucket(self.host_rate, burst=self.max_concurrency)
+        return self._host_buckets[host]
+
+    def _class_bucket(self, host: str, cls: str) -> TokenBucket:
+        key = (host, cls)
+        if key not in self._class_buckets:
+            rate = self.class_rates.get(cls, self.class_rates["other"])
+            self._class_buckets[key] = TokenBucket(rate, burst=self.max_concurrency)
+        return self._class_buckets[key]
+
+    def _latency_rising(self, host: str, latency: float) -> bool:
+        """Track EWMA latency; True when it drifts well above the best seen."""
+        prev = self._latency.get(host)
+        ewma = latency if prev is None else 0.8 * prev + 0.2 * latency
+        self._latency[host] = ewma
+        floor = min(self._latency_floor.get(host, ewma), ewma)
+        self._latency_floor[host] = floor
+        return ewma > max(2.0 * floor, floor + 0.5)
+
+
+def _host_of(url: str) -> str:
+    return urlparse(url).netloc.lower()
@@ -0,0 +1,226 @@
+"""
+Response cache for SoundCloud API calls.
+Byte- and entry-bounded in-memory LRU with per-endpoint-class TTLs, plus an
+optional SQLite tier (SC_CACHE_PATH) that survives redeploys.
+"""
+import os
+import time
+import asyncio
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+from urllib.parse import urlparse, parse_qsl, urlencode
+
+import httpx
+
+from .models import endpoint_class, state_path
+
+logger = logging.getLogger(__name__)
+
+
+# Seconds each endpoint class stays fresh
+DEFAULT_TTLS: dict[str, float] = {
+    "resolve": 24 * 3600,
+    "users": 6 * 3600,
+    "playlists": 6 * 3600,
+    "search": 3600,
+    "stream": 1800,
+    "other": 3600,
+}
+
+CACHE_PATH = state_path("SC_CACHE_PATH")
+CACHE_SIZE = int(os.environ.get("SC_CACHE_SIZE", 5000))
+# Body bytes held in memory; a 200-track search page alone is ~640 KB
+CACHE_BYTES = int(os.environ.get("SC_CACHE_BYTES", 64 * 1024 * 1024))
+CACHE_DISK_BYTES = int(os.environ.get("SC_CACHE_DISK_BYTES", 512 * 1024 * 1024))
+# Disk writes between prunes
+PRUNE_EVERY = 200
+
+
+def cache_key(url: str, params: Optional[dict] = None) -> str:
+    """Normalized URL + sorted params, with client_id stripped."""
+    parsed = urlparse(url)
+    query = dict(parse_qsl(parsed.query))
+    query.update({k: str(v) for k, v in (params or {}).items() if v is not None})
+    query.pop("client_id", None)
+    path = parsed.path.rstrip("/") or "/"
+    base = f"{parsed.scheme.lower()}://{parsed.netloc.lower()}{path}"
+    return f"{base}?{urlencode(sorted(query.items()))}" if query else base
+
+
+class ResponseCache:
+    """
+    Two-tier TTL cache of successful GET responses. The memory tier is
+    bounded by entry count and body bytes; the disk tier is pruned to
+    disk_bytes and only touched from worker threads.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = CACHE_SIZE,
+        ttls: Optional[dict[str, float]] = None,
+        db_path: Optional[str] = CACHE_PATH,
+        max_bytes: int = CACHE_BYTES,
+        disk_bytes: int = CACHE_DISK_BYTES,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_bytes = disk_bytes
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        # key -> (expires_at, content_type, body)
+        self._lru: OrderedDict[str, tuple[float, str, bytes]] = OrderedDict()
+        self._bytes = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._writes_since_prune = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_pruned = 0
+        if db_path:
+            self._open_db(db_path)
+
+    async def get(self, url: str, params: Optional[dict] = None, count_miss: bool = True) -> Optional[httpx.Response]:
+        key = cache_key(url, params)
+        now = time.time()
+        entry = self._lru.get(key)
+        if entry and entry[0] > now:
+            self._lru.move_to_end(key)
+            self.hits += 1
+            return _to_response(url, entry)
+        if entry:
+            self._forget(key)
+
+        if self._db:
+            entry = await asyncio.to_thread(self._disk_get, key, now)
+            if entry:
+                self._remember(key, entry)
+                self.disk_hits += 1
+                return _to_response(url, entry)
+
+        if count_miss:
+            self.misses += 1
+        return None
+
+    async def put(self, url: str, params: Optional[dict], resp: httpx.Response) -> None:
+        """Store a response. Only 200s are cached."""
+        if resp.status_code != 200:
+            return
+        key = cache_key(url, params)
+        ttl = self.ttls.get(endpoint_class(url), self.ttls["other"])
+        entry = (time.time() + ttl, resp.headers.get("content-type", "application/json"), resp.content)
+        self._remember(key, entry)
+        if self._db:
+            await asyncio.to_thread(self._disk_put, key, entry)
+
+    def clear(self) -> None:
+        self._lru.clear()
+        self._bytes = 0
+        if self._db:
+            with self._db_lock:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._lru),
+            "max_entries": self.max_entries,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+            "disk_tier": self._db is not None,
+            "disk_pruned": self.disk_pruned,
+        }
+
+    # ── Internals ─────────────────────────────────────────────────────
+
+    def _remember(self, key: str, entry: tuple[float, str, bytes]) -> None:
+        self._forget(key)
+        if len(entry[2]) > self.max_bytes:
+            return  # would evict everything else; the disk tier still has it
+        self._lru[key] = entry
+        self._bytes += len(entry[2])
+        while len(self._lru) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, _, body) = self._lru.popitem(last=False)
+            self._bytes -= len(body)
+            self.evictions += 1
+
+    def _forget(self, key: str) -> None:
+        old = self._lru.pop(key, None)
+        if old:
+            self._bytes -= len(old[2])
+
+    def _open_db(self, path: str) -> None:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, expires_at REAL, content_type TEXT, body BLOB)"
+            )
+            self._prune()
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache disk tier disabled ({path}): {e}")
+            self._db = None
+
+    def _disk_get(self, key: str, now: float) -> Optional[tuple[float, str, bytes]]:
+        try:
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT expires_at, content_type, body FROM responses WHERE key = ? AND expires_at > ?",
+                    (key, now),
+                ).fetchone()
+            return (row[0], row[1], row[2]) if row else None
+        except sqlite3.Error:
+            return None
+
+    def _disk_put(self, key: str, entry: tuple[float, str, bytes]) -> None:
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, expires_at, content_type, body) VALUES (?, ?, ?, ?)",
+                    (key, *entry),
+                )
+                self._db.commit()
+                self._writes_since_prune += 1
+                if self._writes_since_prune >= PRUNE_EVERY:
+                    self._prune()
+        except sqlite3.Error as e:
+            logger.debug(f"Response cache write failed: {e}")
+
+    def _prune(self) -> None:
+        """Drop expired rows, then the soonest-expiring until under disk_bytes. Caller holds the lock (or is __init__)."""
+        self._writes_since_prune = 0
+        removed = self._db.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),)).rowcount
+        total = self._db.execute("SELECT COALESCE(SUM(LENGTH(body)), 0) FROM responses").fetchone()[0]
+        if total > self.disk_bytes:
+            excess = total - self.disk_bytes
+            freed = 0
+            victims = []
+            for key, size in self._db.execute("SELECT key, LENGTH(body) FROM responses ORDER BY expires_at"):
+                victims.append((key,))
+                freed += size
+                if freed >= excess:
+                    break
+            self._db.executemany("DELETE FROM responses WHERE key = ?", victims)
+            removed += len(victims)
+        self._db.commit()
+        self.disk_pruned += max(removed, 0)
+
+
+def _to_response(url: str, entry: tuple[float, str, bytes]) -> httpx.Response:
+    return httpx.Response(
+        200,
+        headers={"content-type": entry[1], "x-bifrost-cache": "hit"},
+        content=entry[2],
+        request=httpx.Request("GET", url),
+    )
@@ -2,69 +2,135 @@
 SoundCloud scraper — core API client and discovery.
 Hits SoundCloud's public API directly. No browser, no Playwright.
 """
-import re
+import time
 import asyncio
-import datetime
-import random
 import logging
-from typing import Optional
-from urllib.parse import urlparse, parse_qs
+from contextlib import aclosing
+from typing import AsyncIterator, Optional
 
 import httpx
 
+from . import codec
 from .models import (
     SC_API, DEFAULT_CLIENT_ID, GENRE_VARIANTS,
-    ScrapedArtist, normalize_url, name_from_url, build_artist, user_summary,
+    ScrapedArtist, Candidate, normalize_url, name_from_url, build_artist, user_summary,
 )
 from .email_utils import extract_email, validate_email, is_junk_email
 from .email_scraper import find_email_from_links
+from .rate_limiter import AdaptiveRateLimiter
+from .response_cache import ResponseCache, cache_key
+from .single_flight import SingleFlight
+from .client_id import ClientIdManager
+from .http_pools import ApiPool, ExternalPool
+from .pagination import collect_pages
+from .pipeline import iter_completed, merge
+from .columnar import admit_candidates, recency_cutoff
+from .ranking import Ranker
+from .graph_crawler import DISCOVER_CRAWL, CrawlConfig, GraphCrawler
+from .tap_scheduler import BudgetExhausted, charge_request, current_tap
+from .hydration import UserHydrator
+from .fetch_cache import FetchCache
+from .contact_planner import ContactPlanner
+from .enrichment_store import EnrichmentStore
 
 logger = logging.getLogger(__name__)
 
 
 class SoundCloudScraper:
     def __init__(self) -> None:
-        self.client_id = DEFAULT_CLIENT_ID
-        self._client: Optional[httpx.AsyncClient] = None
-        self._semaphore = asyncio.Semaphore(3)
-        self._last_request = 0.0
+        self._ids = ClientIdManager(DEFAULT_CLIENT_ID)
+        self._api: Optional[ApiPool] = None
+        self._external: Optional[ExternalPool] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._limiter = AdaptiveRateLimiter(max_concurrency=3)
+        self._cache = ResponseCache()
+        self._flight = SingleFlight()
+        self._hydrator = UserHydrator(self)
+        self._fetch_cache = FetchCache()
+        self._contacts = ContactPlanner()
+        self._enrichment = EnrichmentStore()
 
     async def __aenter__(self) -> "SoundCloudScraper":
-        self._client = httpx.AsyncClient(
-            timeout=httpx.Timeout(30.0, connect=10.0),
-            follow_redirects=True,
-            headers={
-                "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
-                "Accept": "application/json",
-                "Origin": "https://soundcloud.com",
-                "Referer": "https://soundcloud.com/",
-            },
-        )
-        # Auto-refresh client_id on startup — hardcoded default goes stale
-        await self._refresh_id()
+        # Separate pools: SC API calls never queue behind slow artist websites
+        self._api = ApiPool()
+        self._external = ExternalPool()
+        # Start from the last good client_id; refresh in the background so
+        # startup never waits on soundcloud.com
+        self._ids.load()
+        await asyncio.to_thread(self._contacts.load)
+        self._refresh_task = asyncio.create_task(self._refresh_id())
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
-        if self._client:
-            await self._client.aclose()
+        if self._refresh_task and not self._refresh_task.done():
+            self._refresh_task.cancel()
+        if self._api:
+            await self._api.aclose()
+        if self._external:
+            await self._external.aclose()
+        await self._contacts.aclose()
+
+    @property
+    def client_id(self) -> str:
+        return self._ids.client_id
 
     async def _get(self, url: str, params: dict = None) -> httpx.Response:
-        """Throttled request with 429 retry and exponential backoff."""
-        async with self._semaphore:
-            now = asyncio.get_event_loop().time()
-            wait = 0.5 - (now - self._last_request)
-            if wait > 0:
-                await asyncio.sleep(wait + random.uniform(0.1, 0.3))
-
-            for attempt in range(4):
-                self._last_request = asyncio.get_event_loop().time()
-                resp = await self._client.get(url, params=params)
-                if resp.status_code != 429:
-                    return resp
-                backoff = (2 ** attempt) + random.uniform(0.5, 1.5)
-                logger.warning(f"Rate limited, waiting {backoff:.1f}s")
-                await asyncio.sleep(backoff)
-            return resp
+        """Cached, rate-limited request. 429s feed the adaptive limiter, which cools everyone down."""
+        params = dict(params or {})
+        while True:
+            cached = await self._cache.get(url, params)
+            if cached is not None:
+                return cached
+            # Identical concurrent requests share one network call
+            try:
+                return await self._flight.do(cache_key(url, params), lambda: self._fetch(url, params))
+            except BudgetExhausted as e:
+                # The leader's tap ran dry, not necessarily ours (a caller
+                # outside any tap has no budget at all) — go again, leading
+                # this time unless another caller got there first
+                if e.args[0] == current_tap():
+                    raise
+
+    async def _fetch(self, url: str, params: dict) -> httpx.Response:
+        # Multi-tap runs bill each network request to the calling tap
+        charge_request()
+        refreshed = False
+        for _ in range(4):
+            generation = self._ids.generation
+            async with self._limiter.throttle(url):
+                start = time.monotonic()
+                resp = await self._api.get(url, params=params)
+                self._limiter.record(
+                    url, resp.status_code, time.monotonic() - start,
+                    resp.headers.get("retry-after"),
+                )
+            if resp.status_code == 401 and "client_id" in params and not refreshed:
+                # Key rotated — first caller refreshes, the rest wait and retry
+                refreshed = True
+                if await self._ids.refresh(self._api.client, generation):
+                    params["client_id"] = self.client_id
+                    continue
+            if resp.status_code != 429:
+                await self._cache.put(url, params, resp)
+                return resp
+        return resp
+
+    def stats(self) -> dict:
+        """Runtime counters for the /stats endpoint."""
+        return {
+            "rate_limiter": self._limiter.stats(),
+            "cache": self._cache.stats(),
+            "single_flight": self._flight.stats(),
+            "client_id": self._ids.stats(),
+            "hydration": self._hydrator.stats(),
+            "fetch_cache": self._fetch_cache.stats(),
+            "contact_planner": self._contacts.stats(),
+            "enrichment": self._enrichment.stats(),
+            "pools": {
+                "api": self._api.stats() if self._api else None,
+                "external": self._external.stats() if self._external else None,
+            },
+        }
 
     # ── Single artist scrape ──────────────────────────────────────────
 
@@ -81,7 +147,10 @@ class SoundCloudScraper:
 
             # Try email from linked sites if bio didn't have one
             if not result.email:
-                email, source = await find_email_from_links(self._client, user, web_profiles)
+                email, source = await find_email_from_links(
+                    self._external, user, web_profiles,
+                    cache=self._fetch_cache, planner=self._contacts,
+                )
                 if email:
                     result.email = email
                     result.email_source = source
@@ -110,12 +179,51 @@ class SoundCloudScraper:
         genres: Optional[list[str]] = None,
         max_results: int = 50,
         uploaded_within_days: Optional[int] = None,
+        crawl: Optional[CrawlConfig] = None,
     ) -> dict:
-        """Find artists similar to a seed profile."""
+        """Find artists similar to a seed profile, best-ranked first."""
+        summary: dict = {}
+        async for kind, data in self.iter_discover(
+            seed_url, min_followers, max_followers, genres, uploaded_within_days, max_results, crawl,
+        ):
+            if kind == "summary":
+                summary = data
+        if summary.get("error"):
+            return {"results": [], "error": summary["error"]}
+
+        filtered = summary["ranked"]
+        return {
+            "results": [{**user_summary(r.candidate), **r.to_dict()} for r in filtered],
+            "total_found": summary["total_found"],
+            "filtered_count": len(filtered),
+            "seed_artist": summary["seed_artist"],
+            "filter_stats": summary["filter_stats"],
+            "graph_crawl": summary["graph_crawl"],
+        }
+
+    async def iter_discover(
+        self,
+        seed_url: str,
+        min_followers: int = 0,
+        max_followers: int = 999_999_999,
+        genres: Optional[list[str]] = None,
+        uploaded_within_days: Optional[int] = None,
+        max_results: Optional[int] = None,
+        crawl: Optional[CrawlConfig] = None,
+    ) -> AsyncIterator[tuple[str, dict]]:
+        """
+        Streaming discovery. Yields ("result", Candidate) for every user that
+        passes the filters (not capped at max_results) as soon as its source
+        returns, then one ("summary", {...}) with totals, filter stats and
+        `ranked` — the top max_results (all if None) as ranking.Ranked, best
+        first; `filtered_count` is its length. The seed's
+        graph is walked by a GraphCrawler alongside the searches.
+        """
         clean = normalize_url(seed_url)
         seed = await self._resolve(clean)
         if not seed:
-            return {"results": [], "error": "Could not resolve seed"}
+            yield "summary", {"error": "Could not resolve seed"}
+            return
 
         seed_id = seed["id"]
         seed_name = seed.get("username", "Unknown")
@@ -124,91 +232,105 @@ class SoundCloudScraper:
         queries = _build_search_queries(seed_name, genres, seed_genre)
         genre_tags = _build_genre_tags(genres or ([seed_genre] if seed_genre else []))
 
-        # Fan out: related + paginated followings/followers + search + tag searches
-        tasks = [
-            self._related(seed_id),
-            self._followings_paginated(seed_id),
-            self._followers_paginated(seed_id),
-        ]
+        # Fan out: seed graph crawl + search + tag searches
+        crawler = self.graph_crawler(min_followers, max_followers, crawl or DISCOVER_CRAWL)
+        tasks = []
         for q in queries:
-            tasks.append(self._search_paginated(q))
+            tasks.append(_at_distance(None, self._search_paginated(q)))
         for tag in genre_tags:
-            tasks.append(self._search_tracks_by_tag(tag))
-
-        raw = await asyncio.gather(*tasks, return_exceptions=True)
+            tasks.append(_at_distance(None, self._search_tracks_by_tag(tag)))
 
         seen = {seed_id}
-        candidates = []
-        for r in raw:
-            if isinstance(r, Exception):
-                continue
-            for u in (r or []):
-                uid = u.get("id")
-                if uid and uid not in seen:
-                    seen.add(uid)
-                    candidates.append(u)
-
-        # 2nd-degree connections from top 3
-        if candidates:
-            top3 = sorted(candidates, key=lambda u: u.get("followers_count", 0) or 0, reverse=True)[:3]
-            tasks2 = []
-            for u in top3:
-                uid = u.get("id")
-                if uid:
-                    tasks2.append(self._related(uid))
-                    tasks2.append(self._followings(uid))
-            if tasks2:
-                raw2 = await asyncio.gather(*tasks2, return_exceptions=True)
-                for r in raw2:
-                    if isinstance(r, Exception):
-                        continue
-                    for u in (r or []):
+        found: dict[int, Candidate] = {}
+        total_found = 0
+        stats: dict[str, int] = {}
+        cutoff = recency_cutoff(uploaded_within_days)
+
+        async def _graph() -> AsyncIterator[list[tuple[int, dict]]]:
+            async with aclosing(crawler.crawl(seed)) as batches:
+                async for distance, users in batches:
+                    yield [(distance, u) for u in users]
+
+        async def _drain() -> AsyncIterator[Candidate]:
+            nonlocal total_found
+            async with aclosing(merge(iter_completed(tasks), _graph())) as batches:
+                async for batch in batches:
+                    fresh = []
+                    distance = batch[0][0] if batch else None  # one source per batch
+                    for _, u in batch:
                         uid = u.get("id")
                         if uid and uid not in seen:
                             seen.add(uid)
-                            candidates.append(u)
-
-        filtered, stats = _filter_candidates(candidates, min_followers, max_followers, uploaded_within_days)
-        filtered.sort(key=lambda u: u.get("followers_count", 0) or 0, reverse=True)
-        filtered = filtered[:max_results]
-
-        return {
-            "results": [user_summary(u) for u in filtered],
-            "total_found": len(candidates),
-            "filtered_count": len(filtered),
+                            fresh.append(u)
+                        elif uid in found:
+                            found[uid].seen_again(distance)
+                    total_found += len(fresh)
+                    passed, batch_stats = admit_candidates(
+                        fresh, min_followers, max_followers, cutoff, distance=distance,
+                    )
+                    for key, value in batch_stats.items():
+                        stats[key] = stats.get(key, 0) + value
+                    for candidate in passed:
+                        found[candidate.id] = candidate
+                        yield candidate
+
+        async with aclosing(_drain()) as users:
+            async for u in users:
+                yield "result", u
+
+        ranker = Ranker(genres or ([seed_genre] if seed_genre else []), min_followers, max_followers)
+        ranked = ranker.top(found.values(), max_results)
+        yield "summary", {
+            "total_found": total_found,
+            # As in discover()'s response: the ranked slice, not every pass
+            # (filter_stats["passed"] has that)
+            "filtered_count": len(ranked),
             "seed_artist": seed_name,
             "filter_stats": stats,
+            "ranked": ranked,
+            "graph_crawl": crawler.stats(),
         }
 
+    def graph_crawler(
+        self, min_followers: int = 0, max_followers: int = 999_999_999, config: Optional[CrawlConfig] = None,
+    ) -> GraphCrawler:
+        """A crawler over this scraper's followings / followers / related calls."""
+        config = config or CrawlConfig()
+        return GraphCrawler(
+            self, min_followers, max_followers,
+            depth=config.depth, branching=config.branching, request_budget=config.request_budget,
+            seed_followers_pages=config.seed_followers_pages,
+        )
+
     # ── SC API wrappers ───────────────────────────────────────────────
 
     async def _resolve(self, sc_url: str) -> Optional[dict]:
         params = {"url": sc_url, "client_id": self.client_id}
         resp = await self._get(f"{SC_API}/resolve", params)
-        if resp.status_code == 401:
-            if await self._refresh_id():
-                params["client_id"] = self.client_id
-                resp = await self._get(f"{SC_API}/resolve", params)
         if resp.status_code == 404:
             raise ValueError(f"Not found: {sc_url}")
         resp.raise_for_status()
-        data = resp.json()
+        data = codec.loads(resp.content)
         if data.get("kind") == "user":
             return data
         if data.get("user"):
             return data["user"]
         raise ValueError(f"Resolved to '{data.get('kind')}', not a user")
 
+    async def _get_user(self, user_id: int) -> Optional[dict]:
+        """Full user object by id — micro-batched through the multi-id endpoint."""
+        return await self._hydrator.get_user(user_id)
+
+    async def _fetch_user(self, user_id: int) -> tuple[Optional[dict], Optional[int]]:
+        """Like _get_user, plus the HTTP status when the fetch failed."""
+        return await self._hydrator.fetch(user_id)
+
     async def _search(self, query: str, limit: int = 200) -> list[dict]:
         params = {"q": query, "client_id": self.client_id, "limit": limit}
         try:
             resp = await self._get(f"{SC_API}/search/users", params)
-            if resp.status_code == 401:
-                await self._refresh_id()
-                params["client_id"] = self.client_id
-                resp = await self._get(f"{SC_API}/search/users", params)
             resp.raise_for_status()
-            return resp.json().get("collection", [])
+            return codec.loads(resp.content).get("collection", [])
         except Exception:
             return []
 
@@ -216,7 +338,7 @@ class SoundCloudScraper:
         try:
             resp = await self._get(f"{SC_API}/users/{uid}/relatedartists", {"client_id": self.client_id, "limit": 50})
             resp.raise_for_status()
-            return resp.json().get("collection", [])
+            return codec.loads(resp.content).get("collection", [])
         except Exception:
             return []
 
@@ -224,7 +346,7 @@ class SoundCloudScraper:
         try:
             resp = await self._get(f"{SC_API}/users/{uid}/followings", {"client_id": self.client_id, "limit": 200})
             resp.raise_for_status()
-            return resp.json().get("collection", [])
+            return codec.loads(resp.content).get("collection", [])
         except Exception:
             return []
 
@@ -232,40 +354,15 @@ class SoundCloudScraper:
         try:
             resp = await self._get(f"{SC_API}/users/{uid}/followers", {"client_id": self.client_id, "limit": 200})
             resp.raise_for_status()
-            return resp.json().get("collection", [])
+            return codec.loads(resp.content).get("collection", [])
         except Exception:
             return []
 
     # ── Paginated helpers ──────────────────────────────────────────
 
     async def _paginated_fetch(self, url: str, params: dict, max_pages: int = 3, limit: int = 200) -> list[dict]:
-        """Follow SC's next_href cursor pagination."""
-        all_items: list[dict] = []
-        params = {**params, "client_id": self.client_id, "limit": limit}
-        for _ in range(max_pages):
-            try:
-                resp = await self._get(url, params)
-                if resp.status_code == 401:
-                    await self._refresh_id()
-                    params["client_id"] = self.client_id
-                    resp = await self._get(url, params)
-                if resp.status_code != 200:
-                    break
-                data = resp.json()
-                collection = data.get("collection", [])
-                all_items.extend(collection)
-                if not collection:
-                    break
-                next_href = data.get("next_href")
-                if not next_href:
-                    break
-                url = next_href.split("?")[0]
-                parsed = urlparse(next_href)
-                params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
-                params["client_id"] = self.client_id
-            except Exception:
-                break
-        return all_items
+        """Fetch up to max_pages — offset endpoints prefetch in parallel, cursors walk next_href."""
+        return await collect_pages(self, url, params, max_pages=max_pages, limit=limit)
 
     async def _followings_paginated(self, uid: int, max_pages: int = 3) -> list[dict]:
         try:
@@ -290,22 +387,15 @@ class SoundCloudScraper:
         try:
             params = {"q": tag, "client_id": self.client_id, "limit": limit}
             resp = await self._get(f"{SC_API}/search/tracks", params)
-            if resp.status_code == 401:
-                await self._refresh_id()
-                params["client_id"] = self.client_id
-                resp = await self._get(f"{SC_API}/search/tracks", params)
             if resp.status_code != 200:
                 return []
-            tracks = resp.json().get("collection", [])
             seen_ids: set[int] = set()
             users: list[dict] = []
-            for track in tracks:
-                user = track.get("user")
-                if user:
-                    uid = user.get("id")
-                    if uid and uid not in seen_ids:
-                        seen_ids.add(uid)
-                        users.append(user)
+            for user in codec.extract_users(resp.content)[0]:
+                uid = user.get("id")
+                if uid and uid not in seen_ids:
+                    seen_ids.add(uid)
+                    users.append(user)
             return users
         except Exception:
             return []
@@ -317,7 +407,7 @@ class SoundCloudScraper:
                 {"client_id": self.client_id},
             )
             if resp.status_code == 200:
-                return resp.json()
+                return codec.loads(resp.content)
             return []
         except Exception:
             return []
@@ -333,7 +423,7 @@ class SoundCloudScraper:
                 {"client_id": self.client_id, "limit": 10},
             )
             if resp.status_code == 200:
-                for item in resp.json().get("collection", []):
+                for item in codec.loads(resp.content).get("collection", []):
                     if item.get("type") == "track" and item.get("track"):
                         return item["track"]
         except Exception:
@@ -345,7 +435,7 @@ class SoundCloudScraper:
                 {"client_id": self.client_id, "limit": 5},
             )
             if resp.status_code == 200:
-                tracks = resp.json().get("collection", [])
+                tracks = codec.loads(resp.content).get("collection", [])
                 if tracks:
                     tracks.sort(key=lambda t: t.get("created_at", ""), reverse=True)
                     return tracks[0]
@@ -354,27 +444,18 @@ class SoundCloudScraper:
         return None
 
     async def _refresh_id(self) -> bool:
-        """Scrape a fresh client_id from SoundCloud's JS bundles."""
-        try:
-            html = await self._client.get("https://soundcloud.com/", headers={"Accept": "text/html"})
-            if html.status_code != 200:
-                return False
-            for script_url in re.findall(r'src="(https://a-v2\.sndcdn\.com/assets/[^"]+\.js)"', html.text)[-3:]:
-                js = await self._client.get(script_url)
-                if js.status_code == 200:
-                    m = re.search(r'client_id:"([a-zA-Z0-9]+)"', js.text)
-                    if m:
-                        self.client_id = m.group(1)
-                        logger.info(f"Refreshed client_id: {self.client_id[:8]}...")
-                        return True
-            return False
-        except Exception:
-            return False
+        """Force a coordinated client_id refresh."""
+        return await self._ids.refresh(self._api.client)
 
 
 # ── Pure helpers ─────────────────────────────────────────────────────
 
 
+async def _at_distance(distance: Optional[int], coro) -> list[tuple[Optional[int], dict]]:
+    """Pair a source's users with their hop count from the seed (None = not via its graph)."""
+    return [(distance, u) for u in await coro]
+
+
 def _build_search_queries(seed_name: str, genres: Optional[list[str]], seed_genre: str) -> list[str]:
     """Build expanded search queries from seed name + genres + variants."""
     queries = [seed_name]
@@ -401,44 +482,3 @@ def _build_genre_tags(genres: list[str]) -> list[str]:
                 tags.append(variant.lower())
     return tags[:4]
 
-
-def _filter_candidates(
-    candidates: list[dict],
-    min_followers: int,
-    max_followers: int,
-    uploaded_within_days: Optional[int],
-) -> tuple[list[dict], dict]:
-    """Filter candidates by followers, tracks, recency. Returns (filtered, stats)."""
-    cutoff = None
-    if uploaded_within_days:
-        cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=uploaded_within_days)
-
-    stats = {"total_raw": len(candidates), "below_min": 0, "above_max": 0, "no_tracks": 0, "too_old": 0, "passed": 0}
-    filtered = []
-
-    for u in candidates:
-        fc = u.get("followers_count", 0) or 0
-        tc = u.get("track_count", 0) or 0
-        if fc < min_followers:
-            stats["below_min"] += 1
-            continue
-        if fc > max_followers:
-            stats["above_max"] += 1
-            continue
-        if tc < 1:
-            stats["no_tracks"] += 1
-            continue
-        if cutoff:
-            last_mod = u.get("last_modified")
-            if last_mod:
-                try:
-                    mod_dt = datetime.datetime.fromisoformat(last_mod.replace("Z", "+00:00"))
-                    if mod_dt < cutoff:
-                        stats["too_old"] += 1
-                        continue
-                except (ValueError, TypeError):
-                    pass
-        stats["passed"] += 1
-        filtered.append(u)
-
-    return filtered, stats
@@ -0,0 +1,130 @@
+"""
+Deadline- and budget-aware scheduling for multi-tap discovery.
+
+Each tap runs with a ticket bound to a context variable. SoundCloudScraper
+charges the ticket before every network request (cache hits and coalesced
+calls are free). Every tap is guaranteed an exploration floor; past that,
+the shared budget is split by observed yield — new in-range candidates per
+request — so productive taps keep going while dry ones are starved.
+"""
+import time
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BudgetExhausted(Exception):
+    """Raised when a tap may not issue another SoundCloud request."""
+
+
+_current_tap: ContextVar[Optional[tuple["TapScheduler", str]]] = ContextVar("current_tap", default=None)
+
+
+def current_tap() -> Optional[str]:
+    """Tap bound to this context, if any."""
+    bound = _current_tap.get()
+    return bound[1] if bound else None
+
+
+def charge_request() -> None:
+    """Charge one request to the tap running in this context, if any."""
+    bound = _current_tap.get()
+    if bound:
+        scheduler, tap = bound
+        scheduler.charge(tap)
+
+
+class TapScheduler:
+    def __init__(
+        self,
+        taps: list[str],
+        request_budget: Optional[int] = None,
+        deadline: Optional[float] = None,
+        explore_share: float = 0.3,
+    ) -> None:
+        self.request_budget = request_budget
+        self.deadline = deadline
+        self._deadline_at = time.monotonic() + deadline if deadline else None
+        self._floor = int(request_budget * explore_share / len(taps)) if request_budget and taps else 0
+        self.spent: dict[str, int] = {t: 0 for t in taps}
+        self.found: dict[str, int] = {t: 0 for t in taps}
+        self.denied: dict[str, int] = {t: 0 for t in taps}
+        self._active: set[str] = set(taps)
+
+    @contextmanager
+    def bind(self, tap: str):
+        """Attribute every request made in this context to `tap`."""
+        token = _current_tap.set((self, tap))
+        try:
+            yield
+        finally:
+            _current_tap.reset(token)
+            self._active.discard(tap)
+
+    def charge(self, tap: str) -> None:
+        if self.expired() or not self._may_spend(tap):
+            self.denied[tap] = self.denied.get(tap, 0) + 1
+            raise BudgetExhausted(tap)
+        self.spent[tap] = self.spent.get(tap, 0) + 1
+
+    def credit(self, tap: str, new_candidates: int) -> None:
+        """Record candidates a tap added to the pool."""
+        self.found[tap] = self.found.get(tap, 0) + new_candidates
+
+    def time_left(self) -> Optional[float]:
+        if self._deadline_at is None:
+            return None
+        return max(0.0, self._deadline_at - time.monotonic())
+
+    def expired(self) -> bool:
+        left = self.time_left()
+        return left is not None and left <= 0
+
+    @property
+    def truncated(self) -> bool:
+        """True if any tap was refused a request (budget or deadline)."""
+        return any(self.denied.values())
+
+    def stats(self) -> dict:
+        return {
+            "request_budget": self.request_budget,
+            "requests_used": sum(self.spent.values()),
+            "deadline": self.deadline,
+            "taps": {
+                t: {
+                    "requests": self.spent[t],
+                    "candidates": self.found[t],
+                    "yield": round(self._yield(t), 2),
+                    "denied": self.denied[t],
+                }
+                for t in self.spent
+            },
+        }
+
+    # ── Internals ─────────────────────────────────────────────────────
+
+    def _yield(self, tap: str) -> float:
+        # Laplace-smoothed so untested taps aren't scored zero
+        return (self.found.get(tap, 0) + 1) / (self.spent.get(tap, 0) + 1)
+
+    def _may_spend(self, tap: str) -> bool:
+        if self.request_budget is None:
+            return True
+        if sum(self.spent.values()) >= self.request_budget:
+            return False
+        spent = self.spent.get(tap, 0)
+        if spent < self._floor:
+            return True
+        # Past the floor, taps compete for the shared budget by yield.
+        # Only still-running taps count, so finished taps' share flows back.
+        active = self._active | {tap}
+        weights = {t: self._yield(t) for t in active}
+        reserved = sum(max(0, self._floor - self.spent.get(t, 0)) for t in self._active)
+        shared_left = self.request_budget - sum(self.spent.values()) - reserved
+        if shared_left <= 0:
+            return False
+        share = shared_left * weights[tap] / sum(weights.values())
+        return share >= 1 or weights[tap] >= max(weights.values())
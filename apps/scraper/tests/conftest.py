@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The service imports as `services.*` from src/ (see run.py)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+from services import codec
+
+
+def _page(tracks: list[dict], next_href=None) -> bytes:
+    return json.dumps({"collection": tracks, "next_href": next_href, "query_urn": "x"}).encode()
+
+
+def _track(tid: int, uid: int, **extra) -> dict:
+    return {"id": tid, "kind": "track", **extra, "user": {"id": uid, "kind": "user", "username": f"u{uid}"}}
+
+
+TRICKY = _page(
+    [
+        _track(1, 10, description='Bookings, "user": {"id": 666} — and {"user":{"id":667}}'),
+        _track(2, 11, title='{"user": {"kind": "user", "id": 668}}', tag_list='"user" : {'),
+        _track(3, 10, caption=None),
+    ],
+    next_href="https://api-v2.soundcloud.com/search/tracks?offset=3",
+)
+
+EXTRACTORS = [codec.extract_users, codec._scan_users]
+
+
+@pytest.mark.parametrize("extract", EXTRACTORS)
+def test_string_embedded_user_keys_are_ignored(extract):
+    users, next_href = extract(TRICKY)
+    assert [u["id"] for u in users] == [10, 11, 10]
+    assert next_href == "https://api-v2.soundcloud.com/search/tracks?offset=3"
+
+
+@pytest.mark.parametrize("extract", EXTRACTORS)
+def test_last_page_and_str_input(extract):
+    users, next_href = extract(_page([_track(1, 5)]).decode())
+    assert [u["id"] for u in users] == [5] and next_href is None
+
+
+@pytest.mark.parametrize("extract", EXTRACTORS)
+def test_non_collection_payloads(extract):
+    assert extract(b'{"collection": []}') == ([], None)
+    with pytest.raises(ValueError):
+        extract(b"[1, 2]")
+    with pytest.raises(ValueError):
+        extract(b'{"collection": [')
+
+
+def test_dumps_round_trips_non_str_keys_and_big_ints():
+    assert json.loads(codec.dumps({1: "a"})) == {"1": "a"}
+    assert json.loads(codec.dumps({"n": 2**70})) == {"n": 2**70}
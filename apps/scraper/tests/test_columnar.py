@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+from services import columnar, models
+from services.columnar import CandidateBatch, admit_candidates, filter_candidates
+from services.models import Candidate, user_summary
+
+
+def _users(n: int, seed: int = 3) -> list[dict]:
+    rng = random.Random(seed)
+    users = []
+    for i in range(n):
+        user = {"id": i + 1, "username": f"u{i}", "followers_count": rng.choice([None, 0, 50, 999, 5000, 20_000])}
+        if rng.random() < 0.8:
+            user["track_count"] = rng.choice([0, 1, 12])
+        user["last_modified"] = rng.choice([None, "2020-01-01T00:00:00Z", "2026-09-01T00:00:00Z", "not a date"])
+        users.append(user)
+    return users
+
+
+def _per_item(items, *args, **kwargs):
+    # Force the dict-at-a-time path regardless of size
+    old, columnar.COLUMNAR_MIN = columnar.COLUMNAR_MIN, 10**9
+    try:
+        return filter_candidates(items, *args, **kwargs)
+    finally:
+        columnar.COLUMNAR_MIN = old
+
+
+@pytest.mark.parametrize("missing_ok", [False, True])
+@pytest.mark.parametrize("cutoff", [None, 1_700_000_000.0])
+def test_batch_matches_per_item_path(missing_ok, cutoff):
+    users = _users(500)
+    batch = CandidateBatch(users).filter(100, 10_000, cutoff, missing_ok)
+    assert batch == _per_item(users, 100, 10_000, cutoff, missing_tracks_ok=missing_ok)
+    assert sum(v for k, v in batch[1].items() if k not in ("total_raw", "passed")) + batch[1]["passed"] == 500
+
+
+def test_candidates_and_result_rows_filter_like_users():
+    users = _users(200, seed=9)
+    candidates = [Candidate.from_user(u) for u in users]
+    passed_users, stats = filter_candidates(users, 100, 10_000, 1_700_000_000.0, missing_tracks_ok=True)
+    passed_candidates, candidate_stats = filter_candidates(candidates, 100, 10_000, 1_700_000_000.0, missing_tracks_ok=True)
+    assert [c.id for c in passed_candidates] == [u["id"] for u in passed_users]
+    assert candidate_stats == stats
+
+    rows = [{"followers": u["followers_count"], "track_count": u.get("track_count")} for u in users]
+    passed_rows, _ = CandidateBatch(rows, followers_key="followers").filter(100, 10_000, missing_tracks_ok=True)
+    assert len(passed_rows) == len(filter_candidates(users, 100, 10_000, missing_tracks_ok=True)[0])
+
+
+def _count_parses(monkeypatch) -> list:
+    calls = []
+    real = models.parse_epoch
+
+    def counting(value):
+        calls.append(value)
+        return real(value)
+    monkeypatch.setattr(models, "parse_epoch", counting)
+    monkeypatch.setattr(columnar, "parse_epoch", counting)
+    return calls
+
+
+@pytest.mark.parametrize("n", [20, 500])
+@pytest.mark.parametrize("cutoff", [None, 1_700_000_000.0])
+def test_admit_parses_each_survivor_once(monkeypatch, n, cutoff):
+    users = _users(n, seed=5)
+    expected, expected_stats = filter_candidates(users, 100, 10_000, cutoff, missing_tracks_ok=True)
+    projected = [Candidate.from_user(u, "trending", 2) for u in expected]
+    calls = _count_parses(monkeypatch)
+    admitted, stats = admit_candidates(users, 100, 10_000, cutoff, True, source_tap="trending", distance=2)
+    assert stats == expected_stats
+    assert admitted == projected
+    # Only rows that reach the date test are parsed, and survivors never again
+    assert len(calls) == (len(expected) + expected_stats["too_old"] if cutoff else len(expected))
+
+
+def test_rows_carrying_modified_at_are_not_parsed(monkeypatch):
+    users = _users(200, seed=11)
+    rows = [user_summary(u) for u in users]
+    expected = filter_candidates(users, 100, 10_000, 1_700_000_000.0, missing_tracks_ok=False)[0]
+    calls = _count_parses(monkeypatch)
+    passed, stats = CandidateBatch(rows, followers_key="followers").filter(
+        100, 10_000, 1_700_000_000.0, missing_tracks_ok=False,
+    )
+    assert calls == []
+    assert stats["too_old"] > 0
+    assert [r["sc_user_id"] for r in passed] == [u["id"] for u in expected]
@@ -0,0 +1,90 @@
+import json
+import asyncio
+
+from services.contact_planner import ContactPlanner, contact_links, sitemap_links
+
+HOME = """
+<a href="/shop">Merch</a>
+<a href="contact">Get in touch</a>
+<a href="https://www.artist.com/booking/">Bookings</a>
+<a href="/press-kit.pdf">Press</a>
+<a href="mailto:me@artist.com">Email</a>
+<a href="https://elsewhere.com/contact">Contact</a>
+<a href="/about">About <b>me</b></a>
+"""
+
+
+def test_contact_links_are_same_site_and_ranked():
+    assert contact_links("https://artist.com", HOME) == [
+        "https://artist.com/contact",
+        "https://www.artist.com/booking",
+        "https://artist.com/about",
+    ]
+
+
+def test_relative_hrefs_resolve_against_the_page_not_a_directory():
+    html = '<a href="contact.html">Contact</a><a href="../impressum">x</a>'
+    assert contact_links("https://artist.com/en/about.html", html) == [
+        "https://artist.com/en/contact.html",
+        "https://artist.com/impressum",
+    ]
+
+
+def test_sitemap_links_keep_contact_like_pages():
+    xml = (
+        "<urlset><url><loc>https://artist.com/</loc></url>"
+        "<url><loc> https://artist.com/booking-info </loc></url>"
+        "<url><loc>https://artist.com/tour</loc></url>"
+        "<url><loc>https://other.com/contact</loc></url></urlset>"
+    )
+    assert sitemap_links("https://artist.com", xml) == ["https://artist.com/booking-info"]
+
+
+def test_plan_counts_where_candidates_came_from():
+    planner = ContactPlanner(path=None, max_pages=2)
+    assert planner.plan("https://a.com", ["https://a.com/contact", "https://a.com/about", "https://a.com/x"]) == [
+        "https://a.com/contact", "https://a.com/about",
+    ]
+    planner.plan("https://b.com", [], ["https://b.com/booking"])
+    assert planner.plan("https://c.com/", []) == ["https://c.com/contact", "https://c.com/booking"]
+    stats = planner.stats()
+    assert (stats["planned"], stats["from_links"], stats["from_sitemap"], stats["from_learned"]) == (5, 2, 1, 2)
+
+
+def test_learned_hits_reorder_links_and_fill_in_for_bare_sites():
+    planner = ContactPlanner(path=None, max_pages=2)
+    for _ in range(3):
+        planner.record("https://x.com/Team/", hit=True)
+        planner.record("https://x.com/contact", hit=False)
+    assert planner.plan("https://a.com", ["https://a.com/contact", "https://a.com/team"]) == [
+        "https://a.com/team", "https://a.com/contact",
+    ]
+    # Learned paths join the defaults; /contact's misses push it down
+    assert planner.plan("https://b.com", []) == ["https://b.com/booking", "https://b.com/team"]
+
+
+def test_learned_paths_persist(tmp_path):
+    path = str(tmp_path / "paths.json")
+    planner = ContactPlanner(path=path, save_interval=3600)
+    planner.record("https://x.com/booking", hit=True)  # first hit saves in the background
+    planner.record("https://x.com/about", hit=False)
+
+    async def close():
+        await planner.aclose()
+
+    asyncio.run(close())
+    with open(path) as f:
+        assert json.load(f) == {"paths": {"/booking": [1, 1], "/about": [1, 0]}}
+
+    reloaded = ContactPlanner(path=path)
+    assert reloaded.stats()["known_paths"] == 0  # loading is explicit
+    reloaded.load()
+    assert reloaded.stats()["top_paths"]["/booking"] == {"tries": 1, "hits": 1}
+
+
+def test_unreadable_file_is_ignored(tmp_path):
+    path = tmp_path / "paths.json"
+    path.write_text("{not json")
+    planner = ContactPlanner(path=str(path))
+    planner.load()
+    assert planner.stats()["known_paths"] == 0
@@ -0,0 +1,39 @@
+from fastapi.testclient import TestClient
+
+import main
+from services.email_utils import DomainTrie, EmailClassifier, is_junk_email, reload_rules
+
+
+def test_domain_trie_matches_exact_and_subdomains_only():
+    trie = DomainTrie(["example.com", "Mail.Co.UK"])
+    assert trie.match("example.com") == "example.com"
+    assert trie.match("news.example.com") == "example.com"
+    assert trie.match("mail.co.uk") == "mail.co.uk"
+    assert trie.match("badexample.com") is None
+    assert trie.match("example.co") is None
+    assert trie.match("com") is None
+
+
+def test_classifier_reports_most_specific_reason():
+    classifier = EmailClassifier(["spam.net"], ["support@", "support@label"])
+    assert classifier.junk_reason("a@mx.spam.net") == "junk_domain:spam.net"
+    assert classifier.junk_reason("support@labelco.de") == "junk_pattern:support@label"
+    assert classifier.junk_reason("book@artist.fm") == ""
+
+
+def test_dotless_blocked_terms_match_as_substrings():
+    client = TestClient(main.app)
+    try:
+        resp = client.post("/email-rules", json={"blocked_terms": [
+            {"term": "gmail", "type": "email_domain"},
+            {"term": "agency.io", "type": "email_domain"},
+            {"term": "hotmail", "type": "name"},
+        ]})
+        assert resp.status_code == 200
+        assert is_junk_email("someone@gmail.com")
+        assert is_junk_email("someone@gmailer.net")
+        assert is_junk_email("a@booking.agency.io")
+        assert not is_junk_email("a@myagency.io")
+        assert not is_junk_email("a@hotmail.com")
+    finally:
+        reload_rules()
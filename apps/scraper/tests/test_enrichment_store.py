@@ -0,0 +1,129 @@
+import time
+import asyncio
+
+import pytest
+
+from services.deep_scrape import _reuse_stored
+from services.enrichment_store import DEFAULT_TTLS, EnrichmentStore
+
+URL = "https://soundcloud.com/artist"
+RESULT = {
+    "url": URL, "sc_user_id": 7, "name": "Artist", "email": "a@artist.com", "email_source": "website",
+    "followers": 100, "track_count": 4, "genre": "techno", "bio": "old bio",
+    "latest_track_title": "Old", "latest_track_url": None, "latest_track_plays": 1,
+    "last_modified": "2026-01-01T00:00:00Z", "success": True,
+}
+
+
+class FakeScraper:
+    def __init__(self, user=None, track=None) -> None:
+        self.user = user
+        self.track = track
+        self.user_lookups = 0
+        self.track_lookups = 0
+
+    async def _get_user(self, uid):
+        self.user_lookups += 1
+        return self.user
+
+    async def _get_latest_track(self, uid):
+        self.track_lookups += 1
+        return self.track
+
+
+@pytest.fixture
+def store(tmp_path):
+    return EnrichmentStore(str(tmp_path / "enrichment.sqlite3"))
+
+
+def _seed(store: EnrichmentStore, age: float = 0.0, result: dict = RESULT) -> None:
+    asyncio.run(store.put(result, result["last_modified"]))
+    if age:
+        record = asyncio.run(store.get(7))
+        record.fetched_at = {g: t - age for g, t in record.fetched_at.items()}
+        asyncio.run(store.put(result, result["last_modified"], groups=set(), previous=record))
+
+
+def test_put_and_get_by_id_or_url(store):
+    _seed(store)
+    by_id = asyncio.run(store.get(7))
+    by_url = asyncio.run(store.get(url="artist"))
+    assert by_id.result == by_url.result == RESULT
+    assert by_id.last_modified == "2026-01-01T00:00:00Z"
+    assert set(by_id.fetched_at) == {"email", "socials", "track"}
+    assert asyncio.run(store.get(8)) is None
+    assert store.stats()["records"] == 1 and store.stats()["writes"] == 1
+
+
+def test_failed_results_are_not_stored(store):
+    asyncio.run(store.put({"sc_user_id": 7, "success": False}, None))
+    assert store.stats()["records"] == 0
+
+
+def test_email_miss_goes_stale_sooner(store):
+    _seed(store, result={**RESULT, "email": None})
+    record = asyncio.run(store.get(7))
+    now = time.time()
+    assert record.stale_groups(store.ttls, now) == set()
+    assert "email" in record.stale_groups(store.ttls, now + DEFAULT_TTLS["email_miss"] + 1)
+    _seed(store)
+    assert "email" not in asyncio.run(store.get(7)).stale_groups(store.ttls, now + DEFAULT_TTLS["email_miss"] + 1)
+
+
+def test_unchanged_artist_is_reused_with_profile_fields_from_the_row(store):
+    _seed(store)
+    scraper = FakeScraper()
+    candidate = {
+        "url": URL, "sc_user_id": 7, "last_modified": "2026-01-01T00:00:00Z",
+        "followers": 250, "track_count": 5, "genre": "house", "bio": "new bio",
+    }
+    result = asyncio.run(_reuse_stored(scraper, store, candidate))
+    assert result["cached"] is True
+    assert (result["followers"], result["track_count"], result["genre"], result["bio"]) == (250, 5, "house", "new bio")
+    assert result["email"] == "a@artist.com"
+    assert scraper.user_lookups == scraper.track_lookups == 0
+    assert store.stats()["reused"] == 1
+
+
+def test_without_last_modified_one_user_lookup_decides_and_refreshes(store):
+    _seed(store)
+    user = {"last_modified": "2026-01-01T00:00:00Z", "followers_count": 300, "track_count": 6,
+            "genre": "dnb", "description": "fresh"}
+    scraper = FakeScraper(user=user)
+    result = asyncio.run(_reuse_stored(scraper, store, {"url": URL}))
+    assert scraper.user_lookups == 1
+    assert (result["followers"], result["track_count"], result["genre"], result["bio"]) == (300, 6, "dnb", "fresh")
+
+
+@pytest.mark.parametrize("candidate, user", [
+    ({"url": URL, "sc_user_id": 7, "last_modified": "2026-02-01T00:00:00Z"}, None),
+    ({"url": URL}, {"last_modified": "2026-02-01T00:00:00Z"}),
+    ({"url": URL}, None),
+])
+def test_changed_or_unknown_profile_is_rescraped(store, candidate, user):
+    _seed(store)
+    assert asyncio.run(_reuse_stored(FakeScraper(user=user), store, candidate)) is None
+
+
+def test_stale_email_record_is_rescraped(store):
+    _seed(store, age=DEFAULT_TTLS["email"] + 1)
+    candidate = {"url": URL, "sc_user_id": 7, "last_modified": "2026-01-01T00:00:00Z"}
+    assert asyncio.run(_reuse_stored(FakeScraper(), store, candidate)) is None
+
+
+def test_stale_track_is_refreshed_alone(store):
+    _seed(store, age=DEFAULT_TTLS["track"] + 1)
+    before = asyncio.run(store.get(7)).fetched_at
+    scraper = FakeScraper(track={"title": "New", "permalink_url": "https://soundcloud.com/artist/new",
+                                 "playback_count": 9})
+    candidate = {"url": URL, "sc_user_id": 7, "last_modified": "2026-01-01T00:00:00Z"}
+    result = asyncio.run(_reuse_stored(scraper, store, candidate))
+    assert (result["latest_track_title"], result["latest_track_plays"]) == ("New", 9)
+    assert scraper.track_lookups == 1
+    assert store.stats()["partial_refreshes"] == 1
+
+    after = asyncio.run(store.get(7))
+    assert after.result["latest_track_title"] == "New"
+    assert after.fetched_at["track"] > before["track"]
+    assert after.fetched_at["email"] == before["email"]
+    assert after.stale_groups(store.ttls) == set()
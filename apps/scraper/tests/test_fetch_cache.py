@@ -0,0 +1,108 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from services.email_scraper import _start_result
+from services.fetch_cache import FetchCache, FetchResult
+
+URL = "https://artist.example/contact"
+
+
+def _cache() -> FetchCache:
+    return FetchCache(ttl=1000, negative_ttl=100, error_ttl=10)
+
+
+def _ttl_left(cache: FetchCache) -> float:
+    (entry,) = cache._entries.values()
+    return entry.expires - time.time()
+
+
+def _fetcher(*results: FetchResult):
+    calls = []
+
+    async def fetch(validators: dict) -> FetchResult:
+        calls.append(validators)
+        return results[min(len(calls), len(results)) - 1]
+
+    return fetch, calls
+
+
+@pytest.mark.parametrize("result, ttl", [
+    (FetchResult(status=200, email="a@b.de"), 1000),
+    (FetchResult(status=200), 1000),
+    (FetchResult(status=404, reason="status"), 100),
+    (FetchResult(status=200, reason="non_html"), 100),
+    (FetchResult(status=503, reason="error"), 10),
+    (FetchResult(reason="timeout"), 10),
+])
+def test_ttl_follows_reason(result, ttl):
+    cache = _cache()
+    fetch, _ = _fetcher(result)
+    asyncio.run(cache.fetch(URL, fetch))
+    assert _ttl_left(cache) == pytest.approx(ttl, abs=1)
+
+
+@pytest.mark.parametrize("status, reason", [
+    (200, ""), (304, ""), (404, "status"), (410, "status"),
+    (403, "error"), (408, "error"), (429, "error"), (500, "error"), (503, "error"),
+])
+def test_status_reason(status, reason):
+    resp = httpx.Response(status, headers={"content-type": "text/html"})
+    assert _start_result(resp).reason == reason
+
+
+def test_304_revalidates_the_stored_entry():
+    cache = _cache()
+    fetch, calls = _fetcher(FetchResult(status=200, email="a@b.de", etag='"v1"'), FetchResult(status=304))
+
+    async def run():
+        await cache.fetch(URL, fetch)
+        next(iter(cache._entries.values())).expires = 0
+        return await cache.fetch(URL, fetch)
+
+    assert asyncio.run(run()) == "a@b.de"
+    assert calls == [{}, {"If-None-Match": '"v1"'}]
+    assert cache.revalidated == 1
+
+
+def test_304_without_an_entry_refetches_plainly():
+    cache = _cache()
+    fetch, calls = _fetcher(FetchResult(status=304), FetchResult(status=200, email="a@b.de"))
+    assert asyncio.run(cache.fetch(URL, fetch)) == "a@b.de"
+    assert len(calls) == 2 and cache.revalidated == 0
+
+
+def test_repeated_bodiless_304_is_an_error_not_a_negative():
+    cache = _cache()
+    fetch, _ = _fetcher(FetchResult(status=304))
+    assert asyncio.run(cache.fetch(URL, fetch)) is None
+    assert _ttl_left(cache) == pytest.approx(10, abs=1)
+
+
+def _trip(cache: FetchCache, result: FetchResult, times: int) -> str:
+    fetch, _ = _fetcher(result)
+
+    async def run():
+        reason = ""
+        for i in range(times):
+            _, _, reason = await cache.fetch_page(f"https://slow.example/{i}", fetch)
+        return reason
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("result", [FetchResult(reason="timeout"), FetchResult(reason="error")])
+def test_breaker_opens_after_repeated_connection_failures(result):
+    cache = FetchCache(breaker_threshold=3)
+    assert _trip(cache, result, 4) == "circuit_open"
+    assert cache.stats()["open_circuits"] == 1
+
+
+@pytest.mark.parametrize("status", [403, 429, 503])
+def test_breaker_ignores_hosts_that_answer(status):
+    cache = FetchCache(breaker_threshold=3)
+    assert _trip(cache, FetchResult(status=status, reason="error"), 4) == "error"
+    assert cache.stats()["open_circuits"] == 0
+    assert not cache._failures
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from services.graph_crawler import (
+    DEFAULT_REQUEST_BUDGET, DISCOVER_CRAWL, DISCOVER_REQUEST_BUDGET, GraphCrawler, VisitedSet,
+)
+
+
+def test_visited_set_membership_across_buffer_merges():
+    visited = VisitedSet(buffer=4)
+    for uid in (9, 3, 7, 1, 5, 3, 9):
+        visited.add(uid)
+    assert len(visited) == 5
+    assert len(visited._sorted) == 4 and visited._recent == {5}
+    assert list(visited._sorted) == [1, 3, 7, 9]
+    assert all(uid in visited for uid in (1, 3, 5, 7, 9))
+    assert 2 not in visited and 10 not in visited and 0 not in visited
+
+
+def test_visited_set_ignores_ids_already_merged():
+    visited = VisitedSet(buffer=2)
+    visited.add(2)
+    visited.add(1)
+    visited.add(1)
+    visited.add(2)
+    assert len(visited) == 2
+    assert not visited._recent
+
+
+class FakeScraper:
+    """Every user has ten unseen neighbours per edge type."""
+
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.active = 0
+        self.peak_nodes = 0
+        self._nodes: dict[int, int] = {}
+        self._next = 1000
+
+    async def _edge(self, uid: int) -> list[dict]:
+        self._nodes[uid] = self._nodes.get(uid, 0) + 1
+        self.peak_nodes = max(self.peak_nodes, len(self._nodes))
+        await asyncio.sleep(0.001)
+        self._nodes[uid] -= 1
+        if not self._nodes[uid]:
+            del self._nodes[uid]
+        if self.fail:
+            raise RuntimeError("boom")
+        users = [{"id": self._next + i, "followers_count": 500} for i in range(10)]
+        self._next += 10
+        return users
+
+    def _followings_paginated(self, uid, max_pages=1):
+        return self._edge(uid)
+
+    def _followers_paginated(self, uid, max_pages=1):
+        return self._edge(uid)
+
+    def _followings(self, uid):
+        return self._edge(uid)
+
+    def _related(self, uid):
+        return self._edge(uid)
+
+
+def _crawl(crawler: GraphCrawler, seed: dict) -> list:
+    async def run():
+        return [batch async for batch in crawler.crawl(seed)]
+    return asyncio.run(run())
+
+
+def test_discover_default_matches_old_fixed_expansion():
+    # related + 3 followings pages + 3 followers pages, then top 3 × 2
+    assert DISCOVER_REQUEST_BUDGET == 13 and DEFAULT_REQUEST_BUDGET == 26
+    crawler = GraphCrawler(
+        FakeScraper(), 0, 1000,
+        request_budget=DISCOVER_CRAWL.request_budget, seed_followers_pages=DISCOVER_CRAWL.seed_followers_pages,
+    )
+    assert crawler._cost(0) == 7
+    _crawl(crawler, {"id": 1})
+    assert crawler.requests == 13
+    assert crawler.expanded == 4
+
+
+def test_concurrency_counts_nodes_not_calls():
+    scraper = FakeScraper()
+    crawler = GraphCrawler(scraper, 0, 1000, request_budget=200, concurrency=4)
+    _crawl(crawler, {"id": 1})
+    assert crawler.expanded > 4
+    assert scraper.peak_nodes == 4
+
+
+@pytest.mark.parametrize("budget", [7, 26])
+def test_failed_calls_are_counted(budget):
+    crawler = GraphCrawler(FakeScraper(fail=True), request_budget=budget)
+    assert _crawl(crawler, {"id": 1}) == []
+    assert crawler.stats()["failed"] == 3
@@ -0,0 +1,140 @@
+import asyncio
+
+import httpx
+import pytest
+
+from services import http_pools
+from services.http_pools import CachingResolverBackend, ExternalPool, PoolStats, ResolvingTransport
+
+
+class FakeBackend:
+    def __init__(self, down: set[str] = frozenset()) -> None:
+        self.down = down
+        self.attempts: list[str] = []
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        self.attempts.append(host)
+        if host in self.down:
+            raise OSError(f"{host} unreachable")
+        return f"stream:{host}"
+
+
+def _resolver(backend: FakeBackend, addrs: list[str], ttl: float = 300.0):
+    resolver = CachingResolverBackend(backend, ttl=ttl)
+    lookups = []
+
+    async def getaddrinfo(host, port, type=0):
+        lookups.append(host)
+        return [(None, None, None, "", (a, port)) for a in addrs]
+
+    return resolver, lookups, getaddrinfo
+
+
+def test_dns_results_are_cached_until_ttl(monkeypatch):
+    backend = FakeBackend()
+    resolver, lookups, getaddrinfo = _resolver(backend, ["10.0.0.1", "10.0.0.1", "10.0.0.2"])
+
+    async def run():
+        monkeypatch.setattr(asyncio.get_running_loop(), "getaddrinfo", getaddrinfo)
+        assert await resolver.connect_tcp("example.com", 443) == "stream:10.0.0.1"
+        assert await resolver.connect_tcp("example.com", 443) == "stream:10.0.0.1"
+        resolver._cache[("example.com", 443)] = (0.0, ["10.0.0.9"])  # expired
+        await resolver.connect_tcp("example.com", 443)
+
+    asyncio.run(run())
+    assert lookups == ["example.com", "example.com"]
+    assert (resolver.hits, resolver.misses) == (1, 2)
+    assert resolver._cache[("example.com", 443)][1] == ["10.0.0.1", "10.0.0.2"]
+
+
+def test_ip_literals_skip_resolution():
+    backend = FakeBackend()
+    resolver = CachingResolverBackend(backend)
+    assert asyncio.run(resolver.connect_tcp("127.0.0.1", 80)) == "stream:127.0.0.1"
+    assert (resolver.hits, resolver.misses) == (0, 0)
+
+
+def test_fails_over_across_addresses_and_forgets_dead_records():
+    backend = FakeBackend(down={"10.0.0.1"})
+    resolver = CachingResolverBackend(backend)
+    resolver._cache[("example.com", 443)] = (float("inf"), ["10.0.0.1", "10.0.0.2"])
+    assert asyncio.run(resolver.connect_tcp("example.com", 443)) == "stream:10.0.0.2"
+
+    backend.down = {"10.0.0.1", "10.0.0.2"}
+    with pytest.raises(OSError):
+        asyncio.run(resolver.connect_tcp("example.com", 443))
+    assert backend.attempts == ["10.0.0.1", "10.0.0.2", "10.0.0.1", "10.0.0.2"]
+    assert ("example.com", 443) not in resolver._cache
+
+
+def test_resolving_transport_pool_uses_the_resolver():
+    resolver = CachingResolverBackend(FakeBackend())
+    transport = ResolvingTransport(resolver, httpx.Limits(max_connections=7, max_keepalive_connections=3))
+    assert transport._pool._network_backend is resolver
+    assert transport._pool._max_connections == 7
+
+
+def test_pool_stats_track_in_flight_peak_and_errors():
+    stats = PoolStats(capacity=4)
+
+    async def ok():
+        async with stats.track():
+            await asyncio.sleep(0.01)
+
+    async def fail():
+        async with stats.track():
+            raise RuntimeError("boom")
+
+    async def run():
+        await asyncio.gather(ok(), ok(), fail(), return_exceptions=True)
+
+    asyncio.run(run())
+    d = stats.to_dict()
+    assert (d["requests"], d["errors"], d["peak"], d["in_flight"]) == (3, 1, 3, 0)
+
+
+def test_per_host_cap():
+    pool = ExternalPool(per_host=2)
+    active = peak = 0
+
+    async def hit():
+        nonlocal active, peak
+        async with pool._host_slot("https://Example.com/a"):
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    async def run():
+        await asyncio.gather(*(hit() for _ in range(6)))
+        await pool.aclose()
+
+    asyncio.run(run())
+    assert peak == 2
+    assert not pool._host_users
+
+
+def test_eviction_skips_hosts_still_in_use(monkeypatch):
+    monkeypatch.setattr(http_pools, "MAX_TRACKED_HOSTS", 2)
+    pool = ExternalPool(per_host=1)
+
+    async def run():
+        release = asyncio.Event()
+
+        async def hold(url):
+            async with pool._host_slot(url):
+                await release.wait()
+
+        busy = asyncio.create_task(hold("https://busy.com/"))
+        await asyncio.sleep(0)
+        async with pool._host_slot("https://idle.com/"):
+            pass
+        async with pool._host_slot("https://new.com/"):
+            pass
+        # busy.com is the oldest but still held, so idle.com goes
+        assert list(pool._host_slots) == ["busy.com", "new.com"]
+        release.set()
+        await busy
+        await pool.aclose()
+
+    asyncio.run(run())
@@ -0,0 +1,100 @@
+import json
+import asyncio
+
+from services.hydration import UserHydrator
+from services.models import SC_API
+from services.response_cache import ResponseCache
+
+
+class Resp:
+    def __init__(self, status_code: int, body=None) -> None:
+        self.status_code = status_code
+        self.content = json.dumps(body).encode()
+
+
+class FakeScraper:
+    """/users?ids= returns every id except `missing`; /users/{id} 404s on `gone`."""
+
+    client_id = "cid"
+
+    def __init__(self, missing=(), gone=()) -> None:
+        self._cache = ResponseCache(db_path=None)
+        self.missing = set(missing)
+        self.gone = set(gone)
+        self.bulk: list[list[int]] = []
+        self.singles: list[int] = []
+
+    async def _get(self, url, params):
+        if url == f"{SC_API}/users":
+            ids = [int(i) for i in params["ids"].split(",")]
+            self.bulk.append(ids)
+            return Resp(200, {"collection": [{"id": i} for i in ids if i not in self.missing]})
+        uid = int(url.rsplit("/", 1)[1])
+        self.singles.append(uid)
+        return Resp(404) if uid in self.gone else Resp(200, {"id": uid})
+
+
+def test_calls_within_the_window_share_one_bulk_request():
+    scraper = FakeScraper()
+    hydrator = UserHydrator(scraper, window=0.01)
+
+    async def run():
+        return await asyncio.gather(*(hydrator.get_user(i) for i in (3, 1, 2, 1)))
+
+    assert asyncio.run(run()) == [{"id": 3}, {"id": 1}, {"id": 2}, {"id": 1}]
+    assert scraper.bulk == [[3, 1, 2]]
+    assert scraper.singles == []
+    assert hydrator.stats()["batches"] == 1 and hydrator.stats()["pending"] == 0
+
+
+def test_full_batches_flush_without_waiting_for_the_window():
+    scraper = FakeScraper()
+    hydrator = UserHydrator(scraper, window=10.0, max_batch=2)
+
+    async def run():
+        return await asyncio.wait_for(asyncio.gather(*(hydrator.get_user(i) for i in (1, 2, 3, 4))), 1.0)
+
+    asyncio.run(run())
+    assert scraper.bulk == [[1, 2], [3, 4]]
+
+
+def test_ids_missing_from_the_batch_fall_back_to_single_fetches():
+    scraper = FakeScraper(missing={2, 3}, gone={3})
+    hydrator = UserHydrator(scraper, window=0.01)
+
+    async def run():
+        return await asyncio.gather(*(hydrator.fetch(i) for i in (1, 2, 3)))
+
+    assert asyncio.run(run()) == [({"id": 1}, 200), ({"id": 2}, 200), (None, 404)]
+    assert sorted(scraper.singles) == [2, 3]
+    assert hydrator.stats()["fallbacks"] == 2
+
+
+def test_batched_users_seed_the_per_user_cache():
+    scraper = FakeScraper()
+    hydrator = UserHydrator(scraper, window=0.01)
+
+    async def run():
+        await asyncio.gather(hydrator.get_user(1), hydrator.get_user(2))
+        return await hydrator.get_user("2")
+
+    assert asyncio.run(run()) == {"id": 2}
+    assert len(scraper.bulk) == 1
+    assert hydrator.stats()["cache_hits"] == 1
+
+
+def test_prefetch_chunks_known_ids_and_skips_cached_ones():
+    scraper = FakeScraper()
+    hydrator = UserHydrator(scraper, max_batch=2)
+
+    async def run():
+        first = await hydrator.prefetch(["1", 2, 2, None, "x", 3, 4])
+        second = await hydrator.prefetch([1, 2, 3, 4, 5, 6])
+        user = await hydrator.get_user(4)
+        return first, second, user
+
+    first, second, user = asyncio.run(run())
+    assert scraper.bulk == [[1, 2], [3, 4], [5, 6]]
+    assert (first, second, user) == (4, 2, {"id": 4})
+    assert hydrator.stats()["prefetched"] == 6
+    assert scraper.singles == []
@@ -0,0 +1,164 @@
+import asyncio
+
+import pytest
+
+from services import jobs
+from services.jobs import JobManager, JobStore
+
+CANDIDATES = [{"url": f"https://soundcloud.com/a{i}"} for i in range(5)]
+
+
+class FakePipeline:
+    """Stands in for iter_deep_scrape_indexed; `gate` holds results from `hold_from` on."""
+
+    def __init__(self, drop=(), hold_from: int | None = None) -> None:
+        self.drop = set(drop)
+        self.hold_from = hold_from
+        self.gate = asyncio.Event()
+        self.seen: list[list[dict]] = []
+
+    async def __call__(self, scraper, candidates, concurrency=5, force_refresh=False):
+        self.seen.append(candidates)
+        for pos, c in enumerate(candidates):
+            if self.hold_from is not None and pos >= self.hold_from:
+                await self.gate.wait()
+            await asyncio.sleep(0)
+            if c["url"] in self.drop:
+                continue
+            n = int(c["url"].rsplit("a", 1)[1])
+            yield pos, {"url": c["url"], "success": True, "email": f"a{n}@x.com" if n % 2 == 0 else None}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / "jobs.sqlite3"))
+
+
+def _manager(store, pipeline, monkeypatch) -> JobManager:
+    monkeypatch.setattr(jobs, "iter_deep_scrape_indexed", pipeline)
+    return JobManager(scraper=None, store=store)
+
+
+async def _wait_done(manager: JobManager) -> None:
+    while manager._tasks:
+        await asyncio.gather(*manager._tasks.values(), return_exceptions=True)
+
+
+def test_submit_runs_to_completion_with_paged_results(store, monkeypatch):
+    manager = _manager(store, FakePipeline(), monkeypatch)
+
+    async def run():
+        job = await manager.submit(CANDIDATES)
+        assert job["status"] == "queued" and job["total"] == 5
+        await _wait_done(manager)
+        return (
+            await manager.status(job["job_id"]),
+            await manager.results(job["job_id"], 0, 2),
+            await manager.results(job["job_id"], 4, 10),
+        )
+
+    job, first, last = asyncio.run(run())
+    assert (job["status"], job["done"], job["emails_found"]) == ("completed", 5, 3)
+    assert [r["url"] for r in first] == [CANDIDATES[0]["url"], CANDIDATES[1]["url"]]
+    assert [r["url"] for r in last] == [CANDIDATES[4]["url"]]
+
+
+def test_dropped_candidates_are_saved_as_failed(store, monkeypatch):
+    manager = _manager(store, FakePipeline(drop={CANDIDATES[2]["url"]}), monkeypatch)
+
+    async def run():
+        job = await manager.submit(CANDIDATES)
+        await _wait_done(manager)
+        return await manager.results(job["job_id"])
+
+    results = asyncio.run(run())
+    assert len(results) == 5
+    assert results[2] == {"url": CANDIDATES[2]["url"], "success": False, "error": "Deep scrape failed"}
+
+
+def test_events_stream_progress_and_results_until_complete(store, monkeypatch):
+    pipeline = FakePipeline(hold_from=0)
+    manager = _manager(store, pipeline, monkeypatch)
+
+    async def run():
+        job = await manager.submit(CANDIDATES[:2])
+        events = []
+
+        async def listen():
+            async for event, data in manager.events(job["job_id"]):
+                events.append((event, data))
+
+        listener = asyncio.create_task(listen())
+        await asyncio.sleep(0.01)
+        pipeline.gate.set()
+        await asyncio.wait_for(listener, 1.0)
+        # A finished job replays its final state
+        replay = [e async for e, _ in manager.events(job["job_id"])]
+        return events, replay
+
+    events, replay = asyncio.run(run())
+    kinds = [e for e, _ in events]
+    assert kinds == ["progress", "result", "progress", "result", "progress", "complete"]
+    assert [d["index"] for e, d in events if e == "result"] == [0, 1]
+    assert events[-1][1]["status"] == "completed" and events[-1][1]["done"] == 2
+    assert replay == ["progress", "complete"]
+    assert manager.stats()["subscribers"] == 0
+
+
+def test_cancel_keeps_saved_results(store, monkeypatch):
+    pipeline = FakePipeline(hold_from=2)
+    manager = _manager(store, pipeline, monkeypatch)
+
+    async def run():
+        job = await manager.submit(CANDIDATES)
+        while (await manager.status(job["job_id"]))["done"] < 2:
+            await asyncio.sleep(0.001)
+        assert await manager.cancel(job["job_id"])
+        await _wait_done(manager)
+        assert not await manager.cancel(job["job_id"])
+        return await manager.status(job["job_id"])
+
+    job = asyncio.run(run())
+    assert (job["status"], job["done"]) == ("cancelled", 2)
+
+
+def test_resume_picks_up_unfinished_candidates(tmp_path, monkeypatch):
+    path = str(tmp_path / "jobs.sqlite3")
+    crashed = JobStore(path)
+    job_id = crashed.create("deep_scrape", CANDIDATES, {"force_refresh": True})
+    crashed.set_status(job_id, "running")
+    crashed.save_result(job_id, 0, {"url": CANDIDATES[0]["url"], "success": True})
+    crashed.save_result(job_id, 3, {"url": CANDIDATES[3]["url"], "success": True})
+    crashed.close()
+
+    pipeline = FakePipeline()
+    manager = _manager(JobStore(path), pipeline, monkeypatch)
+
+    async def run():
+        assert await manager.resume() == 1
+        await _wait_done(manager)
+        job = await manager.status(job_id)
+        results = await manager.results(job_id)
+        await manager.aclose()
+        return job, results
+
+    job, results = asyncio.run(run())
+    assert [c["url"] for c in pipeline.seen[0]] == [CANDIDATES[i]["url"] for i in (1, 2, 4)]
+    assert (job["status"], job["done"]) == ("completed", 5)
+    assert [r["url"] for r in results] == [c["url"] for c in CANDIDATES]
+
+
+def test_shutdown_leaves_running_jobs_resumable(tmp_path, monkeypatch):
+    path = str(tmp_path / "jobs.sqlite3")
+    manager = _manager(JobStore(path), FakePipeline(hold_from=0), monkeypatch)
+
+    async def run():
+        job = await manager.submit(CANDIDATES)
+        await asyncio.sleep(0.01)
+        await manager.aclose()
+        return job["job_id"]
+
+    job_id = asyncio.run(run())
+    reopened = JobStore(path)
+    assert reopened.unfinished() == [job_id]
+    assert reopened.job(job_id)["status"] == "running"
@@ -0,0 +1,64 @@
+import asyncio
+import json
+
+from services.email_scraper import _link_kind, _race_probes
+from services.link_in_bio import parse_link_page
+
+
+def _next_data(blob: dict) -> str:
+    return f'<html><script id="__NEXT_DATA__" type="application/json">{json.dumps(blob)}</script></html>'
+
+
+def test_linktree_account_links_and_email():
+    html = _next_data({"props": {"pageProps": {"account": {
+        "username": "artist",
+        "profilePictureUrl": "https://ugc.production.linktr.ee/abc/avatar.jpeg",
+        "links": [
+            {"title": "Website", "url": "https://artist-music.com"},
+            {"title": "Spotify", "url": "https://open.spotify.com/artist/1"},
+            {"title": "Self", "url": "https://linktr.ee/artist"},
+        ],
+        "contact": {"email": "mgmt@artist-music.com"},
+        "theme": {"backgroundImage": "https://cdn.linktr.ee/bg/1.png", "fontUrl": "https://assets.linktr.ee/f"},
+    }}}})
+    page = parse_link_page("https://linktr.ee/artist", html)
+    assert page.structured
+    assert page.email == "mgmt@artist-music.com"
+    assert page.links == ["https://artist-music.com", "https://open.spotify.com/artist/1"]
+
+
+def test_text_scan_runs_when_embedded_json_has_no_email():
+    html = _next_data({"props": {"pageProps": {"links": [{"url": "https://artist.fm"}]}}})
+    html += '<footer><a href="mailto:bookings@artist.fm">Bookings</a></footer>'
+    page = parse_link_page("https://beacons.ai/artist", html)
+    assert page.structured
+    assert page.email == "bookings@artist.fm"
+
+
+def test_plain_html_page_uses_anchors():
+    html = (
+        '<a href="https://www.artist.fm/">site</a><img src="https://artist.fm/logo.png">'
+        '<a href="https://solo.to/other">x</a> write to hello@artist.fm'
+    )
+    page = parse_link_page("https://www.solo.to/artist", html)
+    assert not page.structured
+    assert page.email == "hello@artist.fm"
+    assert page.links == ["https://www.artist.fm/"]
+
+
+def test_link_kind_strips_only_the_www_prefix():
+    assert _link_kind("https://www.linktr.ee/a") == "linktree"
+    # lstrip("www.") used to eat the leading "w" here
+    assert _link_kind("https://wwise.com/") == "website"
+    assert _link_kind("https://www.youtube.com/c/a") == "skip"
+
+
+def test_race_reports_the_source_a_probe_returns():
+    async def hop():
+        return "mgmt@artist-music.com", "website"
+
+    async def website():
+        return None
+
+    probes = [("linktree", hop), ("website", website)]
+    assert asyncio.run(_race_probes(probes, 1.0)) == ("mgmt@artist-music.com", "website")
@@ -0,0 +1,61 @@
+import pytest
+
+from services.models import BIO_MAX, Candidate, parse_epoch, user_summary
+
+USER = {
+    "id": 42, "full_name": "Full Name", "permalink": "artist", "followers_count": 1200,
+    "genre": "Techno", "last_modified": "2026-01-02T03:04:05Z", "avatar_url": "https://i1.sndcdn.com/a-large.jpg",
+    "city": "Berlin", "country_code": "DE", "description": "x" * (BIO_MAX + 50),
+}
+
+
+def test_from_user_projects_once():
+    c = Candidate.from_user(USER, "trending", distance=2)
+    assert (c.id, c.username, c.permalink, c.followers_count) == (42, "Full Name", "artist", 1200)
+    assert c.track_count is None
+    assert len(c.description) == BIO_MAX
+    assert c.modified_at == parse_epoch("2026-01-02T03:04:05Z")
+    assert (c.source_tap, c.distance, c.hits) == ("trending", 2, 1)
+
+
+def test_seen_again_counts_hits_and_keeps_the_nearest_distance():
+    c = Candidate.from_user(USER)
+    c.seen_again(3)
+    c.seen_again(None)
+    assert (c.hits, c.distance) == (3, 3)
+    c.seen_again(1)
+    c.seen_again(2)
+    assert (c.hits, c.distance) == (5, 1)
+
+
+def test_get_mirrors_dict_get():
+    c = Candidate.from_user(USER)
+    assert c.get("followers_count") == 1200
+    assert c.get("missing", "default") == "default"
+
+
+@pytest.mark.parametrize("user", [USER, {**USER, "track_count": 7}, {"id": 1}, {"id": 1, "city": None}])
+def test_user_summary_is_the_same_for_dict_and_candidate(user):
+    from_dict = user_summary(user)
+    assert user_summary(Candidate.from_user(user)) == from_dict
+    assert from_dict["track_count"] == user.get("track_count", 0)
+
+
+def test_user_summary_shape():
+    summary = user_summary(Candidate.from_user(USER))
+    assert summary["name"] == "Full Name"
+    assert summary["url"] == "https://soundcloud.com/artist"
+    assert summary["avatar_url"] == "https://i1.sndcdn.com/a-t200x200.jpg"
+    assert summary["track_count"] == 0
+    assert user_summary({"id": 1})["name"] == "Unknown"
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2026-01-02T03:04:05Z", 1767323045.0),
+    ("2026-01-02T03:04:05+00:00", 1767323045.0),
+    ("yesterday", None),
+    (None, None),
+    (12345, None),
+])
+def test_parse_epoch(value, expected):
+    assert parse_epoch(value) == expected
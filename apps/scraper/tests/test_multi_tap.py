@@ -0,0 +1,98 @@
+import json
+import asyncio
+
+from services.multi_tap import _search_trending_tracks, multi_tap_discover
+
+
+class Resp:
+    def __init__(self, body: dict) -> None:
+        self.status_code = 200
+        self.content = json.dumps(body).encode()
+
+
+def _user(uid: int, followers: int = 5000) -> dict:
+    return {"id": uid, "username": f"u{uid}", "permalink": f"u{uid}", "followers_count": followers, "track_count": 3}
+
+
+class FakeScraper:
+    """Trending pages carry `per_page` users, user searches `searched`; the rest is empty."""
+
+    client_id = "cid"
+
+    def __init__(self, per_page: int = 4, page_delay: float = 0.0, users=None, searched=()) -> None:
+        self.per_page = per_page
+        self.searched = list(searched)
+        self.page_delay = page_delay
+        self.users = users
+        self.queries: list[str] = []
+        self.cancelled = 0
+
+    async def _get(self, url, params):
+        if "/search/tracks" not in url:
+            return Resp({"collection": []})
+        if params["offset"] == 0:
+            self.queries.append(params["q"])
+        try:
+            await asyncio.sleep(self.page_delay * (params["offset"] // params["limit"]))
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.users is not None:
+            users = self.users(params["q"], params["offset"])
+        else:
+            base = hash(params["q"]) % 10_000 * 100 + params["offset"] // params["limit"] * self.per_page
+            users = [_user(base + i) for i in range(self.per_page)]
+        return Resp({"collection": [{"user": u} for u in users], "next_href": "more"})
+
+    async def _search(self, query, limit=50):
+        return self.searched
+
+    async def _search_tracks_by_tag(self, tag, limit=200):
+        return []
+
+    async def _followings_paginated(self, uid, max_pages=2):
+        return []
+
+
+def test_trending_never_repeats_the_genre_query():
+    scraper = FakeScraper()
+    asyncio.run(_search_trending_tracks(scraper, "rap", ["rap", "hip-hop", "trap", "hip hop"], pages=1))
+    assert sorted(scraper.queries) == ["hip-hop", "rap", "trap"]
+
+
+def test_ingest_dedups_across_sources_and_filters_the_band():
+    # Every trending query and user search returns the same users; one is out of range
+    scraper = FakeScraper(
+        users=lambda q, offset: [_user(1), _user(2, followers=10)] if offset == 0 else [],
+        searched=[_user(1), _user(2, followers=10)],
+    )
+    events = []
+
+    async def progress(event, data):
+        events.append((event, data))
+
+    result = asyncio.run(multi_tap_discover(scraper, "rap", progress_callback=progress))
+    assert [r["sc_user_id"] for r in result["results"]] == [1]
+    assert result["filtered_count"] == 1
+    assert sum(result["tap_stats"].values()) == 1
+    assert result["total_found"] == 1
+    # Admitted once; later sightings only count towards the sources signal
+    assert result["results"][0]["score_breakdown"]["sources"] > 0
+    batches = [d for e, d in events if e == "candidates"]
+    assert [[r["sc_user_id"] for r in d["results"]] for d in batches] == [[1]]
+
+
+def test_full_pool_stops_the_taps_early():
+    scraper = FakeScraper(per_page=4, page_delay=0.5)
+    events = []
+
+    async def progress(event, data):
+        events.append((event, data))
+
+    result = asyncio.run(multi_tap_discover(scraper, "techno", target_pool=3, progress_callback=progress))
+    assert result["filtered_count"] == 3
+    assert result["stopped_early"] and not result["truncated"]
+    # Later offset pages were still in flight and got cancelled
+    assert scraper.cancelled > 0
+    trending = [d for e, d in events if e == "tap_complete" and d["tap"] == "trending"]
+    assert trending == [{"tap": "trending", "candidates": 3, "cancelled": True}]
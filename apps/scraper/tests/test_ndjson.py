@@ -0,0 +1,112 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from services.models import Candidate
+from services.ranking import Ranker
+
+NDJSON = {"Accept": "application/x-ndjson"}
+CANDIDATES = [{"url": f"https://soundcloud.com/a{i}"} for i in range(3)]
+
+
+def _lines(resp) -> list[dict]:
+    return [json.loads(line) for line in resp.text.splitlines() if line]
+
+
+def _results(fail_at=None):
+    rows = [
+        {"url": CANDIDATES[0]["url"], "success": True, "email": "a@x.com"},
+        {"url": CANDIDATES[1]["url"], "success": False, "error": "User fetch failed: 404"},
+        {"url": CANDIDATES[2]["url"], "success": True, "email": None},
+    ]
+
+    async def iter_deep_scrape(scraper, candidates, concurrency=5, force_refresh=False):
+        for i, row in enumerate(rows):
+            if i == fail_at:
+                raise RuntimeError("pipeline broke")
+            yield row
+
+    async def deep_scrape_batch(scraper, candidates, concurrency=5, force_refresh=False):
+        return rows
+
+    return iter_deep_scrape, deep_scrape_batch
+
+
+@pytest.fixture
+def client(monkeypatch):
+    iter_deep_scrape, deep_scrape_batch = _results()
+    monkeypatch.setattr(main, "iter_deep_scrape", iter_deep_scrape)
+    monkeypatch.setattr(main, "deep_scrape_batch", deep_scrape_batch)
+    return TestClient(main.app)
+
+
+def test_deep_scrape_streams_results_then_a_summary(client):
+    resp = client.post("/deep-scrape", json={"candidates": CANDIDATES}, headers=NDJSON)
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = _lines(resp)
+    assert [line["type"] for line in lines] == ["result", "result", "result", "summary"]
+    assert lines[0] == {"type": "result", "url": CANDIDATES[0]["url"], "success": True, "email": "a@x.com"}
+    assert lines[-1] == {"type": "summary", "total": 3, "emails_found": 1, "failed": 1}
+
+
+def test_deep_scrape_stream_error_summary_keeps_the_counts(monkeypatch):
+    iter_deep_scrape, _ = _results(fail_at=2)
+    monkeypatch.setattr(main, "iter_deep_scrape", iter_deep_scrape)
+    lines = _lines(TestClient(main.app).post("/deep-scrape", json={"candidates": CANDIDATES}, headers=NDJSON))
+    assert lines[-1] == {"type": "summary", "total": 2, "emails_found": 1, "failed": 1, "error": "pipeline broke"}
+
+
+def test_deep_scrape_without_ndjson_accept_returns_json(client):
+    for headers in ({}, {"Accept": "application/json"}):
+        resp = client.post("/deep-scrape", json={"candidates": CANDIDATES}, headers=headers)
+        assert resp.headers["content-type"] == "application/json"
+        body = resp.json()
+        assert (body["total"], body["emails_found"], body["failed"]) == (3, 1, 1)
+
+
+class FakeScraper:
+    def __init__(self) -> None:
+        self.users = [
+            Candidate(id=1, username="one", permalink="one", followers_count=500, track_count=2),
+            Candidate(id=2, username="two", permalink="two", followers_count=900, track_count=None),
+        ]
+
+    async def iter_discover(self, **kwargs):
+        for c in self.users:
+            yield "result", c
+        ranked = Ranker([]).top(self.users, kwargs["max_results"])
+        yield "summary", {
+            "total_found": 2, "filtered_count": len(ranked), "seed_artist": "seed",
+            "filter_stats": {"passed": 2}, "ranked": ranked, "graph_crawl": None,
+        }
+
+    async def discover(self, **kwargs):
+        return {"results": [], "filtered_count": 0}
+
+
+def test_discover_stream_record_shape(monkeypatch):
+    monkeypatch.setattr(main, "scraper", FakeScraper())
+    resp = TestClient(main.app).post(
+        "/discover", json={"seed_url": "https://soundcloud.com/seed", "max_results": 1},
+        headers={"Accept": "application/json, application/x-ndjson"},
+    )
+    lines = _lines(resp)
+    assert [line["type"] for line in lines] == ["result", "result", "summary"]
+    assert lines[0] == {
+        "type": "result", "name": "one", "url": "https://soundcloud.com/one", "followers": 500,
+        "track_count": 2, "genre": "", "avatar_url": "", "city": "", "country": "",
+        "last_modified": None, "modified_at": None, "sc_user_id": 1,
+    }
+    summary = lines[-1]
+    assert "ranked" not in summary
+    assert summary["filtered_count"] == len(summary["top"]) == len(summary["scores"]) == 1
+    assert summary["scores"][0]["sc_user_id"] == summary["top"][0]
+    assert set(summary["scores"][0]) == {"sc_user_id", "score", "score_breakdown"}
+
+
+def test_discover_without_ndjson_accept_returns_json(monkeypatch):
+    monkeypatch.setattr(main, "scraper", FakeScraper())
+    resp = TestClient(main.app).post("/discover", json={"seed_url": "https://soundcloud.com/seed"})
+    assert resp.json() == {"results": [], "filtered_count": 0}
@@ -0,0 +1,130 @@
+import json
+import asyncio
+from contextlib import aclosing
+from urllib.parse import urlparse
+
+from services.pagination import collect_pages, is_offset_paginated, iter_cursor_pages, iter_offset_pages, iter_pages
+
+SEARCH = "https://api-v2.soundcloud.com/search/users"
+FOLLOWERS = "https://api-v2.soundcloud.com/users/1/followers"
+
+
+class Resp:
+    def __init__(self, status_code: int, body: dict) -> None:
+        self.status_code = status_code
+        self.content = json.dumps(body).encode()
+
+
+class FakeScraper:
+    """Serves `pages` offset pages of two users each, after `delays[offset]` seconds."""
+
+    client_id = "cid"
+
+    def __init__(self, pages: int = 10, delays: dict[int, float] | None = None, status: int = 200) -> None:
+        self.pages = pages
+        self.delays = delays or {}
+        self.status = status
+        self.calls: list[tuple[str, dict]] = []
+        self.cancelled: list[int] = []
+
+    async def _get(self, url, params):
+        self.calls.append((url, params))
+        page = params.get("offset", 0) // params["limit"] if "offset" in params else int(params.get("cursor", 0))
+        try:
+            await asyncio.sleep(self.delays.get(page, 0))
+        except asyncio.CancelledError:
+            self.cancelled.append(page)
+            raise
+        if page >= self.pages:
+            return Resp(self.status, {"collection": []})
+        body = {"collection": [{"id": page * 2}, {"id": page * 2 + 1}]}
+        if page + 1 < self.pages:
+            path = urlparse(url).path
+            body["next_href"] = f"https://api-v2.soundcloud.com{path}?cursor={page + 1}&limit={params['limit']}"
+        return Resp(self.status, body)
+
+
+async def _collect(pages) -> list[list[dict]]:
+    return [p async for p in pages]
+
+
+def test_endpoint_mode():
+    assert is_offset_paginated(SEARCH)
+    assert not is_offset_paginated(FOLLOWERS)
+
+
+def test_offset_pages_come_back_in_order_despite_latency():
+    scraper = FakeScraper(delays={0: 0.03, 1: 0.01, 2: 0.0})
+    pages = asyncio.run(_collect(iter_offset_pages(scraper, SEARCH, {"q": "x"}, max_pages=3, limit=2)))
+    assert [[u["id"] for u in p] for p in pages] == [[0, 1], [2, 3], [4, 5]]
+    assert [params["offset"] for _, params in scraper.calls] == [0, 2, 4]
+    assert all(params["client_id"] == "cid" and params["q"] == "x" for _, params in scraper.calls)
+
+
+def test_offset_window_bounds_requests_in_flight():
+    scraper = FakeScraper(delays={0: 0.02})
+
+    async def run():
+        async with aclosing(iter_offset_pages(scraper, SEARCH, {}, max_pages=6, limit=2, window=2)) as pages:
+            first = await anext(pages)
+            # Page 0 held the window at two until it landed
+            assert len(scraper.calls) == 2
+            return first, [p async for p in pages]
+
+    first, rest = asyncio.run(run())
+    assert first == [{"id": 0}, {"id": 1}]
+    assert len(rest) == 5
+    assert len(scraper.calls) == 6
+
+
+def test_offset_stops_on_last_page():
+    scraper = FakeScraper(pages=2)
+    pages = asyncio.run(_collect(iter_offset_pages(scraper, SEARCH, {}, max_pages=5, limit=2, window=1)))
+    assert len(pages) == 2
+    assert len(scraper.calls) == 2
+
+
+def test_closing_mid_window_cancels_prefetches():
+    scraper = FakeScraper(delays={1: 1.0, 2: 1.0})
+
+    async def run():
+        async with aclosing(iter_offset_pages(scraper, SEARCH, {}, max_pages=3, limit=2)) as pages:
+            async for _ in pages:
+                break
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert sorted(scraper.cancelled) == [1, 2]
+
+
+def test_cursor_follows_next_href_and_stops_early():
+    scraper = FakeScraper(pages=5)
+
+    async def run():
+        seen = []
+        async with aclosing(iter_cursor_pages(scraper, FOLLOWERS, {}, max_pages=5, limit=2)) as pages:
+            async for page in pages:
+                seen.append(page)
+                if len(seen) == 2:
+                    break
+        return seen
+
+    assert len(asyncio.run(run())) == 2
+    # One page at a time: nothing was fetched past what the caller used
+    assert len(scraper.calls) == 2
+    assert scraper.calls[1][1] == {"cursor": "1", "limit": "2", "client_id": "cid"}
+
+
+def test_cursor_respects_max_pages_and_errors():
+    assert len(asyncio.run(_collect(iter_cursor_pages(FakeScraper(pages=9), FOLLOWERS, {}, max_pages=3)))) == 3
+    assert asyncio.run(_collect(iter_cursor_pages(FakeScraper(status=500), FOLLOWERS, {}))) == []
+
+
+def test_collect_pages_picks_the_mode():
+    scraper = FakeScraper(pages=2)
+    items = asyncio.run(collect_pages(scraper, SEARCH, {}, limit=2))
+    assert [u["id"] for u in items] == [0, 1, 2, 3]
+    assert "offset" in scraper.calls[0][1]
+    scraper = FakeScraper(pages=2)
+    asyncio.run(_collect(iter_pages(scraper, FOLLOWERS, {}, limit=2)))
+    assert "offset" not in scraper.calls[0][1]
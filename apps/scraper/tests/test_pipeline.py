@@ -0,0 +1,231 @@
+import asyncio
+from contextlib import aclosing
+
+import pytest
+
+from services.deep_scrape import iter_deep_scrape
+from services.pipeline import AdaptiveLimit, Stage, iter_completed, merge, run_pipeline
+
+
+def _collect_sink():
+    out = []
+
+    async def sink(item):
+        out.append(item)
+
+    return out, sink
+
+
+def test_single_worker_stages_keep_order_and_flatten():
+    out, sink = _collect_sink()
+
+    async def split(x):
+        await asyncio.sleep(0)
+        return [x, x + 100]
+
+    async def keep_even(x):
+        return [x] if x % 2 == 0 else None
+
+    metrics = asyncio.run(run_pipeline(
+        range(4), [Stage("split", split, concurrency=1), Stage("even", keep_even, concurrency=1)], sink=sink,
+    ))
+    assert out == [0, 100, 2, 102]
+    assert metrics["split"]["emitted"] == 8 and metrics["even"]["processed"] == 8 and metrics["even"]["emitted"] == 4
+
+
+def test_raising_item_is_dropped_or_replaced_by_on_error():
+    async def fn(x):
+        if x == 1:
+            raise ValueError("bad")
+        return [x]
+
+    out, sink = _collect_sink()
+    metrics = asyncio.run(run_pipeline(range(3), [Stage("s", fn, concurrency=1)], sink=sink))
+    assert out == [0, 2] and metrics["s"]["errors"] == 1
+
+    out, sink = _collect_sink()
+    stage = Stage("s", fn, concurrency=1, on_error=lambda item, e: [f"{item}: {e}"])
+    asyncio.run(run_pipeline(range(3), [stage], sink=sink))
+    assert out == [0, "1: bad", 2]
+
+
+def test_bounded_queues_apply_backpressure_to_the_source():
+    consumed = 0
+    release = asyncio.Event()
+
+    def source():
+        nonlocal consumed
+        for i in range(100):
+            consumed += 1
+            yield i
+
+    async def fn(x):
+        return [x]
+
+    async def sink(item):
+        await release.wait()
+
+    async def run():
+        task = asyncio.create_task(run_pipeline(
+            source(), [Stage("a", fn, concurrency=1, queue_size=2), Stage("b", fn, concurrency=1, queue_size=2)],
+            sink=sink,
+        ))
+        await asyncio.sleep(0.05)
+        stalled_at = consumed
+        release.set()
+        await task
+        return stalled_at
+
+    stalled_at = asyncio.run(run())
+    # Two queues of two, one item held by each worker, one waiting to be queued
+    assert stalled_at <= 7
+    assert consumed == 100
+
+
+def test_cancelling_the_pipeline_cancels_its_workers():
+    cancelled = []
+
+    async def slow(x):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(x)
+            raise
+        return [x]
+
+    async def run():
+        task = asyncio.create_task(run_pipeline(range(3), [Stage("slow", slow, concurrency=3)]))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert sorted(cancelled) == [0, 1, 2]
+
+
+def test_adaptive_limit_grows_on_fast_windows_and_backs_off():
+    limit = AdaptiveLimit(initial=4, max_limit=8, window=2)
+
+    async def window(latency, error=False):
+        for _ in range(2):
+            await limit.acquire()
+            await limit.release(latency, error)
+
+    async def run():
+        await window(0.1)
+        assert limit.limit == 5
+        await window(0.1)
+        assert limit.limit == 6
+        await window(1.0)  # latency inflated well past the baseline
+        assert limit.limit == 5
+        await window(0.1, error=True)
+        assert limit.limit == 2
+
+    asyncio.run(run())
+    assert (limit.increases, limit.decreases) == (2, 2)
+
+
+def test_adaptive_limit_blocks_at_the_limit():
+    limit = AdaptiveLimit(initial=2, max_limit=2)
+
+    async def run():
+        await limit.acquire()
+        await limit.acquire()
+        third = asyncio.create_task(limit.acquire())
+        await asyncio.sleep(0.01)
+        assert not third.done()
+        await limit.release(0.1, False)
+        await asyncio.wait_for(third, 1)
+        return limit.in_flight
+
+    assert asyncio.run(run()) == 2
+
+
+async def _after(delay, value):
+    await asyncio.sleep(delay)
+    if isinstance(value, Exception):
+        raise value
+    return value
+
+
+def test_iter_completed_yields_in_completion_order_and_skips_failures():
+    async def run():
+        coros = [_after(0.03, [3]), _after(0.01, [1]), _after(0.02, RuntimeError("x")), _after(0.0, "not a list")]
+        return [r async for r in iter_completed(coros)]
+
+    assert asyncio.run(run()) == [[1], [3]]
+
+
+def test_iter_completed_cancels_the_rest_when_closed():
+    async def run():
+        slow = asyncio.ensure_future(_after(10, [2]))
+        async with aclosing(iter_completed([_after(0, [1]), slow])) as results:
+            async for _ in results:
+                break
+        await asyncio.sleep(0)
+        return slow.cancelled()
+
+    assert asyncio.run(run())
+
+
+async def _source(items, delay, fail=False):
+    for item in items:
+        await asyncio.sleep(delay)
+        yield item
+    if fail:
+        raise RuntimeError("source died")
+
+
+def test_merge_interleaves_and_outlives_a_failing_source(caplog):
+    async def run():
+        return [x async for x in merge(_source("ab", 0.01), _source([1, 2, 3], 0.015, fail=True))]
+
+    items = asyncio.run(run())
+    assert sorted(map(str, items)) == ["1", "2", "3", "a", "b"]
+    assert items.index("a") < items.index(2)
+    assert "source died" in caplog.text
+
+
+def test_merge_cancels_sources_when_closed():
+    closed = []
+
+    async def endless(tag):
+        try:
+            while True:
+                await asyncio.sleep(0.001)
+                yield tag
+        finally:
+            closed.append(tag)
+
+    async def run():
+        async with aclosing(merge(endless("x"), endless("y"))) as items:
+            async for _ in items:
+                break
+        await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+    assert sorted(closed) == ["x", "y"]
+
+
+class BrokenStore:
+    enabled = True
+
+    async def get(self, sc_user_id=None, url=None):
+        raise RuntimeError("store unreadable")
+
+
+class StoreOnlyScraper:
+    _enrichment = BrokenStore()
+
+
+def test_deep_scrape_reports_a_row_for_a_candidate_whose_stage_raised():
+    candidates = [{"url": "https://soundcloud.com/a"}, {"url": "https://soundcloud.com/b"}]
+
+    async def run():
+        return [r async for r in iter_deep_scrape(StoreOnlyScraper(), candidates)]
+
+    results = asyncio.run(run())
+    assert sorted(r["url"] for r in results) == [c["url"] for c in candidates]
+    assert all(r == {"url": r["url"], "success": False, "error": "store unreadable"} for r in results)
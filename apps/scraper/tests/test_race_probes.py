@@ -0,0 +1,84 @@
+import time
+import asyncio
+
+from services.email_scraper import _race_probes
+
+
+def _probe(result, delay: float = 0.0, log: list | None = None, name: str = ""):
+    async def run():
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            if log is not None:
+                log.append(name)
+            raise
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return run
+
+
+def test_lower_priority_hit_waits_for_a_running_higher_priority_probe():
+    probes = [
+        ("linktree", _probe("tree@artist.com", delay=0.05)),
+        ("website", _probe("site@artist.com")),
+    ]
+    assert asyncio.run(_race_probes(probes, budget=5)) == ("tree@artist.com", "linktree")
+
+
+def test_hit_wins_once_everything_above_it_finished_empty():
+    cancelled: list[str] = []
+    probes = [
+        ("linktree", _probe(None, delay=0.01)),
+        ("website", _probe("site@artist.com", delay=0.02)),
+        ("instagram", _probe("ig@artist.com", delay=5.0, log=cancelled, name="instagram")),
+    ]
+
+    async def run():
+        start = time.monotonic()
+        result = await _race_probes(probes, budget=10)
+        await asyncio.sleep(0)
+        return result, time.monotonic() - start
+
+    result, elapsed = asyncio.run(run())
+    assert result == ("site@artist.com", "website")
+    assert elapsed < 1.0
+    assert cancelled == ["instagram"]
+
+
+def test_a_raising_probe_counts_as_finished_empty():
+    probes = [
+        ("linktree", _probe(RuntimeError("boom"))),
+        ("website", _probe("site@artist.com", delay=0.01)),
+    ]
+    assert asyncio.run(_race_probes(probes, budget=5)) == ("site@artist.com", "website")
+
+
+def test_junk_hits_are_ignored():
+    probes = [("linktree", _probe("noreply@example.com")), ("website", _probe("site@artist.com"))]
+    assert asyncio.run(_race_probes(probes, budget=5)) == ("site@artist.com", "website")
+
+
+def test_budget_expiry_returns_the_best_hit_so_far():
+    cancelled: list[str] = []
+    probes = [
+        ("linktree", _probe("tree@artist.com", delay=5.0, log=cancelled, name="linktree")),
+        ("website", _probe("site@artist.com", delay=0.01)),
+    ]
+
+    async def run():
+        start = time.monotonic()
+        result = await _race_probes(probes, budget=0.1)
+        await asyncio.sleep(0)
+        return result, time.monotonic() - start
+
+    result, elapsed = asyncio.run(run())
+    assert result == ("site@artist.com", "website")
+    assert 0.1 <= elapsed < 1.0
+    assert cancelled == ["linktree"]
+
+
+def test_budget_expiry_with_no_hits():
+    probes = [("website", _probe("site@artist.com", delay=5.0))]
+    assert asyncio.run(_race_probes(probes, budget=0.05)) == (None, "")
+    assert asyncio.run(_race_probes([], budget=1)) == (None, "")
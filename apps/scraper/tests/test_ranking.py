@@ -0,0 +1,62 @@
+import pytest
+
+from services.models import Candidate
+from services.ranking import DEFAULT_WEIGHTS, EXACT, PARTIAL, VARIANT, Ranker
+
+NOW = 1_800_000_000.0
+DAY = 86400
+
+
+def _cand(uid: int, **kw) -> Candidate:
+    return Candidate(id=uid, **kw)
+
+
+def test_signals_are_in_unit_range_and_weighted():
+    ranker = Ranker(["techno"], 100, 100_000, now=NOW)
+    c = _cand(1, genre="Techno", followers_count=100_000, modified_at=NOW, hits=3, distance=1)
+    ranked = ranker.score(c)
+    assert ranked.breakdown == {"sources": 0.75, "distance": 1.0, "recency": 1.0, "genre": 1.0, "band": 1.0}
+    assert ranked.score == pytest.approx(sum(DEFAULT_WEIGHTS.values()) - DEFAULT_WEIGHTS["sources"] * 0.25)
+
+
+def test_recency_halves_per_half_life_and_unknown_is_zero():
+    ranker = Ranker([], now=NOW)
+    assert ranker._recency(NOW - 90 * DAY) == pytest.approx(0.5)
+    assert ranker._recency(NOW + DAY) == 1.0
+    assert ranker._recency(None) == 0.0
+
+
+def test_genre_levels():
+    ranker = Ranker(["Hip-Hop"])
+    assert ranker._genre("hip-hop") == EXACT
+    assert ranker._genre("UK Hip-Hop") == PARTIAL
+    assert ranker._genre("trap") == VARIANT
+    assert ranker._genre("country") == 0.0
+    assert Ranker([])._genre("techno") == 0.0
+
+
+def test_band_is_log_scaled_and_clamped():
+    ranker = Ranker([], 100, 10_000)
+    assert ranker._band(10) == 0.0
+    assert ranker._band(1_000) == pytest.approx(0.5, abs=0.01)
+    assert ranker._band(10**6) == 1.0
+    assert Ranker([], 500, 500)._band(500) == 1.0
+
+
+def test_top_k_matches_a_full_sort():
+    ranker = Ranker(["house"], 0, 50_000, now=NOW)
+    pool = [
+        _cand(i, genre=["house", "deep house", "techno", ""][i % 4], followers_count=(i * 7919) % 50_000,
+              modified_at=NOW - (i % 300) * DAY, hits=1 + i % 3, distance=(i % 4) or None)
+        for i in range(1, 400)
+    ]
+    full = sorted((ranker.score(c) for c in pool), key=lambda r: (r.score, r.candidate.followers_count), reverse=True)
+    top = ranker.top(pool, 25)
+    assert [r.candidate.id for r in top] == [r.candidate.id for r in full[:25]]
+    assert len(ranker.top(pool)) == len(pool)
+    assert ranker.top([], 5) == []
+
+
+def test_custom_weights_override_defaults():
+    ranker = Ranker([], weights={"sources": 1.0, "distance": 0, "recency": 0, "genre": 0, "band": 0})
+    assert ranker.score(_cand(1, hits=2)).score == pytest.approx(0.5)
@@ -0,0 +1,123 @@
+import time
+import asyncio
+
+import pytest
+
+from services.rate_limiter import AdaptiveRateLimiter, MAX_RATE, MIN_RATE, TokenBucket, parse_retry_after
+
+SEARCH = "https://api-v2.soundcloud.com/search/users"
+HOST = "api-v2.soundcloud.com"
+
+
+def test_burst_is_free_then_waits_queue_up():
+    bucket = TokenBucket(rate=2.0, burst=3.0)
+    bucket._updated = 0.0
+    assert [bucket.reserve(0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    # Reservations stack: the 4th waits one token, the 5th two
+    assert bucket.reserve(0.0) == pytest.approx(0.5)
+    assert bucket.reserve(0.0) == pytest.approx(1.0)
+
+
+def test_refill_is_capped_at_burst():
+    bucket = TokenBucket(rate=10.0, burst=2.0)
+    bucket._updated = 0.0
+    bucket.reserve(0.0)
+    bucket.reserve(100.0)
+    assert bucket.tokens == pytest.approx(1.0)
+
+
+def test_scale_and_grow_stay_within_bounds():
+    bucket = TokenBucket(rate=1.0)
+    for _ in range(20):
+        bucket.scale(0.5)
+    assert bucket.rate == MIN_RATE
+    for _ in range(100):
+        bucket.grow(1.0)
+    assert bucket.rate == MAX_RATE
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after("-3") == 0.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0  # in the past
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def _rates(limiter: AdaptiveRateLimiter) -> tuple[float, float]:
+    return limiter._host_bucket(HOST).rate, limiter._class_bucket(HOST, "search").rate
+
+
+def test_429_halves_rates_and_starts_a_shared_cooldown():
+    limiter = AdaptiveRateLimiter(host_rate=4.0, class_rates={"search": 2.0})
+    before = time.monotonic()
+    limiter.record(SEARCH, 429, 0.1, retry_after="3")
+    assert _rates(limiter) == (2.0, 1.0)
+    # Retry-After plus 0.1–0.5s jitter
+    assert before + 3.1 <= limiter._cooldown_until <= time.monotonic() + 3.5
+    assert limiter.stats()["throttled"] == 1
+
+
+def test_cooldown_without_retry_after_doubles_per_consecutive_429():
+    limiter = AdaptiveRateLimiter(base_cooldown=1.0, max_cooldown=60.0)
+    delays = []
+    for _ in range(3):
+        now = time.monotonic()
+        limiter._cooldown_until = 0.0
+        limiter.record(SEARCH, 429, 0.1)
+        delays.append(limiter._cooldown_until - now)
+    for delay, base in zip(delays, (1.0, 2.0, 4.0)):
+        assert base + 0.1 <= delay <= base + 0.5 + 0.05
+    # A success resets the streak
+    limiter.record(SEARCH, 200, 0.1)
+    assert limiter._consecutive_429 == 0
+
+
+def test_cooldown_is_capped():
+    limiter = AdaptiveRateLimiter(max_cooldown=5.0)
+    now = time.monotonic()
+    limiter.record(SEARCH, 429, 0.1, retry_after="600")
+    assert limiter._cooldown_until - now <= 5.5 + 0.05
+
+
+def test_successes_recover_rates_additively():
+    limiter = AdaptiveRateLimiter(host_rate=4.0, class_rates={"search": 2.0}, increase_step=0.1)
+    limiter.record(SEARCH, 429, 0.1)
+    host, cls = _rates(limiter)
+    limiter._cooldown_until = 0.0
+    for _ in range(10):
+        limiter.record(SEARCH, 200, 0.1)
+    new_host, new_cls = _rates(limiter)
+    assert host < new_host < 4.0
+    # At most one step per success, scaled down as the rate climbs past 1/s
+    assert cls < new_cls <= cls + 10 * 0.1
+
+
+def test_server_errors_leave_rates_alone():
+    limiter = AdaptiveRateLimiter(host_rate=4.0, class_rates={"search": 2.0})
+    limiter.record(SEARCH, 503, 0.1)
+    assert _rates(limiter) == (4.0, 2.0)
+
+
+def test_rising_latency_backs_off_gently():
+    limiter = AdaptiveRateLimiter(host_rate=4.0, class_rates={"search": 2.0})
+    limiter.record(SEARCH, 200, 0.1)
+    host, cls = _rates(limiter)
+    for _ in range(5):
+        limiter.record(SEARCH, 200, 5.0)
+    new_host, new_cls = _rates(limiter)
+    assert new_host < host and new_cls < cls
+    assert new_cls > cls * 0.5  # never a 429-sized cut per sample
+
+
+def test_throttle_waits_out_the_cooldown():
+    limiter = AdaptiveRateLimiter()
+
+    async def run():
+        limiter._cooldown_until = time.monotonic() + 0.05
+        start = time.monotonic()
+        async with limiter.throttle(SEARCH):
+            return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 0.05
+    assert limiter.stats()["requests"] == 1
@@ -0,0 +1,57 @@
+import asyncio
+
+import httpx
+
+from services.response_cache import ResponseCache
+
+URL = "https://api-v2.soundcloud.com/users/1"
+
+
+def _resp(body: bytes) -> httpx.Response:
+    return httpx.Response(200, content=body, headers={"content-type": "application/json"})
+
+
+def test_memory_tier_evicts_by_bytes():
+    cache = ResponseCache(max_entries=100, db_path=None, max_bytes=250)
+
+    async def run():
+        for i in range(3):
+            await cache.put(f"{URL}{i}", None, _resp(b"x" * 100))
+        return [await cache.get(f"{URL}{i}") is not None for i in range(3)]
+
+    assert asyncio.run(run()) == [False, True, True]
+    assert cache.stats()["bytes"] == 200
+    assert cache.evictions == 1
+
+
+def test_oversized_body_skips_memory_and_non_200_is_ignored():
+    cache = ResponseCache(db_path=None, max_bytes=10)
+
+    async def run():
+        await cache.put(URL, None, _resp(b"x" * 11))
+        await cache.put(URL + "2", None, httpx.Response(404))
+        return await cache.get(URL), await cache.get(URL + "2")
+
+    assert asyncio.run(run()) == (None, None)
+    assert cache.stats()["entries"] == 0
+
+
+def test_disk_tier_serves_after_memory_and_is_pruned(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = ResponseCache(db_path=path, disk_bytes=250)
+
+    async def run():
+        for i in range(3):
+            await cache.put(f"{URL}{i}", None, _resp(b"x" * 100))
+        cache._lru.clear()
+        cache._bytes = 0
+        return await cache.get(f"{URL}2")
+
+    resp = asyncio.run(run())
+    assert resp.content == b"x" * 100
+    assert cache.disk_hits == 1
+
+    reopened = ResponseCache(db_path=path, disk_bytes=250)
+    assert reopened.disk_pruned == 1
+    rows = reopened._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+    assert rows == 2
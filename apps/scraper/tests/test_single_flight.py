@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from services.single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    async def run():
+        return await asyncio.gather(*(flight.do("k", fetch) for _ in range(5)))
+
+    assert asyncio.run(run()) == [1] * 5
+    assert calls == 1
+    assert flight.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 4, "coalesce_rate": 0.8}
+
+
+def test_key_is_released_after_completion():
+    flight = SingleFlight()
+
+    async def run():
+        first = await flight.do("k", lambda: asyncio.sleep(0, "a"))
+        second = await flight.do("k", lambda: asyncio.sleep(0, "b"))
+        return first, second
+
+    assert asyncio.run(run()) == ("a", "b")
+    assert flight.leaders == 2
+
+
+def test_exception_reaches_every_waiter():
+    flight = SingleFlight()
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream")
+
+    async def run():
+        return await asyncio.gather(*(flight.do("k", boom) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_shared_call_survives_until_last_waiter_cancels():
+    flight = SingleFlight()
+
+    async def run():
+        gate = asyncio.Event()
+
+        async def slow():
+            await gate.wait()
+            return "done"
+
+        a = asyncio.ensure_future(flight.do("k", slow))
+        b = asyncio.ensure_future(flight.do("k", slow))
+        await asyncio.sleep(0)
+        shared = flight._inflight["k"]
+
+        a.cancel()
+        await asyncio.sleep(0)
+        assert not shared.cancelled()
+
+        b.cancel()
+        await asyncio.sleep(0)
+        with pytest.raises(asyncio.CancelledError):
+            await b
+        await asyncio.sleep(0)
+        assert shared.cancelled()
+
+    asyncio.run(run())
@@ -0,0 +1,54 @@
+import pytest
+
+from services.email_utils import MAILTO_RE, StreamingEmailScanner, extract_email, validate_email
+
+FILLER = "<p>" + "lorem ipsum dolor " * 40 + "</p>"
+
+PAGES = [
+    # Plain address only
+    FILLER + "Bookings: booking.artist@mgmt-example.net" + FILLER,
+    # mailto after a plain address wins over it
+    FILLER + "press: first@label.org " + FILLER + '<a href="mailto:book@artist.de">mail</a>' + FILLER,
+    # Invalid matches before the real one
+    FILLER + "7c33659f530ef43f@sentry.io icon@logo.png " + FILLER + "hello@artist.fm",
+    # Nothing at all
+    FILLER * 3,
+]
+
+
+def _full_scan(text: str):
+    for m in MAILTO_RE.finditer(text):
+        if validate_email(m.group(1)):
+            return m.group(1)
+    return extract_email(text)
+
+
+def _stream(text: str, size: int):
+    scanner = StreamingEmailScanner()
+    for i in range(0, len(text), size):
+        found = scanner.feed(text[i:i + size])
+        if found:
+            return found
+    return scanner.finish()
+
+
+@pytest.mark.parametrize("page", PAGES)
+@pytest.mark.parametrize("size", [1, 7, 64, 333, 4096])
+def test_chunked_scan_matches_full_text_scan(page, size):
+    assert _stream(page, size) == _full_scan(page)
+
+
+def test_address_split_across_chunks_is_not_truncated():
+    text = FILLER + "write to someone.long@management-agency.com today"
+    at = text.index("@")
+    scanner = StreamingEmailScanner()
+    assert scanner.feed(text[:at - 3]) is None
+    assert scanner.feed(text[at - 3:at + 5]) is None
+    scanner.feed(text[at + 5:])
+    assert scanner.finish() == "someone.long@management-agency.com"
+
+
+def test_mailto_is_returned_from_feed_once_complete():
+    scanner = StreamingEmailScanner()
+    body = '<a href="mailto:book@artist.de">' + FILLER
+    assert scanner.feed(body) == "book@artist.de"
@@ -0,0 +1,123 @@
+import time
+import asyncio
+
+import pytest
+
+from services.response_cache import ResponseCache
+from services.single_flight import SingleFlight
+from services.soundcloud_scraper import SoundCloudScraper
+from services.tap_scheduler import BudgetExhausted, TapScheduler, charge_request, current_tap
+
+
+def test_requests_are_charged_to_the_bound_tap():
+    sched = TapScheduler(["a", "b"])
+    with sched.bind("a"):
+        assert current_tap() == "a"
+        charge_request()
+        charge_request()
+    with sched.bind("b"):
+        charge_request()
+    assert current_tap() is None
+    charge_request()  # outside any tap: free
+    assert sched.spent == {"a": 2, "b": 1}
+    assert sched.stats()["requests_used"] == 3
+
+
+def test_budget_exhaustion_denies_and_truncates():
+    sched = TapScheduler(["a"], request_budget=2)
+    with sched.bind("a"):
+        charge_request()
+        charge_request()
+        assert not sched.truncated
+        with pytest.raises(BudgetExhausted) as exc:
+            charge_request()
+    assert exc.value.args[0] == "a"
+    assert sched.truncated
+    assert sched.stats()["taps"]["a"] == {"requests": 2, "candidates": 0, "yield": 0.33, "denied": 1}
+
+
+def test_deadline_denies_every_tap():
+    sched = TapScheduler(["a", "b"], deadline=0.01)
+    assert 0 < sched.time_left() <= 0.01
+    time.sleep(0.02)
+    assert sched.expired() and sched.time_left() == 0.0
+    with pytest.raises(BudgetExhausted):
+        sched.charge("b")
+    assert sched.truncated
+    assert TapScheduler(["a"]).time_left() is None
+
+
+def test_every_tap_gets_its_floor_then_yield_wins():
+    sched = TapScheduler(["dry", "rich"], request_budget=20, explore_share=0.5)
+    for _ in range(5):  # floor = 20 * 0.5 / 2
+        sched.charge("dry")
+        sched.charge("rich")
+    sched.credit("rich", 50)
+    # Past the floor the productive tap may keep going; the dry one is starved
+    assert sched._may_spend("rich")
+    assert not sched._may_spend("dry")
+
+
+def test_finished_taps_release_their_share():
+    sched = TapScheduler(["a", "b"], request_budget=10, explore_share=1.0)
+    with sched.bind("b"):
+        pass
+    for _ in range(9):
+        sched.charge("a")
+    assert sched.spent["a"] == 9
+
+
+# ── SoundCloudScraper._get and exhausted leaders ──────────────────────
+
+
+def _scraper(fetch) -> SoundCloudScraper:
+    scraper = SoundCloudScraper.__new__(SoundCloudScraper)
+    scraper._cache = ResponseCache(db_path=None)
+    scraper._flight = SingleFlight()
+    scraper._fetch = fetch
+    return scraper
+
+
+def test_caller_outside_a_tap_retries_when_the_leaders_tap_is_dry():
+    sched = TapScheduler(["dry"], request_budget=0)
+    fetches = []
+
+    async def fetch(url, params):
+        await asyncio.sleep(0.01)
+        charge_request()
+        fetches.append(current_tap())
+        return "response"
+
+    scraper = _scraper(fetch)
+
+    async def in_tap():
+        with sched.bind("dry"):
+            return await scraper._get("https://api-v2.soundcloud.com/users/1")
+
+    async def run():
+        leader = asyncio.create_task(in_tap())
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(scraper._get("https://api-v2.soundcloud.com/users/1"))
+        return await asyncio.gather(leader, follower, return_exceptions=True)
+
+    tapped, untapped = asyncio.run(run())
+    assert isinstance(tapped, BudgetExhausted)
+    assert untapped == "response"
+    assert fetches == [None]
+
+
+def test_caller_in_the_dry_tap_gets_budget_exhausted():
+    sched = TapScheduler(["dry"], request_budget=0)
+
+    async def fetch(url, params):
+        charge_request()
+        return "response"
+
+    scraper = _scraper(fetch)
+
+    async def run():
+        with sched.bind("dry"):
+            await scraper._get("https://api-v2.soundcloud.com/users/1")
+
+    with pytest.raises(BudgetExhausted):
+        asyncio.run(run())